@@ -3,11 +3,13 @@ import os, numpy as np, matplotlib.pyplot as plt
 
 BASE = "ut26_cosmo3d_outputs"
 
-# auto-detect the latest hysteresis run folder (starts with 'hyst_')
-candidates = [d for d in os.listdir(BASE) if os.path.isdir(os.path.join(BASE,d)) and d.startswith("hyst_")]
+# auto-detect the latest hysteresis run folder (starts with 'hyst_'); only
+# finished runs have hysteresis.csv (a --branch trunk folder never does)
+candidates = [d for d in os.listdir(BASE) if d.startswith("hyst_")
+              and os.path.exists(os.path.join(BASE, d, "hysteresis.csv"))]
 if not candidates:
     raise FileNotFoundError("No hysteresis run folder found under ut26_cosmo3d_outputs/")
-candidates.sort(key=lambda d: os.path.getmtime(os.path.join(BASE,d)))
+candidates.sort(key=lambda d: os.path.getmtime(os.path.join(BASE, d, "hysteresis.csv")))
 run_dir = os.path.join(BASE, candidates[-1])
 
 csv_path = os.path.join(run_dir, "hysteresis.csv")
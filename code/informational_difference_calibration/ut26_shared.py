@@ -0,0 +1,29 @@
+"""
+UT26 shared code: the simulator and its tools live in ../quasar_cosmology_experiment
+
+This experiment runs the same code as quasar_cosmology_experiment, so the
+modules are kept there only once.  The scripts in this folder are thin
+wrappers that run the shared script of the same name; run from here, every
+output still goes to ./ut26_cosmo3d_outputs (all output paths are relative
+to the working directory).
+
+    # <name>.py
+    from ut26_shared import run_shared
+    if __name__ == "__main__":
+        run_shared(__file__)
+"""
+
+import os, sys, runpy
+
+SHARED = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                       "..", "quasar_cosmology_experiment"))
+
+
+def run_shared(script):
+    """Run the shared script named like `script` as __main__, with the shared
+    folder first on sys.path so its modules (not these wrappers) are imported."""
+    if sys.path[:1] != [SHARED]:
+        sys.path.insert(0, SHARED)
+    path = os.path.join(SHARED, os.path.basename(script))
+    sys.argv[0] = path
+    runpy.run_path(path, run_name="__main__")
\ No newline at end of file
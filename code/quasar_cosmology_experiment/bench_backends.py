@@ -0,0 +1,80 @@
+# bench_backends.py
+"""
+Scaling report for the step backends: steps/sec against thread count.
+
+For each lattice size N the NumPy backend is timed once (single-threaded)
+and the numba backend at 1, 2, 4, ... threads up to the numba thread limit.
+The first step of each engine (JIT compile / cache load, page faults) is
+excluded from the timing.
+
+Run:
+    python bench_backends.py                          # N = 64, 96, 128, 192
+    BENCH_N=64,96 BENCH_STEPS=20 python bench_backends.py
+    PRECISION=float32 TRIGGER_MODE=bernoulli python bench_backends.py
+
+Writes backend_scaling.csv under ut26_cosmo3d_outputs/.
+"""
+
+import os, time
+import numpy as np
+
+import ut26_cosmo3d as sim
+from ut26_step import make_engine
+
+SIZES = [int(n) for n in os.getenv("BENCH_N", "64,96,128,192").split(",")]
+STEPS = int(os.getenv("BENCH_STEPS", 10))
+OUT   = os.path.join(sim.OUTDIR_BASE, "backend_scaling.csv")
+
+try:
+    import numba
+    MAX_THREADS = numba.config.NUMBA_NUM_THREADS
+except ImportError:
+    numba = None
+    MAX_THREADS = 0
+
+
+def thread_counts():
+    n, out = 1, []
+    while n < MAX_THREADS:
+        out.append(n); n *= 2
+    return out + [MAX_THREADS] if MAX_THREADS else []
+
+
+def steps_per_sec(n, backend):
+    rng = np.random.default_rng(sim.SEED)
+    b   = rng.uniform(-1.0, 1.0, size=(n, n, n))
+    s   = np.clip(0.5 + 0.1*b, 0.0, 1.0).astype(sim.DTYPE)
+    eng = make_engine(s, b, sim.sim_params(), rng, backend=backend,
+                      collapse=sim.COLLAPSE_MODE, trigger=sim.TRIGGER_MODE)
+    drive = lambda t: sim.DRIVE_A * np.sin(sim.DRIVE_W * t)
+    eng.step(drive(0))                      # warm-up (JIT, first touch)
+    t0 = time.perf_counter()
+    for t in range(1, STEPS + 1):
+        eng.step(drive(t))
+    return eng.backend, STEPS / (time.perf_counter() - t0)
+
+
+def main():
+    print(f"Backend scaling: N={SIZES}, {STEPS} steps, precision={sim.PRECISION}, "
+          f"trigger={sim.TRIGGER_MODE}, numba threads<= {MAX_THREADS or 'n/a'}")
+    rows = []
+    for n in SIZES:
+        _, base = steps_per_sec(n, "numpy")
+        rows.append([n, "numpy", 1, base, 1.0])
+        print(f"N={n:4d}  numpy      1 thr  {base:8.2f} steps/s")
+        for th in thread_counts():
+            numba.set_num_threads(th)
+            used, sps = steps_per_sec(n, "numba")
+            rows.append([n, used, th, sps, sps / base])
+            print(f"N={n:4d}  {used:<8s} {th:3d} thr  {sps:8.2f} steps/s  x{sps/base:.2f}")
+
+    os.makedirs(sim.OUTDIR_BASE, exist_ok=True)
+    with open(OUT, "w") as f:
+        f.write("N,backend,threads,steps_per_sec,speedup_vs_numpy\n")
+        for r in rows:
+            f.write(",".join(str(x) for x in r) + "\n")
+    print("Wrote:", OUT)
+
+
+if __name__ == "__main__":
+    main()
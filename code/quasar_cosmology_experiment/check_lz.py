@@ -0,0 +1,109 @@
+# check_lz.py
+"""
+Correctness and timing check for the linear-time LZ engine (ut26_lz.py).
+
+Compares the phrase count and normalised complexity of ut26_lz against the
+original set-of-slices loop from ut26_cosmo3d.py (kept verbatim below as
+reference_lz) on
+
+- every bit string up to length CHECK_MAXLEN (exhaustive),
+- random strings with P(1) = 0.5, 0.1, 0.9 of several lengths,
+- structured strings: constant, alternating, periodic, Thue-Morse, long
+  runs, and the thresholded initial field s > 0.5 of the simulator,
+
+for both the numba and the pure-Python trie (numba only if installed).
+Counts must match exactly.  Then times both against the reference on the
+full N³ snapshot bitfield for N = 48, 96 (reference) and 192 (new only).
+
+Run:
+    python check_lz.py
+    CHECK_MAXLEN=14 CHECK_BENCH_N=64,128 python check_lz.py
+"""
+
+import os, sys, time
+import numpy as np
+
+import ut26_cosmo3d as sim
+from ut26_lz import lz_complexity, NUMBA_OK
+
+MAXLEN  = int(os.getenv("CHECK_MAXLEN", 12))
+BENCH_N = [int(x) for x in os.getenv("CHECK_BENCH_N", "48,96,192").split(",")]
+REF_MAX_N = int(os.getenv("CHECK_REF_MAX_N", 96))   # the reference is slow beyond this
+
+
+def reference_lz(bits):
+    b = bytes(bits.astype(np.uint8).tolist())
+    seen = set(); i = 0; c = 0; n = len(b)
+    while i < n:
+        j = i+1
+        while j <= n and b[i:j] in seen:
+            j += 1
+        seen.add(b[i:j]); c += 1; i = j
+    if n < 2: return float(n)
+    return c / (n / np.log(n + 1))
+
+
+def cases():
+    rng = np.random.default_rng(7)
+    for n in range(MAXLEN + 1):
+        for v in range(2**n):
+            yield f"all/{n}", np.array([(v >> k) & 1 for k in range(n)], dtype=np.uint8)
+    for p in (0.5, 0.1, 0.9):
+        for n in (100, 10_000, 200_000):
+            yield f"random p={p} n={n}", (rng.random(n) < p).astype(np.uint8)
+    n = 100_000
+    i = np.arange(n)
+    yield "zeros",       np.zeros(n, dtype=np.uint8)
+    yield "ones",        np.ones(n, dtype=np.uint8)
+    yield "alternating", (i % 2).astype(np.uint8)
+    yield "period 7",    (i % 7 < 3).astype(np.uint8)
+    yield "thue-morse",  np.array([bin(k).count("1") & 1 for k in range(n)], dtype=np.uint8)
+    yield "runs",        ((i // 1000) % 2).astype(np.uint8)
+    raw = sim.gaussian_field_from_P0(32)
+    s = np.clip(0.5 + 0.1*raw, 0.0, 1.0)
+    yield "initial field N=32", (s.ravel() > 0.5).astype(int)
+
+
+def main():
+    engines = ["python"] + (["numba"] if NUMBA_OK else [])
+    if not NUMBA_OK:
+        print("numba not installed -> checking the Python trie only")
+
+    ok, groups = True, {}
+    for name, bits in cases():
+        ref = reference_lz(bits)
+        for eng in engines:
+            got = lz_complexity(bits, eng)
+            group = name.split("/")[0] + "/" + eng
+            g = groups.setdefault(group, [0, 0])
+            g[0] += 1
+            if got != ref:
+                g[1] += 1
+                ok = False
+                if g[1] <= 3:
+                    print(f"MISMATCH {name} [{eng}]: {got!r} != {ref!r}")
+    for group, (n, bad) in groups.items():
+        print(f"{group:>32s} {n:6d} cases  {'PASS' if not bad else f'FAIL ({bad})'}")
+
+    print(f"\n{'N':>5s} {'bits':>10s} {'reference s':>12s} " +
+          " ".join(f"{e + ' s':>10s}" for e in engines))
+    for n in BENCH_N:
+        bits = np.random.default_rng(n).random(n**3) > 0.5
+        row = f"{n:5d} {n**3:10d} "
+        if n <= REF_MAX_N:
+            t0 = time.perf_counter(); ref = reference_lz(bits.astype(int))
+            row += f"{time.perf_counter() - t0:12.3f} "
+        else:
+            ref = None; row += f"{'-':>12s} "
+        for eng in engines:
+            lz_complexity(bits[:16], eng)            # compile / warm up
+            t0 = time.perf_counter(); got = lz_complexity(bits, eng)
+            row += f"{time.perf_counter() - t0:10.3f} "
+            if ref is not None and got != ref:
+                ok = False; row += "MISMATCH "
+        print(row)
+    return ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
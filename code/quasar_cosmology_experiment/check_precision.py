@@ -0,0 +1,91 @@
+# check_precision.py
+"""
+Drift report for the float32 state mode (PRECISION=float32) of the simulator.
+
+Runs the same initial field and step seed with float64 and float32 state and
+reports the drift of final_mean_s, total_prunes and P(k) against the float64
+reference.  float32 draws a different random stream (standard_normal/random
+with dtype=float32), so the drift is shown next to the seed-to-seed scatter
+of a second float64 run: float32 is acceptable when its drift is of the same
+order as, or below, the realisation scatter.
+
+Also reports the engine working-set bytes per voxel for each precision.
+
+Run:
+    python check_precision.py                 # N=48, T=150
+    CHECK_N=64 CHECK_T=300 python check_precision.py
+"""
+
+import os, json
+import numpy as np
+
+import ut26_cosmo3d as sim
+from ut26_step import make_engine
+
+N = int(os.getenv("CHECK_N", 48))
+T = int(os.getenv("CHECK_T", 150))
+OUT = os.path.join(sim.OUTDIR_BASE, "precision_check.json")
+
+
+def run(s0, b, dtype, seed):
+    rng = np.random.default_rng(seed)
+    eng = make_engine(s0.astype(dtype), b, sim.sim_params(), rng, backend=sim.BACKEND,
+                      collapse=sim.COLLAPSE_MODE, trigger=sim.TRIGGER_MODE)
+    for t in range(T):
+        eng.step(sim.DRIVE_A * np.sin(sim.DRIVE_W * t))
+    s = eng.s.astype(np.float64)
+    _, Pk = sim.power_spectrum(s - s.mean())
+    nbytes = sum(a.nbytes for a in vars(eng).values() if isinstance(a, np.ndarray)
+                 and a.base is None)
+    return dict(final_mean_s=float(s.mean()), total_prunes=int(eng.prune_count),
+                Pk=Pk, bytes_per_voxel=nbytes / s.size)
+
+
+def pk_drift(a, b):
+    m = a > 0
+    rel = np.abs(b[m] - a[m]) / a[m]
+    return float(np.median(rel)), float(np.max(rel))
+
+
+def main():
+    print(f"Precision drift report: N={N}, T={T}")
+    raw = sim.gaussian_field_from_P0(N)
+    b   = raw / (np.max(np.abs(raw)) + 1e-12)
+    s0  = np.clip(0.5 + 0.1*raw, 0.0, 1.0)
+
+    ref  = run(s0, b, np.float64, sim.SEED)
+    f32  = run(s0, b, np.float32, sim.SEED)
+    alt  = run(s0, b, np.float64, sim.SEED + 1)
+
+    report = {}
+    for name, r in (("float32", f32), ("float64_other_seed", alt)):
+        med, mx = pk_drift(ref["Pk"], r["Pk"])
+        report[name] = dict(
+            final_mean_s=r["final_mean_s"],
+            d_final_mean_s=r["final_mean_s"] - ref["final_mean_s"],
+            total_prunes=r["total_prunes"],
+            rel_d_total_prunes=(r["total_prunes"] - ref["total_prunes"]) / max(ref["total_prunes"], 1),
+            Pk_rel_drift_median=med, Pk_rel_drift_max=mx,
+            bytes_per_voxel=r["bytes_per_voxel"],
+        )
+    report["float64_reference"] = dict(
+        final_mean_s=ref["final_mean_s"], total_prunes=ref["total_prunes"],
+        bytes_per_voxel=ref["bytes_per_voxel"])
+    report["config"] = dict(N=N, T=T, seed=sim.SEED, BACKEND=sim.BACKEND,
+                            COLLAPSE_MODE=sim.COLLAPSE_MODE,
+                            TRIGGER_MODE=sim.TRIGGER_MODE)
+
+    print(f"{'':>20s} {'d<s>':>11s} {'d prunes':>10s} {'Pk med':>8s} {'Pk max':>8s} {'B/voxel':>8s}")
+    for name in ("float32", "float64_other_seed"):
+        r = report[name]
+        print(f"{name:>20s} {r['d_final_mean_s']:+11.2e} {r['rel_d_total_prunes']:+10.2e} "
+              f"{r['Pk_rel_drift_median']:8.3f} {r['Pk_rel_drift_max']:8.3f} {r['bytes_per_voxel']:8.1f}")
+
+    os.makedirs(sim.OUTDIR_BASE, exist_ok=True)
+    with open(OUT, "w") as f:
+        json.dump(report, f, indent=2)
+    print("Wrote:", OUT)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+# check_rng_streams.py
+"""
+Consistency check for the counter-based step stream (RNG=counter).
+
+Runs the same initial field and seed through every execution layout and
+compares them with the single-process NumPy dense run:
+
+- NumPy engine, dense vs trigger-sparse collapse
+- numba engine with 1 thread and with all threads (if numba is installed)
+- ut26_cosmo3d_dist.py with 1, 2 and 3 workers (subprocesses)
+
+Trigger sets and collapse outcomes depend only on (seed, step, voxel,
+purpose), so total prunes and total trace R must match exactly; the field
+may differ only by the rounding of the <s> reduction (numba / slab sums),
+reported as max|Δs| / |Δ<s>|.
+
+Run:
+    python check_rng_streams.py                 # N=32, T=80
+    CHECK_N=48 CHECK_T=150 python check_rng_streams.py
+"""
+
+import os, sys, json, subprocess, tempfile
+import numpy as np
+
+import ut26_cosmo3d as sim
+from ut26_step import StepEngine
+from ut26_rng import CounterRNG
+
+N     = int(os.getenv("CHECK_N", 32))
+T     = int(os.getenv("CHECK_T", 80))
+S_TOL = float(os.getenv("CHECK_STOL", 1e-9))
+HERE  = os.path.dirname(os.path.abspath(__file__))
+
+
+def run_engine(s0, b, cls=StepEngine, **modes):
+    eng = cls(s0.copy(), b, sim.sim_params(), CounterRNG(sim.SEED), **modes)
+    for t in range(T):
+        eng.step(sim.DRIVE_A * np.sin(sim.DRIVE_W * t))
+    return dict(mean_s=float(eng.s.mean(dtype=np.float64)), prunes=int(eng.prune_count),
+                R_total=float(eng.R_total), s=eng.s.copy())
+
+
+def run_dist(workers):
+    with tempfile.TemporaryDirectory() as d:
+        env = dict(os.environ, N=str(N), T=str(T), DIST_WORKERS=str(workers), RNG="counter",
+                   RUN_TAG="dist", MPLBACKEND="Agg")
+        subprocess.run([sys.executable, os.path.join(HERE, "ut26_cosmo3d_dist.py")],
+                       env=env, cwd=d, check=True, stdout=subprocess.DEVNULL)
+        with open(os.path.join(d, sim.OUTDIR_BASE, "dist", "summary.json")) as f:
+            summ = json.load(f)
+    return dict(mean_s=summ["final_mean_s"], prunes=summ["total_prunes"],
+                R_total=summ["total_trace_R"], s=None)
+
+
+def main():
+    print(f"Counter-RNG layout check: N={N}, T={T}, seed={sim.SEED}")
+    raw = sim.gaussian_field_from_P0(N)
+    b   = raw / (np.max(np.abs(raw)) + 1e-12)
+    s0  = np.clip(0.5 + 0.1*raw, 0.0, 1.0)
+
+    runs = {"numpy/dense": run_engine(s0, b),
+            "numpy/sparse": run_engine(s0, b, collapse="sparse")}
+    try:
+        import numba
+        from ut26_step_numba import NumbaStepEngine
+        nthreads = numba.get_num_threads()
+        for k in sorted({1, nthreads}):
+            numba.set_num_threads(k)
+            runs[f"numba/{k}thr"] = run_engine(s0, b, NumbaStepEngine)
+        numba.set_num_threads(nthreads)
+    except ImportError:
+        print("numba not installed -> skipping numba runs")
+    for w in (1, 2, 3):
+        runs[f"dist/{w}w"] = run_dist(w)
+
+    ref, ok = runs["numpy/dense"], True
+    print(f"{'':>14s} {'prunes':>9s} {'R_total':>10s} {'d<s>':>10s} {'max|ds|':>10s}")
+    for name, r in runs.items():
+        ds  = abs(r["mean_s"] - ref["mean_s"])
+        dsm = float(np.max(np.abs(r["s"] - ref["s"]))) if r["s"] is not None else float("nan")
+        passed = (r["prunes"] == ref["prunes"] and abs(r["R_total"] - ref["R_total"]) < 1e-9
+                  and ds < S_TOL and not dsm > S_TOL)
+        ok &= passed
+        print(f"{name:>14s} {r['prunes']:9d} {r['R_total']:10.2f} {ds:10.1e} {dsm:10.1e}  "
+              f"{'PASS' if passed else 'FAIL'}")
+    return ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
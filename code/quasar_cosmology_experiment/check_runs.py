@@ -1,21 +1,21 @@
-import os, json, glob
+import os
+from ut26_results import db_path, query, rebuild
 
 BASE = "ut26_cosmo3d_outputs"
 
-folders = sorted(glob.glob(os.path.join(BASE, "*")))
-if not folders:
-    print("No run folders found under", BASE)
+# runs come from the results store (ut26_results.py); folders written before
+# it existed are indexed on first use
+if os.path.isdir(BASE) and not os.path.exists(db_path(BASE)):
+    rebuild(BASE)
+runs = [r for r in query(base=BASE) if os.path.isdir(r["outdir"])] if os.path.isdir(BASE) else []
+if not runs:
+    print("No runs found under", BASE)
     exit()
 
-print(f"Found {len(folders)} run folders:\n")
+print(f"Found {len(runs)} runs:\n")
 
-for f in folders:
-    summary_path = os.path.join(f, "summary.json")
-    if not os.path.exists(summary_path):
-        continue
-    with open(summary_path) as fh:
-        s = json.load(fh)
-    tag = os.path.basename(f)
+for r in runs:
+    s, tag = r, r["RUN_TAG"]
     print(f"Run: {tag}")
     print(f"  BETA={s.get('BETA')}, LAMBDA_R={s.get('LAMBDA_R')}, "
           f"ETA_THRESH={s.get('ETA_THRESH')}, DRIVE_A={s.get('DRIVE_A')}, "
@@ -0,0 +1,95 @@
+# check_trigger_modes.py
+"""
+Validation harness for the fast trigger-sampling modes of ut26_step.py.
+
+Runs an ensemble of seeds per mode on a small lattice, all starting from the
+same seed-SEED initial field, and compares the ensemble statistics of the
+"bernoulli" and "binomial" modes against the exact "noise" mode:
+
+- per-step trigger fraction (also checked against the analytic probability)
+- final mean coherence <s>, total prunes, total trace R
+
+A mode passes when every |z| (difference of ensemble means over the combined
+standard error) stays below Z_MAX.
+
+Run:
+    python check_trigger_modes.py            # N=32, T=120, 16 seeds
+    CHECK_N=48 CHECK_SEEDS=32 python check_trigger_modes.py
+"""
+
+import os, sys
+import numpy as np
+
+import ut26_cosmo3d as sim
+from ut26_step import StepEngine
+
+N     = int(os.getenv("CHECK_N",     32))
+T     = int(os.getenv("CHECK_T",     120))
+M     = int(os.getenv("CHECK_SEEDS", 16))
+Z_MAX = float(os.getenv("CHECK_ZMAX", 4.0))
+
+# (trigger, collapse) pairs; "noise"/"dense" is the exact reference
+MODES = [("noise", "dense"), ("bernoulli", "dense"), ("binomial", "sparse")]
+OUT   = os.path.join(sim.OUTDIR_BASE, "trigger_mode_check.csv")
+
+
+def run_ensemble(s0, b, params, trigger, collapse):
+    frac  = np.zeros((M, T))
+    final = np.zeros((M, 3))     # mean_s, prunes, R_total
+    for m in range(M):
+        rng = np.random.default_rng(10_000 + m)
+        eng = StepEngine(s0.copy(), b, params, rng, collapse=collapse, trigger=trigger)
+        for t in range(T):
+            frac[m, t] = eng.step(sim.DRIVE_A * np.sin(sim.DRIVE_W * t)) / eng.s.size
+        final[m] = [eng.s.mean(), eng.prune_count, eng.R_total]
+    return frac, final
+
+
+def zscore(a, b):
+    se = np.sqrt(a.var(ddof=1)/len(a) + b.var(ddof=1)/len(b))
+    d  = a.mean() - b.mean()
+    return 0.0 if se == 0 else float(d / se)
+
+
+def main():
+    print(f"Trigger-mode check: N={N}, T={T}, seeds={M}, |z|<{Z_MAX}")
+    raw = sim.gaussian_field_from_P0(N)
+    b   = raw / (np.max(np.abs(raw)) + 1e-12)
+    s0  = np.clip(0.5 + 0.1*raw, 0.0, 1.0)
+    params = sim.sim_params()
+
+    probe = StepEngine(s0.copy(), b, params, None)
+    p_exact = np.array([probe.trigger_prob(sim.DRIVE_A * np.sin(sim.DRIVE_W * t))
+                        for t in range(T)])
+
+    results = {mode: run_ensemble(s0, b, params, *mode) for mode in MODES}
+    ref_frac, ref_final = results[MODES[0]]
+
+    rows, ok = [], True
+    for (trigger, collapse), (frac, final) in results.items():
+        # trigger fraction: per-step mean over seeds vs analytic p
+        se = np.sqrt(p_exact*(1 - p_exact) / (M * N**3)) + 1e-12
+        z_p = float(np.max(np.abs(frac.mean(axis=0) - p_exact) / se))
+        z_frac = zscore(frac.mean(axis=1), ref_frac.mean(axis=1))
+        z_fin  = [zscore(final[:, i], ref_final[:, i]) for i in range(3)]
+        worst  = max([z_p, abs(z_frac)] + [abs(z) for z in z_fin])
+        passed = worst < Z_MAX
+        ok &= passed
+        rows.append([trigger, collapse, frac.mean(), *final.mean(axis=0),
+                     z_p, z_frac, *z_fin, int(passed)])
+        print(f"{trigger:>9s}/{collapse:<6s}  trig={frac.mean():.5f}  "
+              f"<s>={final[:,0].mean():.5f}  prunes={final[:,1].mean():.0f}  "
+              f"max|z|={worst:.2f}  {'PASS' if passed else 'FAIL'}")
+
+    os.makedirs(sim.OUTDIR_BASE, exist_ok=True)
+    with open(OUT, "w") as f:
+        f.write("trigger,collapse,trig_frac,final_mean_s,total_prunes,total_trace_R,"
+                "z_trig_vs_p,z_trig_frac,z_mean_s,z_prunes,z_trace_R,pass\n")
+        for r in rows:
+            f.write(",".join(str(x) for x in r) + "\n")
+    print("Wrote:", OUT)
+    return ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -1,14 +1,17 @@
 # plot_gamma_sweep_heatmap.py
 import os, numpy as np, matplotlib.pyplot as plt
+from ut26_results import sweep_table
 
 IN  = "ut26_cosmo3d_outputs/gamma_sweep.csv"
 OUT = "ut26_cosmo3d_outputs/Fig_gamma_sweep_heatmap.png"
 
-if not os.path.exists(IN):
-    raise FileNotFoundError(f"Missing sweep file: {IN} (run run_gamma_sweep.py first)")
-
 # load sweep
-data = np.genfromtxt(IN, delimiter=",", names=True)
+# sweep rows from the results store (ut26_results.py), else the csv
+data = sweep_table("gamma_sweep")
+if data is None:
+    if not os.path.exists(IN):
+        raise FileNotFoundError(f"Missing sweep file: {IN} (run run_gamma_sweep.py first)")
+    data = np.genfromtxt(IN, delimiter=",", names=True)
 A  = data['A']                      # drive amplitude
 W  = data['W']                      # angular frequency (rad/step)
 MS = data['final_mean_s']           # final mean coherence
@@ -42,6 +45,33 @@ median_prunes = np.nanmedian(Prunes)
 Collapse = (np.abs(MeanS - 0.5) > 0.001) | (Prunes < 0.9 * median_prunes)
 Collapse = Collapse.astype(float)  # 1/0 map
 
+# a REPLICATES=M sweep (run_gamma_sweep.py) also keeps every seed's runs: the
+# map is then the majority vote of the criterion applied to each seed's grid,
+# shaded by the share of seeds that agree (faded cells are seed-dependent)
+REPS = "ut26_cosmo3d_outputs/gamma_sweep_replicates.csv"
+Conf = np.ones_like(Collapse)
+n_seeds = 1
+if 'replicates' in data.dtype.names:
+    reps = sweep_table("gamma_sweep_replicates")
+    if reps is None and os.path.exists(REPS):
+        reps = np.genfromtxt(REPS, delimiter=",", names=True)
+    if reps is not None:
+        # rows are in point order, so point k sits at grid cell ij[k]
+        ij = [(np.flatnonzero(A_vals == a)[0], np.flatnonzero(f_vals == fv)[0])
+              for a, fv in zip(A, np.round(f, 6))]
+        votes = []
+        for seed in np.unique(reps['seed']):
+            r = reps[reps['seed'] == seed]
+            Pr_s = np.full_like(Prunes, np.nan)
+            MS_s = np.full_like(MeanS, np.nan)
+            for k, pr, ms in zip(r['point'].astype(int), r['total_prunes'], r['final_mean_s']):
+                Pr_s[ij[k]], MS_s[ij[k]] = pr, ms
+            votes.append((np.abs(MS_s - 0.5) > 0.001) | (Pr_s < 0.9 * np.nanmedian(Pr_s)))
+        P = np.mean(votes, axis=0)
+        Collapse = (P >= 0.5).astype(float)
+        Conf = np.maximum(P, 1 - P)
+        n_seeds = len(votes)
+
 # ---- plotting ----
 fig, ax = plt.subplots(1, 3, figsize=(14, 4.6))
 
@@ -71,10 +101,11 @@ c1.set_label("<s>")
 # Panel 3: refined collapse flag
 im2 = ax[2].imshow(Collapse, origin='lower', aspect='auto',
                    extent=[f_vals.min(), f_vals.max(), A_vals.min(), A_vals.max()],
-                   cmap='Greens', vmin=0, vmax=1)
+                   cmap='Greens', vmin=0, vmax=1, alpha=Conf)
 ax[2].set_xlabel("frequency f (cycles/step)")
 ax[2].set_ylabel("drive amplitude A")
-ax[2].set_title("Refined collapse (1=yes, 0=no)")
+ax[2].set_title("Refined collapse (1=yes, 0=no)" if n_seeds == 1 else
+                f"Refined collapse, majority of {n_seeds} seeds")
 c2 = fig.colorbar(im2, ax=ax[2], fraction=0.046, pad=0.04)
 c2.set_label("collapse")
 
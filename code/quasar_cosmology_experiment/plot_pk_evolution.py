@@ -0,0 +1,55 @@
+# plot_pk_evolution.py
+import os, sys, numpy as np, matplotlib.pyplot as plt
+from ut26_snapshots import read_snapshots, DATA_NAME
+
+BASE = "ut26_cosmo3d_outputs"
+
+# run folder from the command line, else the latest one with a snapshot series
+if len(sys.argv) > 1:
+    run_dir = sys.argv[1]
+else:
+    candidates = [d for d in os.listdir(BASE) if os.path.exists(os.path.join(BASE,d,DATA_NAME))]
+    if not candidates:
+        raise FileNotFoundError(f"No {DATA_NAME} found under {BASE}/ (run ut26_cosmo3d.py first)")
+    candidates.sort(key=lambda d: os.path.getmtime(os.path.join(BASE,d,DATA_NAME)))
+    run_dir = os.path.join(BASE, candidates[-1])
+
+snap = read_snapshots(run_dir)
+t = snap["t"]
+if len(t) == 0:
+    raise ValueError(f"Empty snapshot series in {run_dir}")
+# empty k-bins hold zero power; leave them out of the log plots
+Pk = np.where(snap["Pk"] > 0, snap["Pk"], np.nan)
+Pkappa = np.where(snap["Pkappa"] > 0, snap["Pkappa"], np.nan)
+colors = plt.cm.viridis(np.linspace(0.0, 1.0, len(t)))
+
+fig, ax = plt.subplots(1,3, figsize=(13,4.2))
+
+# Panel 1: P(k) at every snapshot
+for i in range(len(t)):
+    ax[0].loglog(snap["k"][1:], Pk[i,1:], color=colors[i], lw=1.2, label=f"t={t[i]}")
+ax[0].set_xlabel("k (grid units)")
+ax[0].set_ylabel("P(k)")
+ax[0].set_title("P(k,t) of delta_I")
+ax[0].legend(frameon=False, fontsize=7)
+
+# Panel 2: kappa spectrum at every snapshot
+for i in range(len(t)):
+    ax[1].loglog(snap["k2"][1:], Pkappa[i,1:], color=colors[i], lw=1.2)
+ax[1].set_xlabel("k (2D)")
+ax[1].set_ylabel("P_kappa")
+ax[1].set_title("kappa power spectrum over time")
+
+# Panel 3: <s>(t) and spatial entropy H(t)
+ax[2].plot(t, snap["mean_s"], lw=1.8, label="<s>")
+ax[2].plot(t, snap["H"], lw=1.8, label="H")
+ax[2].set_xlabel("time (steps)")
+ax[2].set_title("Mean coherence and entropy")
+ax[2].legend(frameon=False)
+
+plt.tight_layout()
+out_png = os.path.join(run_dir, "Fig_pk_evolution.png")
+plt.savefig(out_png, dpi=160)
+plt.close()
+print("wrote:", out_png)
+print("from:", run_dir)
@@ -1,32 +1,53 @@
 # plot_threshold_heatmap.py
 import os, numpy as np, matplotlib.pyplot as plt
+from ut26_results import sweep_table
 
 IN  = "ut26_cosmo3d_outputs/threshold_map.csv"
 OUT = "ut26_cosmo3d_outputs/Fig_threshold_map.png"
+BOUNDARY = "ut26_cosmo3d_outputs/threshold_boundary.csv"
 
-if not os.path.exists(IN):
-    raise FileNotFoundError(f"Missing sweep file: {IN} (run run_threshold_map.py first)")
-
-d = np.genfromtxt(IN, delimiter=",", names=True)
+# sweep rows from the results store (ut26_results.py), else the csv
+d = sweep_table("threshold_map")
+if d is None:
+    if not os.path.exists(IN):
+        raise FileNotFoundError(f"Missing sweep file: {IN} (run run_threshold_map.py first)")
+    d = np.genfromtxt(IN, delimiter=",", names=True)
 eta, lr, reg = d['eta'], d['lambdaR'], d['regime']
 
+# a REPLICATES=M sweep has the modal regime and its confidence (share of the
+# seeds that agree); cells are then shaded by it
+conf = d['confidence'] if 'confidence' in d.dtype.names else np.ones_like(reg)
+
 etas, lrs = np.unique(eta), np.unique(lr)
 H = np.full((len(etas), len(lrs)), np.nan)
+C = np.ones((len(etas), len(lrs)))
 for i,e in enumerate(etas):
     m = (eta==e)
-    lr_e, reg_e = lr[m], reg[m]
+    lr_e, reg_e, conf_e = lr[m], reg[m], conf[m]
     for j,L in enumerate(lrs):
         mm = (lr_e==L)
         if np.any(mm):
             H[i,j] = np.mean(reg_e[mm])
+            C[i,j] = np.mean(conf_e[mm])
 
 plt.figure(figsize=(6,5))
 im = plt.imshow(H, origin='lower', aspect='auto',
                 extent=[lrs.min(), lrs.max(), etas.min(), etas.max()],
-                cmap='viridis', vmin=0, vmax=2)
+                cmap='viridis', vmin=0, vmax=2, alpha=C)
 plt.xlabel("lambda_R (retention)"); plt.ylabel("eta* (collapse threshold)")
-plt.title("Goldilocks map: 0=fragile, 1=stable ceiling, 2=runaway")
+if 'confidence' in d.dtype.names:
+    plt.title(f"Goldilocks map over {int(d['replicates'][0])} seeds\n"
+              "0=fragile, 1=stable ceiling, 2=runaway (faded: seeds disagree)")
+else:
+    plt.title("Goldilocks map: 0=fragile, 1=stable ceiling, 2=runaway")
 plt.colorbar(im, fraction=0.046, pad=0.04)
+# regime boundaries of an ADAPTIVE=1 run_threshold_map.py, if there is one
+# (a later fixed-grid run removes them)
+if os.path.exists(BOUNDARY):
+    b = np.genfromtxt(BOUNDARY, delimiter=",", names=True, ndmin=1)
+    for k in np.unique(b['path']):
+        m = (b['path']==k)
+        plt.plot(b['lambdaR'][m], b['eta'][m], color='w', lw=1)
 plt.tight_layout()
 plt.savefig(OUT, dpi=160); plt.close()
 print("wrote:", OUT)
\ No newline at end of file
@@ -1,31 +1,51 @@
 # run_gamma_sweep.py
-import os, json, numpy as np
-from subprocess import run
+import os, numpy as np
 
 # Small, quick grid (expand if you want finer detail)
 amps    = [0.4, 0.6, 0.8, 1.0]        # DRIVE_A
 periods = [64, 32, 24, 16, 12, 8]     # steps per cycle
 Ws      = [2*np.pi/p for p in periods]  # DRIVE_W (rad/step)
 
-rows = []
-for A in amps:
-    for W, P in zip(Ws, periods):
-        tag = f"A{A}_P{P}"
-        env = os.environ.copy()
-        env["DRIVE_A"] = str(A)
-        env["DRIVE_W"] = str(W)
-        env["RUN_TAG"] = tag
-        print(">> Running", tag)
-        run(["python", "ut26_cosmo3d.py"], env=env, check=True)
-
-        with open(os.path.join("ut26_cosmo3d_outputs", tag, "summary.json")) as f:
-            s = json.load(f)
-
-        # simple collapse flag (tune if needed)
-        collapsed = float(s["final_mean_s"]) > 0.52
-        rows.append([A, W, P, s["final_mean_s"], s["total_prunes"], int(collapsed)])
-
-np.savetxt(os.path.join("ut26_cosmo3d_outputs", "gamma_sweep.csv"),
-           np.array(rows, dtype=float), delimiter=",",
-           header="A,W,P,final_mean_s,total_prunes,collapsed", comments="")
-print("Wrote: ut26_cosmo3d_outputs/gamma_sweep.csv")
\ No newline at end of file
+# ENSEMBLE=0 (default): full ut26_cosmo3d.py runs, SWEEP_WORKERS at a time in
+# a process pool (ut26_sweep.py), each writing its per-run outputs (pk.csv,
+# kappa, hmf.csv, halos; figures are deferred with FIGURES=0 unless set,
+# render them with ut26_figures.py); ENSEMBLE=1: the fast path, all points
+# advance together in one process (ut26_ensemble.py, summary metrics only)
+ENSEMBLE = os.getenv("ENSEMBLE", "0") == "1"
+os.environ.setdefault("FIGURES", "0")
+
+# REPLICATES=M: run every point with seeds SEED..SEED+M-1, the same seeds at
+# every point (common random numbers, ut26_replicates.py); gamma_sweep.csv
+# then holds the mean final_mean_s / total_prunes with 95% CIs, the modal
+# collapse flag, its probabilities p_0/p_1 and their confidence, and
+# gamma_sweep_replicates.csv every replicate
+
+points = [dict(DRIVE_A=A, DRIVE_W=W, P=P, RUN_TAG=f"A{A}_P{P}")
+          for A in amps for W, P in zip(Ws, periods)]
+# points with a finished run of the same configuration are not rerun
+# (RUN_CACHE=0 to force, see ut26_runcache.py)
+from ut26_sweep import iter_sweep, iter_ensemble, SweepTable
+from ut26_replicates import REPLICATES, replicate_sweep
+
+def run(points):
+    return iter_ensemble(points) if ENSEMBLE else iter_sweep(points)
+
+def row(pt, s):
+    # simple collapse flag (tune if needed)
+    collapsed = float(s["final_mean_s"]) > 0.52
+    return [pt["DRIVE_A"], pt["DRIVE_W"], pt["P"], s["final_mean_s"],
+            s.get("projected_total_prunes", s["total_prunes"]), int(collapsed)]
+
+HEADER = "A,W,P,final_mean_s,total_prunes,collapsed"
+PATH = os.path.join("ut26_cosmo3d_outputs", "gamma_sweep.csv")
+
+if REPLICATES > 1:
+    replicate_sweep(points, row, run, PATH, HEADER, ("final_mean_s", "total_prunes"),
+                    "collapsed", (0, 1))
+else:
+    # rows are appended as points finish (csv and results store, ut26_results.py);
+    # the csv is put in grid order at the end
+    table = SweepTable(PATH, HEADER)
+    for i, s in run(points):
+        table.add(i, row(points[i], s), s["OUTDIR"])
+    table.close()
\ No newline at end of file
@@ -1,37 +1,115 @@
 # run_threshold_map.py
-import os, json, numpy as np
-from subprocess import run
+import os
 
 etas = [0.40, 0.50, 0.55, 0.60, 0.70]  # ETA_THRESH
 lrs  = [0.10, 0.15, 0.20, 0.25, 0.30]  # LAMBDA_R
 
-rows = []
-for eta in etas:
-    for lr in lrs:
-        tag = f"eta{eta}_lr{lr}"
-        env = os.environ.copy()
-        env["ETA_THRESH"] = str(eta)
-        env["LAMBDA_R"]   = str(lr)
-        env["RUN_TAG"]    = tag
-        print(">> Running", tag)
-        run(["python", "ut26_cosmo3d.py"], env=env, check=True)
-
-        with open(os.path.join("ut26_cosmo3d_outputs", tag, "summary.json")) as f:
-            s = json.load(f)
-
-        ms = float(s["final_mean_s"])
-        pr = float(s["total_prunes"])
-        # Simple regime classifier (adjust thresholds if needed)
-        if pr < 1e5:
-            regime = 0  # fragile/dead
-        elif ms > 0.58 or ms < 0.42:
-            regime = 2  # runaway/drift
-        else:
-            regime = 1  # stable ceiling
-
-        rows.append([eta, lr, ms, pr, regime])
-
-np.savetxt(os.path.join("ut26_cosmo3d_outputs", "threshold_map.csv"),
-           np.array(rows, dtype=float), delimiter=",",
-           header="eta,lambdaR,final_mean_s,total_prunes,regime", comments="")
-print("Wrote: ut26_cosmo3d_outputs/threshold_map.csv")
\ No newline at end of file
+# ENSEMBLE=0 (default): full ut26_cosmo3d.py runs, SWEEP_WORKERS at a time in
+# a process pool (ut26_sweep.py), each writing its per-run outputs (pk.csv,
+# kappa, hmf.csv, halos; figures are deferred with FIGURES=0 unless set,
+# render them with ut26_figures.py); ENSEMBLE=1: the fast path, all points
+# advance together in one process (ut26_ensemble.py, summary metrics only)
+ENSEMBLE = os.getenv("ENSEMBLE", "0") == "1"
+os.environ.setdefault("FIGURES", "0")
+
+# ADAPTIVE=1: instead of the fixed grid, start from a REFINE_COARSE grid over
+# the same eta/lambda_R range and refine only the cells whose corners disagree
+# in regime (ut26_refine.py), REFINE_LEVELS halvings deep (4: a 97x65 lattice)
+# and at most REFINE_BUDGET runs; writes threshold_map_adaptive.csv (every
+# point with its refinement round) and threshold_boundary.csv (polylines).
+# The default 7x5 coarse grid (eta in steps of 0.05) contains the fixed grid,
+# so after a fixed-grid run only its 10 other points are new (run cache)
+ADAPTIVE      = os.getenv("ADAPTIVE", "0") == "1"
+_cx, _, _cy   = os.getenv("REFINE_COARSE", "7x5").partition("x")
+REFINE_COARSE = (int(_cx), int(_cy or _cx))
+REFINE_LEVELS = int(os.getenv("REFINE_LEVELS", 4))
+REFINE_BUDGET = int(os.getenv("REFINE_BUDGET", 0)) or None
+
+# REPLICATES=M: run every point with seeds SEED..SEED+M-1, the same seeds at
+# every point (common random numbers, ut26_replicates.py); threshold_map.csv
+# then holds the mean final_mean_s / total_prunes with 95% CIs, the modal
+# regime, the regime probabilities p_0..p_2 and their confidence, and
+# threshold_map_replicates.csv every replicate.  With ADAPTIVE=1 the modal
+# regime drives the refinement.
+
+# points with a finished run of the same configuration are not rerun
+# (RUN_CACHE=0 to force, see ut26_runcache.py)
+from ut26_sweep import iter_sweep, iter_ensemble, SweepTable
+from ut26_replicates import (REPLICATES, replicate_rows, replicate_sweep, aggregate,
+                             aggregate_header)
+
+def run(points):
+    return iter_ensemble(points) if ENSEMBLE else iter_sweep(points)
+
+def point(eta, lr):
+    return dict(ETA_THRESH=eta, LAMBDA_R=lr, RUN_TAG=f"eta{eta}_lr{lr}")
+
+def row(pt, s):
+    ms = float(s["final_mean_s"])
+    # a CONVERGE=1 run stops early; classify on its totals projected to T
+    pr = float(s.get("projected_total_prunes", s["total_prunes"]))
+    # Simple regime classifier (adjust thresholds if needed)
+    if pr < 1e5:
+        regime = 0  # fragile/dead
+    elif ms > 0.58 or ms < 0.42:
+        regime = 2  # runaway/drift
+    else:
+        regime = 1  # stable ceiling
+    return [pt["ETA_THRESH"], pt["LAMBDA_R"], ms, pr, regime]
+
+HEADER = "eta,lambdaR,final_mean_s,total_prunes,regime"
+VALUES = ("final_mean_s", "total_prunes")
+REGIMES = (0, 1, 2)
+BOUNDARY = os.path.join("ut26_cosmo3d_outputs", "threshold_boundary.csv")
+
+# plot_threshold_heatmap.py draws the boundary over threshold_map.csv, so the
+# boundary of an earlier ADAPTIVE=1 run goes when a fixed grid is rerun
+if not ADAPTIVE and os.path.exists(BOUNDARY):
+    os.remove(BOUNDARY)
+
+if not ADAPTIVE and REPLICATES > 1:
+    points = [point(eta, lr) for eta in etas for lr in lrs]
+    replicate_sweep(points, row, run, os.path.join("ut26_cosmo3d_outputs", "threshold_map.csv"),
+                    HEADER, VALUES, "regime", REGIMES)
+elif not ADAPTIVE:
+    points = [point(eta, lr) for eta in etas for lr in lrs]
+    # rows are appended as points finish (csv and results store, ut26_results.py);
+    # the csv is put in grid order at the end
+    table = SweepTable(os.path.join("ut26_cosmo3d_outputs", "threshold_map.csv"), HEADER)
+    for i, s in run(points):
+        table.add(i, row(points[i], s), s["OUTDIR"])
+    table.close()
+else:
+    from ut26_refine import Refiner
+    header = aggregate_header(HEADER, VALUES, "regime", REGIMES) if REPLICATES > 1 else HEADER
+    table = SweepTable(os.path.join("ut26_cosmo3d_outputs", "threshold_map_adaptive.csv"),
+                       header + ",round")
+    rounds = []
+
+    def evaluate(xy):
+        # one refinement round: run the new points, return their regimes
+        points = [point(eta, lr) for eta, lr in xy]
+        regimes = [None] * len(points)
+        offset = len(table.rows)
+        if REPLICATES > 1:
+            # label each point by its modal regime over the seeds
+            for i, reps in enumerate(replicate_rows(points, row, run)):
+                r = aggregate(reps, HEADER, VALUES, "regime", REGIMES)
+                regimes[i] = r[HEADER.count(",")]
+                table.add(offset + i, r + [len(rounds)])
+            rounds.append(len(points))
+            return regimes
+        for i, s in run(points):
+            r = row(points[i], s)
+            regimes[i] = r[-1]
+            table.add(offset + i, r + [len(rounds)], s["OUTDIR"])
+        rounds.append(len(points))
+        return regimes
+
+    ref = Refiner((min(etas), max(etas)), (min(lrs), max(lrs)), coarse=REFINE_COARSE,
+                  levels=REFINE_LEVELS, budget=REFINE_BUDGET).run(evaluate)
+    table.close()
+    ref.write_boundary(BOUNDARY, "eta", "lambdaR")
+    nx, ny = ref.nx + 1, ref.ny + 1
+    print(f"{len(ref.labels)} runs in {len(rounds)} rounds for a {nx}x{ny} lattice "
+          f"({100 * len(ref.labels) / (nx * ny):.0f}% of the full grid)")
@@ -0,0 +1,115 @@
+"""
+UT26 checkpoint / restart for the step-engine simulators
+
+A checkpoint lives in the run's OUTDIR as two files:
+
+    checkpoint_b.npy  the static bias field b, written once at the start of
+                      a run and memory-mapped on resume (p1 is rebuilt from it)
+    checkpoint.npz    s (state dtype), the collapse counter R_count, the
+                      logged time series and a JSON `meta` entry: config, next
+                      step, prune_count, R_total, the engine step counter and
+                      the RNG bit-generator state
+
+Both files are written to a temporary name, fsync'ed and moved into place
+with os.replace, so a job killed mid-write leaves the previous checkpoint
+intact.  checkpoint.npz is stored uncompressed by default: writing it is a
+memcpy of s and R_count (float32 state halves s), well below the cost of one
+step.  CHECKPOINT_COMPRESS=1 trades write time for size with zlib.
+
+Resuming restores every piece of state the step loop reads, so a resumed
+run continues bit-identically to an uninterrupted one.  The stored config
+must match the current one (T may differ, to extend a run).
+
+fork_checkpoint() copies a checkpoint into another run folder under that
+run's config, so runs that share their first steps (hysteresis branches with
+a common phase 1) resume from one simulated trunk.
+"""
+
+import os, json, shutil
+import numpy as np
+
+CKPT_NAME = "checkpoint.npz"
+BIAS_NAME = "checkpoint_b.npy"
+
+
+def atomic_write(path, write):
+    tmp = f"{path}.{os.getpid()}.tmp"      # per process: concurrent writers don't collide
+    with open(tmp, "wb") as f:
+        write(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def _rng_state(rng):
+    # a CounterRNG is stateless; its position is the engine step counter
+    bg = getattr(rng, "bit_generator", None)
+    return None if bg is None else bg.state
+
+
+def write_bias(outdir, b):
+    atomic_write(os.path.join(outdir, BIAS_NAME), lambda f: np.save(f, np.asarray(b)))
+
+
+def write_checkpoint(outdir, t_next, engine, rng, logs, config, compress=False):
+    """Write the state needed to continue the loop at step `t_next`."""
+    meta = dict(config=config, t_next=int(t_next), engine_t=int(engine.t),
+                prune_count=int(engine.prune_count), R_total=float(engine.R_total),
+                rng_state=_rng_state(rng))
+    arrays = dict(s=engine.s, R_count=engine.R_count, meta=np.array(json.dumps(meta)))
+    arrays.update({"log_" + k: np.asarray(v) for k, v in logs.items()})
+    save = np.savez_compressed if compress else np.savez
+    path = os.path.join(outdir, CKPT_NAME)
+    atomic_write(path, lambda f: save(f, **arrays))
+    return path
+
+
+def read_checkpoint(outdir, config):
+    """Load a checkpoint from `outdir`; raise if it was written for another
+    configuration (all keys except T must match)."""
+    path = os.path.join(outdir, CKPT_NAME)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"no checkpoint to resume from: {path}")
+    with np.load(path) as z:
+        meta = json.loads(str(z["meta"]))
+        # checkpoints written before R_count held the float trace as "R"
+        ck = dict(s=z["s"], R_count=z["R_count"] if "R_count" in z.files else z["R"],
+                  logs={k[4:]: z[k].tolist() for k in z.files if k.startswith("log_")})
+    stored = {k: v for k, v in meta["config"].items() if k != "T"}
+    current = {k: v for k, v in json.loads(json.dumps(config)).items() if k != "T"}
+    if stored != current:
+        diff = sorted(k for k in stored.keys() | current.keys()
+                      if stored.get(k) != current.get(k))
+        raise ValueError(f"checkpoint config mismatch in {diff}: {path}")
+    ck["b"] = np.load(os.path.join(outdir, BIAS_NAME), mmap_mode="r")
+    ck.update(meta)
+    return ck
+
+
+def fork_checkpoint(src, dst, config, files=()):
+    """Copy the checkpoint (and bias, plus `files`) from run folder `src` to
+    `dst`, relabelled with `config` so `dst` resumes from it."""
+    os.makedirs(dst, exist_ok=True)
+    with np.load(os.path.join(src, CKPT_NAME)) as z:
+        arrays = {k: z[k] for k in z.files}
+    meta = json.loads(str(arrays["meta"]))
+    meta["config"] = config
+    arrays["meta"] = np.array(json.dumps(meta))
+    atomic_write(os.path.join(dst, CKPT_NAME), lambda f: np.savez(f, **arrays))
+    for name in (BIAS_NAME,) + tuple(files):
+        if os.path.exists(os.path.join(src, name)):
+            shutil.copyfile(os.path.join(src, name), os.path.join(dst, name))
+    return meta["t_next"]
+
+
+def restore_engine(engine, rng, ck):
+    """Put the checkpointed counters, trace and RNG position into `engine`."""
+    count = ck["R_count"]
+    if count.dtype.kind == "f":
+        count = np.rint(count / engine.trace_cost)
+    np.copyto(engine.R_count, count, casting="unsafe")
+    engine.prune_count = ck["prune_count"]
+    engine.R_total     = ck["R_total"]
+    engine.t           = ck["engine_t"]
+    if ck["rng_state"] is not None:
+        rng.bit_generator.state = ck["rng_state"]
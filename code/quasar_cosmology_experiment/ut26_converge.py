@@ -0,0 +1,118 @@
+"""
+UT26 steady-state monitor for early termination (CONVERGE=1)
+
+Per step the simulator passes three fractions of the lattice:
+
+    mean_s      <s> (the mean the drift term uses)
+    trig_frac   triggered voxels / N³
+    prune_frac  voxels pruned this step / N³
+
+They oscillate with the Γ drive, so the monitor averages them over blocks
+of one drive period, P = round(2π/DRIVE_W) steps.  Blocks are aligned to end
+in phase with the last step T-1, so a run that stops at a block end sees the
+drive at the same phase as it would at T-1.  The run is stationary once the
+last CONVERGE_PERIODS block means of every quantity lie within CONVERGE_TOL
+of each other (max - min); update() then returns True and the caller stops
+after that step.
+
+Totals that keep growing after the plateau are projected to T with the
+window's mean rates:
+
+    projected_total_prunes  = prunes so far + prune rate × remaining steps
+    projected_total_trace_R = R_total so far + TRACE_COST × trigger rate × remaining
+
+With a non-constant drive schedule the monitor only looks at steps from
+`start` on (the tail where A and W no longer change, see ut26_schedule.py).
+
+The block means are kept as plain lists, so the monitor state can ride along
+in a checkpoint (state() / restore()).
+"""
+
+import math
+import numpy as np
+
+KEYS = ("mean_s", "trig_frac", "prune_frac")
+
+
+def drive_period(drive_w):
+    """Drive period in whole steps (1 for a static drive)."""
+    if drive_w == 0.0:
+        return 1
+    return max(1, int(round(2*math.pi / abs(drive_w))))
+
+
+class ConvergenceMonitor:
+    """Block-averaged stationarity test over whole drive periods."""
+
+    def __init__(self, drive_w, T, periods=3, tol=2e-3, start=0):
+        self.block   = drive_period(drive_w)
+        self.T       = int(T)
+        self.start   = int(start)
+        self.periods = int(periods)
+        self.tol     = float(tol)
+        self.acc     = [0.0, 0.0, 0.0]
+        self.n       = 0
+        self.blocks  = []           # last `periods` block means
+        self.stop_step = None
+        self.reason    = None
+
+    def update(self, t, mean_s, trig_frac, prune_frac):
+        """Add step t; True when the run is stationary and may stop after it."""
+        if t < self.start:
+            return False
+        acc = self.acc
+        acc[0] += mean_s; acc[1] += trig_frac; acc[2] += prune_frac
+        self.n += 1
+        if (self.T - 1 - t) % self.block:
+            return False
+        if self.n == self.block:    # a leading partial block is dropped
+            self.blocks.append([a / self.n for a in acc])
+            del self.blocks[:-self.periods]
+        self.acc = [0.0, 0.0, 0.0]
+        self.n = 0
+        if t >= self.T - 1 or len(self.blocks) < self.periods:
+            return False
+        spread = np.ptp(np.array(self.blocks), axis=0)
+        if (spread <= self.tol).all():
+            self.stop_step = int(t)
+            self.reason = (f"stationary over {self.periods} drive periods "
+                           f"({self.periods * self.block} steps): spread "
+                           + ", ".join(f"{k}={x:.1e}" for k, x in zip(KEYS, spread))
+                           + f" <= {self.tol:g}")
+            return True
+        return False
+
+    def rates(self):
+        """Window means of (mean_s, trig_frac, prune_frac)."""
+        return np.mean(np.array(self.blocks), axis=0)
+
+    def projected(self, t, n_vox, prune_count, R_total, trace_cost):
+        """(prunes, R_total) extrapolated from step t to the end of the run."""
+        rest = self.T - 1 - t
+        _, trig, prune = self.rates()
+        return (int(round(prune_count + prune * n_vox * rest)),
+                float(R_total + trace_cost * trig * n_vox * rest))
+
+    def state(self):
+        return [float(self.n)] + self.acc + [x for b in self.blocks for x in b]
+
+    def restore(self, state):
+        if not state:
+            return
+        self.n = int(state[0])
+        self.acc = list(state[1:4])
+        flat = state[4:]
+        self.blocks = [list(flat[i:i + 3]) for i in range(0, len(flat), 3)]
+
+
+def summary_fields(monitor, t_last, n_vox, prune_count, R_total, trace_cost):
+    """summary.json entries for a run that ended at step t_last."""
+    if monitor is None or monitor.stop_step is None:
+        out = dict(STOP_STEP=int(t_last), STOP_REASON="T reached")
+        if monitor is not None:
+            out.update(projected_total_prunes=int(prune_count),
+                       projected_total_trace_R=float(R_total))
+        return out
+    prunes, R = monitor.projected(monitor.stop_step, n_vox, prune_count, R_total, trace_cost)
+    return dict(STOP_STEP=monitor.stop_step, STOP_REASON=monitor.reason,
+                projected_total_prunes=prunes, projected_total_trace_R=R)
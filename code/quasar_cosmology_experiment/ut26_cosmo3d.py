@@ -8,28 +8,51 @@ UT26 Cosmology-Lite 3D Simulator (laptop friendly)
     Γ  : global periodic driver (sinusoid) – "gamma-like" cadence
     λR : return/retention + neighbor coupling (smoothing)
     η* : collapse threshold (drive + noise must exceed to trigger collapse)
+    The drive A(t) sin(W(t) t) follows a schedule (see ut26_schedule.py):
+    constant DRIVE_A/DRIVE_W by default, or DRIVE_SCHEDULE phases / ramps /
+    per-step arrays, or any DriveSchedule passed to main()
 - Effective gravity drift:  s += eps*( A*delta_I - B*dR_dt )
-- Substrate trace field R(x,t) accumulates Landauer-like entropy per collapse (Lemma)
+- Substrate trace field R(x,t) accumulates Landauer-like entropy per collapse (Lemma),
+  kept as a per-voxel collapse count (R = TRACE_COST * count, see ut26_trace.py)
 
 Observables:
 - Power spectrum P(k) of delta_I at final snapshot
+- P(k,t), kappa spectrum and entropy at every SNAP_EVERY step (snapshots.f32)
 - Weak-lensing-like projection (kappa) map and its power spectrum
-- Toy halo finder (FoF via connected-component labeling on thresholded delta_I)
-- Summary CSVs and PNGs
+- Toy halo finder (periodic FoF via connected-component labeling on thresholded
+  delta_I) with a halo catalogue (halos.npz)
+- Summary CSVs and PNGs; the PNGs are rendered from files in OUTDIR
+  (kappa_map.npy, timeseries.csv, ...) by ut26_figures.py, and FIGURES=0
+  leaves them to a later batch render
 
 Run:
     python ut26_cosmo3d.py
+    CHECKPOINT=1 python ut26_cosmo3d.py            # checkpoint every SNAP_EVERY
+    CHECKPOINT=1 python ut26_cosmo3d.py --resume   # continue from the last one
+    DRIVE_SCHEDULE=0.9x200,0.3x200 python ut26_cosmo3d.py   # T = 400, two phases
+    FIGURES=0 python ut26_cosmo3d.py; python ut26_figures.py   # render later
+    TIMING_TRACE=1 python ut26_cosmo3d.py --profile   # timing.jsonl + cProfile stats
 """
 
-import os, json
+import os, csv, json, argparse
 import numpy as np
-import matplotlib.pyplot as plt
 
-try:
-    from scipy.ndimage import label
-    SCIPY_OK = True
-except Exception:
-    SCIPY_OK = False
+from ut26_step import make_engine
+from ut26_rng import CounterRNG
+from ut26_ic import initial_field
+from ut26_spectra import radial_spectrum, radial_bins
+from ut26_snapshots import SnapshotSeries
+from ut26_lz import lz_complexity
+from ut26_checkpoint import (atomic_write, write_bias, write_checkpoint, read_checkpoint,
+                             restore_engine)
+from ut26_halos import SCIPY_OK, CATALOGUE_NAME, label_periodic, halo_catalogue, write_catalogue
+from ut26_trace import trace_dtype, write_trace, TraceProjections
+from ut26_converge import ConvergenceMonitor, summary_fields
+from ut26_schedule import parse_schedule
+from ut26_figures import KAPPA_NAME, write_series, render_run
+from ut26_timing import PhaseTimer, TRACE_NAME, profiled
+from ut26_runcache import code_version, digest, array_digest
+from ut26_results import record as record_result
 
 # ----------------------
 # Defaults
@@ -77,6 +100,80 @@ DRIVE_A     = float(os.getenv("DRIVE_A",    DRIVE_A))
 DRIVE_W     = float(os.getenv("DRIVE_W",    DRIVE_W))
 NOISE_STD   = float(os.getenv("NOISE_STD",  NOISE_STD))
 
+# Engine options (see ut26_step.py). The defaults "dense"/"noise" reproduce
+# the reference trajectories exactly; "sparse" draws collapse outcomes for
+# triggered voxels only, "bernoulli"/"binomial" sample the trigger set
+# directly instead of drawing the N³ noise cube.
+COLLAPSE_MODE = os.getenv("COLLAPSE_MODE", "dense").strip().lower()
+TRIGGER_MODE  = os.getenv("TRIGGER_MODE",  "noise").strip().lower()
+
+# Step backend: "numpy" or "numba" (fused multi-core kernels; falls back to
+# NumPy when numba is not installed)
+BACKEND = os.getenv("BACKEND", "numpy").strip().lower()
+
+# State precision: "float64" (reference) or "float32" (half the memory; the
+# drift mean, R_total and all final observables still accumulate in float64)
+PRECISION = os.getenv("PRECISION", "float64").strip().lower()
+if PRECISION not in ("float64", "float32"):
+    raise ValueError(f"PRECISION must be float64 or float32, got {PRECISION!r}")
+DTYPE = np.dtype(PRECISION)
+
+# Step random stream: "generator" (sequential numpy Generator, reference) or
+# "counter" (Philox keyed by seed/step/voxel/purpose, see ut26_rng.py; the
+# trajectory is then independent of collapse path, threads and slab layout)
+RNG_MODE = os.getenv("RNG", "generator").strip().lower()
+if RNG_MODE not in ("generator", "counter"):
+    raise ValueError(f"RNG must be generator or counter, got {RNG_MODE!r}")
+
+# Initial field (see ut26_ic.py): IC_METHOD "reference" (original full-grid
+# construction) or "rfft" (Hermitian half-grid noise, half the memory; a
+# different realisation). IC_CACHE=1 reuses fields from OUTDIR_BASE/ic_cache.
+IC_METHOD = os.getenv("IC_METHOD", "reference").strip().lower()
+if IC_METHOD not in ("reference", "rfft"):
+    raise ValueError(f"IC_METHOD must be reference or rfft, got {IC_METHOD!r}")
+IC_CACHE  = os.getenv("IC_CACHE", "1") == "1"
+IC_CACHE_DIR = os.path.join(OUTDIR_BASE, "ic_cache")
+
+# Checkpoints (see ut26_checkpoint.py): CHECKPOINT=1 writes s, R, b, RNG state,
+# counters and logs to OUTDIR at every snapshot; --resume continues from it.
+CHECKPOINT          = os.getenv("CHECKPOINT", "0") == "1"
+CHECKPOINT_COMPRESS = os.getenv("CHECKPOINT_COMPRESS", "0") == "1"
+
+# Snapshot series (see ut26_snapshots.py): SNAPSHOTS=1 appends <s>, H, P(k) and
+# the kappa spectrum at every SNAP_EVERY step to OUTDIR/snapshots.f32
+SNAPSHOTS = os.getenv("SNAPSHOTS", "1") == "1"
+N_KAPPA_BINS = 30
+
+# Halo finder (see ut26_halos.py): FoF groups are merged across the periodic
+# faces; FOF_PERIODIC=0 restores the open-boundary labelling
+FOF_PERIODIC = os.getenv("FOF_PERIODIC", "1") == "1"
+
+# Early termination (see ut26_converge.py): CONVERGE=1 stops once <s>, the
+# trigger fraction and the prune rate are stationary within CONVERGE_TOL over
+# CONVERGE_PERIODS drive periods; summary.json records STOP_STEP/STOP_REASON
+CONVERGE         = os.getenv("CONVERGE", "0") == "1"
+CONVERGE_PERIODS = int(os.getenv("CONVERGE_PERIODS", 3))
+CONVERGE_TOL     = float(os.getenv("CONVERGE_TOL", 2e-3))
+
+# Γ drive schedule (see ut26_schedule.py): empty for the constant DRIVE_A,
+# DRIVE_W drive; otherwise phases "A x steps" / ramps "A0:A1 x steps" joined by
+# commas, or a .npy/.csv file of per-step amplitudes. A finite schedule sets T;
+# A(t) and W(t) at each snapshot go to OUTDIR/DRIVE_CSV.
+DRIVE_SCHEDULE = os.getenv("DRIVE_SCHEDULE", "").strip()
+if DRIVE_SCHEDULE:
+    T = parse_schedule(DRIVE_SCHEDULE, DRIVE_A, DRIVE_W).length or T
+DRIVE_CSV = "drive.csv"
+
+# Figures (see ut26_figures.py): FIGURES=0 writes only the raw arrays behind
+# them (kappa map, spectra, HMF, time series) and never imports matplotlib
+FIGURES = os.getenv("FIGURES", "1") == "1"
+
+# Instrumentation (see ut26_timing.py): wall time per phase, steps/sec and peak
+# RSS always go into summary.json ("timing"); TIMING_TRACE=1 adds a per-step
+# OUTDIR/timing.jsonl, PROFILE=1 (or --profile) runs main() under cProfile
+TIMING_TRACE = os.getenv("TIMING_TRACE", "0") == "1"
+PROFILE      = os.getenv("PROFILE", "0") == "1"
+
 # Unique output folder per run (sanitise any stray whitespace or slashes)
 RUN_TAG = os.getenv(
     "RUN_TAG",
@@ -90,55 +187,26 @@ OUTDIR  = os.path.join(OUTDIR_BASE, RUN_TAG)
 # ----------------------
 rng = np.random.default_rng(SEED)
 
+def sim_params():
+    return dict(
+        BETA=BETA, LAMBDA_R=LAMBDA_R, ETA_THRESH=ETA_THRESH, NOISE_STD=NOISE_STD,
+        TRACE_COST=TRACE_COST, EPS_DRIFT=EPS_DRIFT, A_GROW=A_GROW, B_DAMP=B_DAMP
+    )
+
 def ensure():
     os.makedirs(OUTDIR, exist_ok=True)
 
-def kgrid(n):
-    k = np.fft.fftfreq(n)*n
-    kx, ky, kz = np.meshgrid(k, k, k, indexing='ij')
-    return np.sqrt(kx**2 + ky**2 + kz**2)
-
-def bao_like_P0(kk):
-    P_smooth = (kk + 1e-12)**NS_INDEX * np.exp(-(kk*K0_CUTOFF)**2)
-    wiggle   = 1.0 + BAO_A * np.sin(kk * (BAO_R/800.0)) * np.exp(-(kk*BAO_SIG*10.0)**2)
-    return P_smooth * wiggle
+def ic_spectrum():
+    return dict(NS_INDEX=NS_INDEX, K0_CUTOFF=K0_CUTOFF, BAO_A=BAO_A, BAO_R=BAO_R, BAO_SIG=BAO_SIG)
 
 def gaussian_field_from_P0(n):
-    kk  = kgrid(n)
-    P0  = bao_like_P0(kk)
-    amp = np.sqrt(np.maximum(P0, 0.0)) / np.sqrt(2.0)
-    pr  = rng.normal(size=(n,n,n))
-    pi  = rng.normal(size=(n,n,n))
-    F   = amp * (pr + 1j*pi)
-    F[0,0,0] = 0.0
-    field = np.fft.ifftn(F).real
-    field -= field.mean()
-    field /= (field.std() + 1e-12)
-    return field
-
-def neighbor_mean_3d(arr):
-    up    = np.roll(arr, -1, axis=0)
-    down  = np.roll(arr,  1, axis=0)
-    left  = np.roll(arr, -1, axis=1)
-    right = np.roll(arr,  1, axis=1)
-    front = np.roll(arr, -1, axis=2)
-    back  = np.roll(arr,  1, axis=2)
-    return (up + down + left + right + front + back) / 6.0
+    # see ut26_ic.py; read-only memory map on an IC cache hit
+    return initial_field(n, rng, ic_spectrum(), method=IC_METHOD,
+                         cache_dir=IC_CACHE_DIR if IC_CACHE else None)
 
 def power_spectrum(delta):
-    n  = delta.shape[0]
-    dk = np.fft.fftn(delta)
-    pk3d = (dk*dk.conjugate()).real
-    kk = kgrid(n)
-    edges = np.linspace(0.0, kk.max(), N_SPECTRAL_BINS+1)
-    Pk = np.zeros(N_SPECTRAL_BINS); Nk = np.zeros(N_SPECTRAL_BINS, dtype=int)
-    inds = np.digitize(kk.ravel(), edges) - 1
-    for i in range(N_SPECTRAL_BINS):
-        m = (inds == i)
-        Nk[i] = int(m.sum())
-        if Nk[i] > 0:
-            Pk[i] = pk3d.ravel()[m].mean()
-    kmid = 0.5*(edges[:-1] + edges[1:])
+    # rfftn + cached bins, one bincount pass (see ut26_spectra.py)
+    kmid, Pk, _, _ = radial_spectrum(delta, N_SPECTRAL_BINS)
     return kmid, Pk
 
 def weak_lensing_kappa(delta):
@@ -147,29 +215,36 @@ def weak_lensing_kappa(delta):
     kappa /= (kappa.std() + 1e-12)
     return kappa
 
+def kappa_power_spectrum(kappa, nbins=N_KAPPA_BINS):
+    km2, P2, _, _ = radial_spectrum(kappa, nbins)
+    return km2, P2
+
+def snapshot_spectra(s, ms):
+    # P(k) and P_kappa of delta = s - <s> in float64, as for the final field
+    delta = np.subtract(s, ms, dtype=np.float64)
+    _, Pk = power_spectrum(delta)
+    _, P2 = kappa_power_spectrum(weak_lensing_kappa(delta))
+    return Pk, P2
+
+def fof_labels(delta_thr_mask):
+    # 6-connected components, merged across the faces when FOF_PERIODIC
+    return label_periodic(delta_thr_mask, axes=(0, 1, 2) if FOF_PERIODIC else ())
+
 def fof_halos(delta_thr_mask):
     if not SCIPY_OK:
         return []
-    structure = np.zeros((3,3,3), dtype=int)
-    structure[1,1,0] = structure[1,1,2] = 1
-    structure[1,0,1] = structure[1,2,1] = 1
-    structure[0,1,1] = structure[2,1,1] = 1
-    lab, nlab = label(delta_thr_mask, structure)
-    sizes = []
-    for i in range(1, nlab+1):
-        sizes.append(int((lab==i).sum()))
-    return sizes
+    lab, nlab = fof_labels(delta_thr_mask)
+    return np.bincount(lab.ravel(), minlength=nlab+1)[1:].tolist()
+
+def halo_mass_function(sizes):
+    bins = np.logspace(np.log10(MASS_MIN), np.log10(max(sizes)), 16)
+    hist, edges = np.histogram(sizes, bins=bins)
+    centers = np.sqrt(edges[:-1]*edges[1:])
+    return centers, hist
 
 def binary_lz_complexity(bits):
-    b = bytes(bits.astype(np.uint8).tolist())
-    seen = set(); i = 0; c = 0; n = len(b)
-    while i < n:
-        j = i+1
-        while j <= n and b[i:j] in seen:
-            j += 1
-        seen.add(b[i:j]); c += 1; i = j
-    if n < 2: return float(n)
-    return c / (n / np.log(n + 1))
+    # LZ78 phrase count via a binary trie, linear time (see ut26_lz.py)
+    return lz_complexity(bits)
 
 def spatial_entropy(s, bins=32):
     hist,_ = np.histogram(s.ravel(), bins=bins, range=(0.0,1.0))
@@ -177,10 +252,64 @@ def spatial_entropy(s, bins=32):
     p = p[p>0]
     return float(-(p*np.log2(p)).sum() / np.log2(bins))
 
+def drive_schedule():
+    return parse_schedule(DRIVE_SCHEDULE, DRIVE_A, DRIVE_W)
+
+def schedule_config(schedule):
+    if schedule.constant:
+        return {}
+    return dict(DRIVE_SCHEDULE=schedule.describe())
+
+def run_config(schedule=None):
+    # everything that determines the trajectory; checked on --resume
+    return dict(N=N, T=T, SEED=SEED, SNAP_EVERY=SNAP_EVERY, DRIVE_A=DRIVE_A, DRIVE_W=DRIVE_W,
+                **schedule_config(schedule or drive_schedule()),
+                COLLAPSE_MODE=COLLAPSE_MODE, TRIGGER_MODE=TRIGGER_MODE,
+                PRECISION=PRECISION, RNG=RNG_MODE, IC_METHOD=IC_METHOD, **converge_config(),
+                **sim_params())
+
+def effective_config(schedule=None):
+    # run_config() plus everything else that shapes the outputs, and the code
+    # version; its hash addresses cached runs (see ut26_runcache.py)
+    schedule = schedule or drive_schedule()
+    config = dict(run_config(schedule), **ic_spectrum(), N_SPECTRAL_BINS=N_SPECTRAL_BINS,
+                  N_KAPPA_BINS=N_KAPPA_BINS, DELTA_THR=DELTA_THR, MASS_MIN=MASS_MIN,
+                  FOF_PERIODIC=FOF_PERIODIC, SNAPSHOTS=SNAPSHOTS, BACKEND=BACKEND,
+                  CODE_VERSION=code_version())
+    if not schedule.constant:
+        drive = np.array([(schedule.A(t), schedule.W(t)) for t in range(T)], dtype=np.float64)
+        config["DRIVE_DIGEST"] = array_digest(drive)
+    return config
+
+def config_hash(schedule=None):
+    return digest(effective_config(schedule))
+
+def converge_config():
+    if not CONVERGE:
+        return {}
+    return dict(CONVERGE_PERIODS=CONVERGE_PERIODS, CONVERGE_TOL=CONVERGE_TOL)
+
+def convergence_monitor(drive_w=None, schedule=None):
+    # with a varying schedule, only its constant tail is tested
+    if not CONVERGE:
+        return None
+    start = 0
+    if schedule is not None and not schedule.constant:
+        drive_w, start = schedule.W(T - 1), schedule.steady_from(T)
+    return ConvergenceMonitor(DRIVE_W if drive_w is None else drive_w, T,
+                              periods=CONVERGE_PERIODS, tol=CONVERGE_TOL, start=start)
+
 # ----------------------
 # Main
 # ----------------------
-def main():
+def main(resume=False, schedule=None, extra=None, until=None):
+    # schedule: a ut26_schedule.DriveSchedule (default: DRIVE_SCHEDULE / DRIVE_A,
+    # DRIVE_W); extra: additional summary.json entries; until: stop before
+    # that step and leave a checkpoint there instead of the final observables
+    # (the shared trunk of warm-started branches, see ut26_cosmo3d_hysteresis.py).
+    # Returns the summary.json dict (None when stopping at `until`).
+    schedule = schedule or drive_schedule()
+    timer = PhaseTimer()
     ensure()
     print("UT26 Cosmology-Lite 3D simulator")
     print(f"N={N}, T={T}, output -> {OUTDIR}")
@@ -190,64 +319,121 @@ def main():
     print("  ETA_THRESH=", ETA_THRESH)
     print("  DRIVE_A   =", DRIVE_A)
     print("  DRIVE_W   =", DRIVE_W)
+    if not schedule.constant:
+        print("  SCHEDULE  =", schedule.describe())
     print("  NOISE_STD =", NOISE_STD)
-
-    # Seed bias field b(x) from initial Gaussian field (smoothed, normalized to [-1,1])
-    raw = gaussian_field_from_P0(N)
-    b   = raw / (np.max(np.abs(raw)) + 1e-12)
-
-    # Initial coherence s in [0,1]
-    s = 0.5 + 0.1*raw
-    s = np.clip(s, 0.0, 1.0)
-
-    # Substrate trace & loggers
-    R = np.zeros_like(s)
-    R_total = 0.0
-    times, mean_s, H_log, C_log, prunes_log = [], [], [], [], []
-    prune_count = 0
-
-    for t in range(T):
-        # Γ driver + noise
-        drive_t = DRIVE_A * np.sin(DRIVE_W * t)
-        noise   = rng.normal(0.0, NOISE_STD, size=(N,N,N))
-
-        # collapse mask
-        trig = (np.abs(drive_t) + np.abs(noise)) > ETA_THRESH
-
-        if np.any(trig):
-            # collapse via β-softmax
-            p1 = 1.0 / (1.0 + np.exp(-BETA * b))
-            outcome = (rng.random(size=(N,N,N)) < p1).astype(float)
-
-            pruned_local = ((p1 > 0.5) & (outcome < 0.5)) | ((p1 < 0.5) & (outcome > 0.5))
-            prune_count += int(pruned_local[trig].sum())
-
-            s[trig]  = outcome[trig]
-            R[trig] += TRACE_COST
-            R_total += TRACE_COST * float(trig.sum())
-
-        # return: neighbor coupling (λR)
-        notrig = ~trig
-        if np.any(notrig):
-            s_nb = neighbor_mean_3d(s)
-            s[notrig] = np.clip(s[notrig] + LAMBDA_R*(s_nb[notrig] - s[notrig]), 0.0, 1.0)
-
-        # effective drift
-        delta_I = s - s.mean()
-        dR_dt   = TRACE_COST * trig.astype(float)
-        s += EPS_DRIFT * (A_GROW*delta_I - B_DAMP*dR_dt)
-        s = np.clip(s, 0.0, 1.0)
+    print("  COLLAPSE  =", COLLAPSE_MODE)
+    print("  TRIGGER   =", TRIGGER_MODE)
+    print("  PRECISION =", PRECISION)
+    print("  BACKEND   =", BACKEND)
+    print("  RNG       =", RNG_MODE)
+    print("  IC        =", IC_METHOD, "(cached)" if IC_CACHE else "")
+
+    config = run_config(schedule)
+    ck = read_checkpoint(OUTDIR, config) if resume else None
+    # the folder's summary.json is only ever that of the run finished last in it
+    if os.path.exists(os.path.join(OUTDIR, "summary.json")):
+        os.remove(os.path.join(OUTDIR, "summary.json"))
+    if ck is not None:
+        print(f"Resuming from checkpoint at t={ck['t_next']}")
+        b, s = ck["b"], ck["s"]
+    else:
+        # Seed bias field b(x) from initial Gaussian field (smoothed, normalized to [-1,1])
+        raw = gaussian_field_from_P0(N)
+        b   = raw / (np.max(np.abs(raw)) + 1e-12)
+
+        # Initial coherence s in [0,1]
+        s = 0.5 + 0.1*raw
+        s = np.clip(s, 0.0, 1.0).astype(DTYPE, copy=False)
+        del raw
+        if CHECKPOINT or resume or until is not None:
+            write_bias(OUTDIR, b)
+
+    # Substrate trace & loggers (collapse counter R_count, R_total, prune_count
+    # live in the engine)
+    step_rng = CounterRNG(SEED) if RNG_MODE == "counter" else rng
+    engine = make_engine(s, b, sim_params(), step_rng, backend=BACKEND,
+                         collapse=COLLAPSE_MODE, trigger=TRIGGER_MODE,
+                         R_count=np.zeros(s.shape, dtype=trace_dtype(T)))
+    engine.timer = timer
+    logs = dict(times=[], mean_s=[], H=[], C=[], prunes=[])
+    t0 = 0
+    monitor = convergence_monitor(schedule=schedule) if until is None else None
+    if ck is not None:
+        restore_engine(engine, step_rng, ck)
+        logs.update(ck["logs"])
+        t0 = ck["t_next"]
+        if monitor is not None:
+            monitor.restore(logs.pop("converge", None))
+    times, mean_s, H_log, C_log, prunes_log = (logs["times"], logs["mean_s"], logs["H"],
+                                               logs["C"], logs["prunes"])
+    prune_count, R_total = engine.prune_count, engine.R_total
+    series = None
+    if SNAPSHOTS:
+        series = SnapshotSeries(OUTDIR, radial_bins((N, N, N), N_SPECTRAL_BINS).kmid,
+                                radial_bins((N, N), N_KAPPA_BINS).kmid,
+                                resume_t=t0 if resume else None)
+    trace_proj = TraceProjections(OUTDIR, TRACE_COST, resume_t=t0 if resume else None)
+    if TIMING_TRACE:
+        timer.open_trace(os.path.join(OUTDIR, TRACE_NAME), resume_t=t0 if resume else None)
+
+    t_last = T - 1
+    for t in range(t0, T if until is None else until):
+        # Γ driver + noise -> collapse -> return (λR) -> effective drift,
+        # all in place on preallocated buffers (see ut26_step.py)
+        drive_t = schedule.drive(t)
+        last_prunes = engine.prune_count
+        timer.begin_step()
+        engine.step(drive_t)
+        timer.end_step(t, engine.n_trig)
+        prune_count, R_total = engine.prune_count, engine.R_total
+        stop = monitor is not None and monitor.update(
+            t, engine.mean_s, engine.n_trig / s.size, (prune_count - last_prunes) / s.size)
 
         # record
-        if (t % SNAP_EVERY == 0) or (t == T-1):
+        if (t % SNAP_EVERY == 0) or (t == T-1) or stop:
+            timer.mark()
             H = spatial_entropy(s, bins=32)
-            bits = (s.ravel() > 0.5).astype(int)
+            bits = s.ravel() > 0.5
             C = binary_lz_complexity(bits)
-            times.append(t); mean_s.append(float(s.mean()))
+            ms = float(s.mean(dtype=np.float64))
+            times.append(t); mean_s.append(ms)
             H_log.append(H); C_log.append(C); prunes_log.append(prune_count)
-            print(f"[{t:4d}] mean s={s.mean():.3f}  R_total={R_total:.1f}  pruned={prune_count}")
-
-    # ----- Final observables -----
+            spectra = snapshot_spectra(s, ms) if series is not None else None
+            timer.lap("observables")
+            if series is not None:
+                series.append(t, ms, H, *spectra)
+            trace_proj.append(t, engine.R_count)
+            print(f"[{t:4d}] mean s={ms:.3f}  R_total={R_total:.1f}  pruned={prune_count}")
+            if CHECKPOINT or resume:
+                ck_logs = logs if monitor is None else dict(logs, converge=monitor.state())
+                write_checkpoint(OUTDIR, t + 1, engine, step_rng, ck_logs, config,
+                                 compress=CHECKPOINT_COMPRESS)
+            timer.lap("io")
+        if stop:
+            t_last = t
+            print(f"Converged at t={t}: {monitor.reason}")
+            break
+
+    if until is not None:
+        path = write_checkpoint(OUTDIR, until, engine, step_rng, logs, config,
+                                compress=CHECKPOINT_COMPRESS)
+        print(f"Stopped before t={until}; checkpoint: {path}")
+        timer.close()
+        return
+
+    # ----- Final observables (always float64) -----
+    timer.mark()
+    write_trace(OUTDIR, engine.R_count, TRACE_COST, t_last + 1)
+    if not schedule.constant:
+        with open(os.path.join(OUTDIR, DRIVE_CSV), "w", newline="") as f:
+            w = csv.writer(f)
+            w.writerow(["t", "A", "mean_s", "prunes", "W"])
+            for t, ms, pr in zip(times, mean_s, prunes_log):
+                w.writerow([t, schedule.A(t), ms, pr, schedule.W(t)])
+    timer.lap("io")
+
+    s = s.astype(np.float64, copy=False)
     delta = s - s.mean()
 
     # P(k)
@@ -257,96 +443,96 @@ def main():
 
     # kappa map + spectrum
     kappa = weak_lensing_kappa(delta)
-    plt.figure(figsize=(5,4))
-    plt.imshow(kappa.T, origin="lower", cmap="viridis")
-    plt.colorbar(label="kappa (proj. delta)")
-    plt.title("Weak-lensing-like κ (projection)")
-    plt.tight_layout()
-    plt.savefig(os.path.join(OUTDIR,"kappa_map.png"), dpi=140)
-    plt.close()
-
-    ky = np.fft.fftfreq(kappa.shape[0])*kappa.shape[0]
-    kx = np.fft.fftfreq(kappa.shape[1])*kappa.shape[1]
-    KX, KY = np.meshgrid(kx, ky, indexing="ij")
-    K = np.sqrt(KX**2 + KY**2)
-    edges = np.linspace(0, K.max(), 30+1)
-    FTk = np.fft.fft2(kappa)
-    PS2 = (FTk*FTk.conjugate()).real
-    P2 = np.zeros(30); N2 = np.zeros(30, dtype=int)
-    idx = np.digitize(K.ravel(), edges) - 1
-    for i in range(30):
-        m = (idx == i)
-        N2[i] = int(m.sum())
-        if N2[i] > 0: P2[i] = PS2.ravel()[m].mean()
-    km2 = 0.5*(edges[:-1]+edges[1:])
+    np.save(os.path.join(OUTDIR, KAPPA_NAME), kappa)
+    km2, P2 = kappa_power_spectrum(kappa)
     np.savetxt(os.path.join(OUTDIR,"kappa_ps.csv"), np.c_[km2,P2],
                delimiter=",", header="k,Pkappa", comments="")
-    plt.figure(figsize=(5,4))
-    plt.plot(km2, P2, lw=1.7)
-    plt.xlabel("k (2D)"); plt.ylabel("P_kappa")
-    plt.title("κ power spectrum (toy)")
-    plt.grid(alpha=0.3)
-    plt.tight_layout()
-    plt.savefig(os.path.join(OUTDIR,"kappa_ps.png"), dpi=140)
-    plt.close()
-
-    # HMF (toy FoF)
+
+    # HMF (toy FoF) + halo catalogue (see ut26_halos.py)
     if SCIPY_OK:
-        msk = (delta > DELTA_THR)
-        sizes = [sz for sz in fof_halos(msk) if sz >= MASS_MIN]
+        lab, nlab = fof_labels(delta > DELTA_THR)
+        cat = halo_catalogue(lab, nlab, delta)
+        del lab
+        write_catalogue(os.path.join(OUTDIR, CATALOGUE_NAME), cat)
+        sizes = [int(sz) for sz in cat["size"] if sz >= MASS_MIN]
         if sizes:
-            bins = np.logspace(np.log10(MASS_MIN), np.log10(max(sizes)), 16)
-            hist, edges = np.histogram(sizes, bins=bins)
-            centers = np.sqrt(edges[:-1]*edges[1:])
+            centers, hist = halo_mass_function(sizes)
             np.savetxt(os.path.join(OUTDIR,"hmf.csv"), np.c_[centers, hist],
                        delimiter=",", header="mass,counts", comments="")
-            plt.figure(figsize=(5,4))
-            plt.loglog(centers, np.maximum(hist,1e-6), marker='o')
-            plt.xlabel("halo cell count (proxy mass)")
-            plt.ylabel("counts"); plt.title("Toy HMF (connected components)")
-            plt.grid(alpha=0.3, which="both")
-            plt.tight_layout()
-            plt.savefig(os.path.join(OUTDIR,"hmf.png"), dpi=140)
-            plt.close()
-
-    # summary triptych
-    plt.figure(figsize=(12,4))
-    plt.subplot(1,3,1)
-    plt.plot(times, mean_s, lw=1.7); plt.grid(alpha=0.3)
-    plt.xlabel("time"); plt.ylabel("<s>"); plt.title("Mean coherence (saturation)")
-
-    plt.subplot(1,3,2)
-    plt.plot(times, H_log, label="H"); plt.plot(times, C_log, label="C"); plt.grid(alpha=0.3)
-    plt.xlabel("time"); plt.title("H, C over time"); plt.legend()
-
-    plt.subplot(1,3,3)
-    plt.plot(times, prunes_log, lw=1.7); plt.grid(alpha=0.3)
-    plt.xlabel("time"); plt.ylabel("cumulative prunes"); plt.title("Lawful pruning")
-
-    plt.tight_layout()
-    plt.savefig(os.path.join(OUTDIR,"summary.png"), dpi=150)
-    plt.close()
+
+    timer.lap("observables")
+
+    # time series behind the summary triptych, then the figures
+    write_series(OUTDIR, times, mean_s, H_log, C_log, prunes_log)
+    timer.lap("io")
+    if FIGURES:
+        render_run(OUTDIR)
+        timer.lap("figures")
+    timer.close()
 
     # summary JSON (with parameters logged)
     summary = dict(
         N=N, T=T, seed=SEED,
         BETA=BETA, LAMBDA_R=LAMBDA_R, ETA_THRESH=ETA_THRESH,
         DRIVE_A=DRIVE_A, DRIVE_W=DRIVE_W, NOISE_STD=NOISE_STD,
+        **schedule_config(schedule),
+        **(extra or {}),
         final_mean_s=float(mean_s[-1]),
         total_trace_R=float(R_total),
         total_prunes=int(prune_count),
+        **summary_fields(monitor, t_last, s.size, prune_count, R_total, TRACE_COST),
+        CONVERGE=CONVERGE, **converge_config(),
+        COLLAPSE_MODE=COLLAPSE_MODE,
+        TRIGGER_MODE=TRIGGER_MODE,
+        PRECISION=PRECISION,
+        BACKEND=engine.backend,
+        RNG=RNG_MODE,
+        IC_METHOD=IC_METHOD,
+        FOF_PERIODIC=FOF_PERIODIC,
         SCIPY_OK=SCIPY_OK,
+        FIGURES=FIGURES,
+        CODE_VERSION=code_version(),
+        CONFIG_HASH=config_hash(schedule),
+        timing=timer.report(),
         OUTDIR=OUTDIR
     )
-    with open(os.path.join(OUTDIR,"summary.json"), "w") as f:
-        json.dump(summary, f, indent=2)
+    # written last and atomically: its CONFIG_HASH marks the run as finished
+    atomic_write(os.path.join(OUTDIR,"summary.json"),
+                 lambda f: f.write(json.dumps(summary, indent=2).encode()))
+    record_result(summary)      # results store (ut26_results.py)
 
     print("\n=== Done ===")
     print("Outputs in:", OUTDIR)
-    print(" - pk.csv, kappa_map.png, kappa_ps.png, hmf.csv (if scipy available)")
-    print(" - summary.png, summary.json")
+    if FIGURES:
+        print(" - pk.csv, kappa_map.png, kappa_ps.png, hmf.csv + halos.npz (if scipy available)")
+        print(" - summary.png, summary.json")
+    else:
+        print(" - pk.csv, kappa_ps.csv, hmf.csv + halos.npz (if scipy available), summary.json")
+        print(" - figures deferred: python ut26_figures.py", OUTDIR)
+    print(" - kappa_map.npy, timeseries.csv (raw inputs of the figures)")
+    if TIMING_TRACE:
+        print(" - timing.jsonl (per-step phase times)")
+    steps_per_sec = summary["timing"]["steps_per_sec"]
+    if steps_per_sec:
+        print(f"{summary['timing']['steps']} steps at {steps_per_sec:.1f} steps/s, "
+              f"peak RSS {summary['timing']['peak_rss_mb']} MiB")
+    if not schedule.constant:
+        print(f" - {DRIVE_CSV} (A, W, <s>, prunes per snapshot)")
+    print(" - trace.npz, trace_proj.npz (collapse counts; R = TRACE_COST * count)")
+    if series is not None:
+        print(" - snapshots.f32 + snapshots.json (P(k,t), P_kappa(k,t), <s>, H per snapshot)")
+    return summary
 
 # ----------------------
 if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="UT26 Cosmology-Lite 3D simulator")
+    ap.add_argument("--resume", action="store_true",
+                    help="continue from the checkpoint in OUTDIR (implies CHECKPOINT=1)")
+    ap.add_argument("--profile", action="store_true",
+                    help="run under cProfile; profile.pstats/profile.txt go to OUTDIR")
+    args = ap.parse_args()
     ensure()
-    main()
\ No newline at end of file
+    if args.profile or PROFILE:
+        profiled(main, OUTDIR, resume=args.resume)
+    else:
+        main(resume=args.resume)
\ No newline at end of file
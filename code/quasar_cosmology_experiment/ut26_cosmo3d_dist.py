@@ -0,0 +1,430 @@
+"""
+UT26 Cosmology-Lite 3D Simulator — domain-decomposed multi-process mode
+
+Same physics as ut26_cosmo3d.py, for grids that do not fit the single-process
+working set (N >= 512).  The periodic lattice is split into axis-0 slabs, one
+per worker process:
+
+- s, the collapse counter R_count and the bias field b live in shared memory; each worker owns and
+  updates only its slab, with private work buffers sized to the slab
+- per step: trigger + collapse on the slab -> barrier -> copy the one-voxel
+  ghost planes above/below the slab from the neighbouring owners -> barrier
+  -> λR return on the slab -> slab sums -> barrier -> global <s> -> drift
+- final observables are computed from the distributed field:
+    P(k)  : slab rfft2 over axes (1,2) into a shared half-spectrum buffer,
+            then each worker FFTs a block of axis-1 columns along axis 0 and
+            bins |F|² with Hermitian weights; partial (ΣP, Nk) are reduced
+    κ     : each worker projects its slab rows (sum over axis 2)
+    trace : the shared collapse counter goes to trace.npz; its axis-2
+            projection is assembled from slab rows at every snapshot
+    FoF   : slab-local connected components (periodic in axes 1, 2), merged
+            across slab faces, including the axis-0 wrap, with the union-find
+            of ut26_halos.py (FOF_PERIODIC=0: open boundaries); sizes only,
+            no halo catalogue
+
+With RNG=generator each worker draws from its own SeedSequence(SEED).spawn(W)
+stream, so trajectories depend on the worker count (statistically equivalent
+to the single-process run).  With RNG=counter every worker addresses the
+shared Philox stream (ut26_rng.py) by global voxel index, so the trajectory
+is the same for any DIST_WORKERS and equals the single-process RNG=counter
+run up to the summation order of <s>.  LZ complexity is not computed in
+this mode.
+
+summary.json is written atomically last, as by ut26_cosmo3d.py, with
+CODE_VERSION and CONFIG_HASH (ut26_runcache.py): the hash of
+ut26_cosmo3d.effective_config() for this N and T plus the dist backend, the
+worker count and the version of this module, so a distributed run is never
+a cache hit for a single-process one.  Its "timing" holds rank 0's step
+phases (collapse and return include the barrier waits that end them;
+return also the ghost exchange and the slab sum) and the parent's
+observables and io, plus the peak RSS of the largest worker.  TIMING_TRACE=1
+writes rank 0's per-step lines to timing.jsonl.
+
+A worker that fails posts its traceback and aborts the barrier; one that
+dies without posting (OOM kill, segfault) is noticed by the parent within
+DIST_POLL seconds.  Either way the other workers are stopped and the run
+raises RuntimeError.
+
+Run:
+    N=512 DIST_WORKERS=32 python ut26_cosmo3d_dist.py
+    (all ut26_cosmo3d.py env overrides apply, DRIVE_SCHEDULE included; N
+    defaults to ut26_cosmo3d.N and T to ut26_cosmo3d.T, i.e. the schedule
+    length if it has one)
+
+Memory: about 2 shared float (s, b) + 1 uint16 (R_count) + 4 private buffers
+per voxel, i.e. ~49 bytes/voxel in float64 (~6.6 GB at N=512) plus the one-off
+initial-field FFT.
+"""
+
+import os, json, traceback
+from queue import Empty
+import multiprocessing as mp
+from multiprocessing import shared_memory
+import numpy as np
+
+import ut26_cosmo3d as sim
+from ut26_step import StepEngine, neighbor_mean_3d
+from ut26_rng import CounterRNG
+from ut26_halos import SCIPY_OK, label_periodic, union_pairs
+from ut26_trace import trace_dtype, write_trace, project, TraceProjections
+from ut26_results import record as record_result
+from ut26_checkpoint import atomic_write
+from ut26_runcache import code_version, digest
+from ut26_timing import PhaseTimer, TRACE_NAME, peak_rss_mb
+from ut26_figures import KAPPA_NAME
+
+N       = int(os.getenv("N", sim.N))
+T       = int(os.getenv("T", sim.T))
+# the run is a ut26_cosmo3d configuration with this grid and length
+sim.N, sim.T = N, T
+WORKERS = int(os.getenv("DIST_WORKERS", os.cpu_count() or 1))
+ENTROPY_BINS = 32
+# seconds between checks for workers that died without posting a result
+POLL    = float(os.getenv("DIST_POLL", 5))
+
+RUN_TAG = os.getenv("RUN_TAG", f"dist_N{N}_" + sim.RUN_TAG)
+RUN_TAG = RUN_TAG.strip().replace("\\", "_").replace("/", "_")
+OUTDIR  = os.path.join(sim.OUTDIR_BASE, RUN_TAG)
+
+
+# ----------------------
+# Shared arrays
+# ----------------------
+def shm_create(shape, dtype):
+    nbytes = int(np.prod(shape)) * np.dtype(dtype).itemsize
+    shm = shared_memory.SharedMemory(create=True, size=max(nbytes, 1))
+    return shm, (shm.name, shape, np.dtype(dtype).str)
+
+def shm_attach(spec):
+    name, shape, dtype = spec
+    shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+
+
+class SlabStepEngine(StepEngine):
+    """StepEngine on one axis-0 slab, with ghost planes for the stencil."""
+
+    def __init__(self, s, b, params, rng, R_count, **modes):
+        super().__init__(s, b, params, rng, R_count=R_count, **modes)
+        self.lo = np.empty(s.shape[1:], dtype=s.dtype)
+        self.hi = np.empty(s.shape[1:], dtype=s.dtype)
+
+    def neighbor_mean(self, s, out):
+        return neighbor_mean_3d(s, out=out, lo=self.lo, hi=self.hi)
+
+
+def slab_bounds(n, w):
+    return [(n * r) // w for r in range(w + 1)]
+
+def entropy_from_hist(hist, bins):
+    p = hist.astype(float) / (hist.sum() + 1e-12)
+    p = p[p > 0]
+    return float(-(p*np.log2(p)).sum() / np.log2(bins))
+
+def effective_config(workers):
+    # ut26_cosmo3d's config plus what makes a distributed run differ from it
+    return dict(sim.effective_config(), BACKEND="numpy-dist", DIST_WORKERS=workers,
+                DIST_CODE=code_version(("ut26_cosmo3d_dist.py",)))
+
+
+# ----------------------
+# Distributed observables
+# ----------------------
+def pk_columns(F, j0, j1, n, nbins):
+    """Partial (ΣP, Nk) from axis-1 columns [j0, j1) of the rfft2'd field."""
+    k  = np.fft.fftfreq(n) * n
+    kz = np.fft.rfftfreq(n) * n
+    a  = np.max(k**2)
+    edges = np.linspace(0.0, np.sqrt(a + a + a), nbins + 1)
+    # Hermitian weights: kz = 0 and the Nyquist plane appear once
+    wz = np.full(kz.size, 2.0)
+    wz[0] = 1.0
+    if n % 2 == 0:
+        wz[-1] = 1.0
+    Psum = np.zeros(nbins); Nk = np.zeros(nbins)
+    for j in range(j0, j1):
+        col = np.fft.fft(F[:, j, :], axis=0)
+        pw  = (col * col.conjugate()).real
+        kk  = np.sqrt(k[:, None]**2 + k[j]**2 + kz[None, :]**2)
+        idx = np.digitize(kk.ravel(), edges) - 1
+        ok  = idx < nbins
+        w   = np.broadcast_to(wz, pw.shape).ravel()[ok]
+        Psum += np.bincount(idx[ok], weights=pw.ravel()[ok] * w, minlength=nbins)
+        Nk   += np.bincount(idx[ok], weights=w, minlength=nbins)
+    return Psum, Nk, 0.5*(edges[:-1] + edges[1:])
+
+
+def merge_fof(parts, periodic=True):
+    """Union-find over slab-face label pairs (and the axis-0 wrap when
+    `periodic`); returns global halo sizes."""
+    offsets = np.cumsum([0] + [p["nlab"] for p in parts])
+    total = int(offsets[-1])
+    W = len(parts)
+    pa, pb = [], []
+    for r in range(W if periodic else W - 1):
+        q = (r + 1) % W
+        a = parts[r]["last"].ravel(); b = parts[q]["first"].ravel()
+        both = (a > 0) & (b > 0)
+        pa.append(a[both] + offsets[r]); pb.append(b[both] + offsets[q])
+    a = np.concatenate(pa).astype(np.intp) if pa else np.zeros(0, dtype=np.intp)
+    b = np.concatenate(pb).astype(np.intp) if pb else np.zeros(0, dtype=np.intp)
+    roots = union_pairs(np.arange(total + 1), a, b)
+
+    local = np.zeros(total + 1, dtype=np.int64)
+    for r, p in enumerate(parts):
+        local[offsets[r] + 1:offsets[r + 1] + 1] = p["sizes"][1:]
+    sizes = np.bincount(roots, weights=local, minlength=total + 1).astype(np.int64)
+    return [int(x) for x in sizes[1:] if x > 0]
+
+
+# ----------------------
+# Worker
+# ----------------------
+def worker(rank, specs, bounds, barrier, queue):
+    shms = []
+    try:
+        def attach(key):
+            shm, arr = shm_attach(specs[key]); shms.append(shm); return arr
+        s_all, R_all, b_all = attach("s"), attach("R"), attach("b")
+        F, red, hist, ctr = attach("F"), attach("red"), attach("hist"), attach("ctr")
+        proj = attach("proj")
+        i0, i1 = bounds[rank], bounds[rank + 1]
+        n = s_all.shape[0]
+        s = s_all[i0:i1]
+
+        if sim.RNG_MODE == "counter":
+            rng = CounterRNG(sim.SEED)
+        else:
+            rng = np.random.default_rng(np.random.SeedSequence(sim.SEED).spawn(len(bounds) - 1)[rank])
+        eng = SlabStepEngine(s, b_all[i0:i1], sim.sim_params(), rng, R_all[i0:i1],
+                             collapse=sim.COLLAPSE_MODE, trigger=sim.TRIGGER_MODE,
+                             offset=i0 * n * n)
+        log = dict(times=[], mean_s=[], H=[], prunes=[])
+        trace_proj = TraceProjections(OUTDIR, sim.TRACE_COST) if rank == 0 else None
+        schedule = sim.drive_schedule()
+        timer = PhaseTimer()
+        if rank == 0:
+            eng.timer = timer
+            if sim.TIMING_TRACE:
+                timer.open_trace(os.path.join(OUTDIR, TRACE_NAME))
+
+        for t in range(T):
+            timer.begin_step()
+            eng.t = t
+            eng.trigger(schedule.drive(t))
+            eng.collapse()
+            barrier.wait()
+            eng.lap("collapse")
+            eng.lo[...] = s_all[(i0 - 1) % n]       # ghost-layer exchange
+            eng.hi[...] = s_all[i1 % n]
+            barrier.wait()
+            eng.retain()
+            red[0, rank] = s.sum(dtype=np.float64)
+            barrier.wait()
+            eng.lap("return")
+            eng.drift(float(red[0].sum() / n**3))
+            eng.lap("drift")
+            timer.end_step(t, eng.n_trig)
+
+            if (t % sim.SNAP_EVERY == 0) or (t == T-1):
+                timer.mark()
+                red[1, rank] = s.sum(dtype=np.float64)
+                hist[rank] = np.histogram(s, bins=ENTROPY_BINS, range=(0.0, 1.0))[0]
+                ctr[rank] = (eng.prune_count, eng.R_total)
+                proj[i0:i1] = project(eng.R_count)
+                barrier.wait()
+                if rank == 0:
+                    ms = float(red[1].sum() / n**3)
+                    H  = entropy_from_hist(hist.sum(axis=0), ENTROPY_BINS)
+                    pr = int(ctr[:, 0].sum())
+                    log["times"].append(t); log["mean_s"].append(ms)
+                    log["H"].append(H); log["prunes"].append(pr)
+                    trace_proj.append_projection(t, proj)
+                    print(f"[{t:4d}] mean s={ms:.3f}  R_total={ctr[:,1].sum():.1f}  pruned={pr}")
+                timer.lap("observables")
+        timer.close()
+
+        # ----- final observables from the distributed field -----
+        timer.mark()
+        red[2, rank] = s.sum(dtype=np.float64)
+        barrier.wait()
+        mean  = float(red[2].sum() / n**3)
+        delta = s.astype(np.float64) - mean
+        F[i0:i1] = np.fft.rfft2(delta, axes=(1, 2))
+        kappa_rows = delta.sum(axis=2)
+        fof = None
+        if SCIPY_OK:
+            lab, nlab = label_periodic(delta > sim.DELTA_THR,
+                                       axes=(1, 2) if sim.FOF_PERIODIC else ())
+            fof = dict(nlab=nlab, sizes=np.bincount(lab.ravel(), minlength=nlab + 1),
+                       first=lab[0].copy(), last=lab[-1].copy())
+        del delta
+        barrier.wait()
+        Psum, Nk, kmid = pk_columns(F, i0, i1, n, sim.N_SPECTRAL_BINS)
+        timer.lap("observables")
+
+        queue.put(dict(rank=rank, Psum=Psum, Nk=Nk, kmid=kmid, kappa_rows=kappa_rows,
+                       fof=fof, log=log, prune_count=eng.prune_count, R_total=eng.R_total,
+                       timing=timer.total if rank == 0 else None, steps=timer.steps))
+    except Exception:
+        barrier.abort()
+        queue.put(dict(rank=rank, error=traceback.format_exc()))
+    finally:
+        for shm in shms:
+            shm.close()
+
+
+def collect(procs, barrier, queue):
+    """Every worker's result, in rank order.  A worker that exits without
+    posting one aborts the barrier and fails the run, rather than leaving the
+    parent and the other workers waiting forever."""
+    parts, suspect = [], False
+    while len(parts) < len(procs):
+        try:
+            parts.append(queue.get(timeout=POLL))
+            suspect = False
+            continue
+        except Empty:
+            pass
+        posted = {p["rank"] for p in parts}
+        dead = [r for r, p in enumerate(procs) if r not in posted and p.exitcode is not None]
+        if not dead:
+            continue
+        if not suspect:
+            # a result posted just before the exit may still be in the pipe
+            suspect = True
+            continue
+        barrier.abort()
+        for p in procs:
+            if p.is_alive():
+                p.terminate()
+        for p in procs:
+            p.join()
+        raise RuntimeError("worker failed:\n" + "\n".join(
+            f"rank {r} exited with code {procs[r].exitcode} without a result" for r in dead))
+    return sorted(parts, key=lambda d: d["rank"])
+
+
+# ----------------------
+# Main
+# ----------------------
+def main():
+    timer = PhaseTimer()
+    os.makedirs(OUTDIR, exist_ok=True)
+    W = max(1, min(WORKERS, N))
+    # a rerun starts without the old summary, which marks a finished run
+    if os.path.exists(os.path.join(OUTDIR, "summary.json")):
+        os.remove(os.path.join(OUTDIR, "summary.json"))
+    print("UT26 Cosmology-Lite 3D simulator (distributed)")
+    print(f"N={N}, T={T}, workers={W}, output -> {OUTDIR}")
+
+    shms, specs = [], {}
+    def create(key, shape, dtype):
+        shm, spec = shm_create(shape, dtype); shms.append(shm); specs[key] = spec
+        return np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+    try:
+        s_all = create("s", (N, N, N), sim.DTYPE)
+        R_all = create("R", (N, N, N), trace_dtype(T))
+        b_all = create("b", (N, N, N), np.float64)
+        create("F", (N, N, N//2 + 1), np.complex128)
+        # separate reduction rows for drift, snapshots and the final field, so
+        # a fast worker never overwrites a slot a slower one is still reading
+        create("red", (3, W), np.float64)
+        create("hist", (W, ENTROPY_BINS), np.int64)
+        create("ctr", (W, 2), np.float64)
+        create("proj", (N, N), np.uint32)
+
+        raw = sim.gaussian_field_from_P0(N)
+        b_all[...] = raw / (np.max(np.abs(raw)) + 1e-12)
+        s_all[...] = np.clip(0.5 + 0.1*raw, 0.0, 1.0)
+        R_all[...] = 0
+        del raw
+
+        bounds  = slab_bounds(N, W)
+        ctx     = mp.get_context()
+        barrier = ctx.Barrier(W)
+        queue   = ctx.Queue()
+        procs = [ctx.Process(target=worker, args=(r, specs, bounds, barrier, queue))
+                 for r in range(W)]
+        for p in procs:
+            p.start()
+        parts = collect(procs, barrier, queue)
+        for p in procs:
+            p.join()
+        errors = [p["error"] for p in parts if "error" in p]
+        if errors:
+            raise RuntimeError("worker failed:\n" + "\n".join(errors))
+        # the workers' time is in rank 0's laps
+        timer.mark()
+        write_trace(OUTDIR, R_all, sim.TRACE_COST, T)
+        timer.lap("io")
+    finally:
+        for shm in shms:
+            shm.close(); shm.unlink()
+
+    log = parts[0]["log"]
+    Psum = sum(p["Psum"] for p in parts); Nk = sum(p["Nk"] for p in parts)
+    Pk = np.where(Nk > 0, Psum / np.maximum(Nk, 1), 0.0)
+    np.savetxt(os.path.join(OUTDIR, "pk.csv"), np.c_[parts[0]["kmid"], Pk],
+               delimiter=",", header="k,Pk", comments="")
+
+    kappa = np.concatenate([p["kappa_rows"] for p in parts], axis=0)
+    kappa -= kappa.mean()
+    kappa /= (kappa.std() + 1e-12)
+    km2, P2 = sim.kappa_power_spectrum(kappa)
+    np.savetxt(os.path.join(OUTDIR, "kappa_ps.csv"), np.c_[km2, P2],
+               delimiter=",", header="k,Pkappa", comments="")
+    np.save(os.path.join(OUTDIR, KAPPA_NAME), kappa)
+
+    if parts[0]["fof"] is not None:
+        sizes = [sz for sz in merge_fof([p["fof"] for p in parts], periodic=sim.FOF_PERIODIC)
+                 if sz >= sim.MASS_MIN]
+        if sizes:
+            centers, hist = sim.halo_mass_function(sizes)
+            np.savetxt(os.path.join(OUTDIR, "hmf.csv"), np.c_[centers, hist],
+                       delimiter=",", header="mass,counts", comments="")
+
+    timer.lap("observables")
+    with open(os.path.join(OUTDIR, "timeseries.csv"), "w") as f:
+        f.write("t,mean_s,H,prunes\n")
+        for row in zip(log["times"], log["mean_s"], log["H"], log["prunes"]):
+            f.write(",".join(str(x) for x in row) + "\n")
+    timer.lap("io")
+    for phase, dt in parts[0]["timing"].items():
+        timer.total[phase] += dt
+    timer.steps = parts[0]["steps"]
+    timing = timer.report()
+    rss = peak_rss_mb(children=True)
+    timing["worker_peak_rss_mb"] = None if rss is None else round(rss, 1)
+
+    summary = dict(
+        N=N, T=T, seed=sim.SEED, DIST_WORKERS=W,
+        BETA=sim.BETA, LAMBDA_R=sim.LAMBDA_R, ETA_THRESH=sim.ETA_THRESH,
+        DRIVE_A=sim.DRIVE_A, DRIVE_W=sim.DRIVE_W, NOISE_STD=sim.NOISE_STD,
+        **sim.schedule_config(sim.drive_schedule()),
+        final_mean_s=float(log["mean_s"][-1]),
+        total_trace_R=float(sum(p["R_total"] for p in parts)),
+        total_prunes=int(sum(p["prune_count"] for p in parts)),
+        COLLAPSE_MODE=sim.COLLAPSE_MODE, TRIGGER_MODE=sim.TRIGGER_MODE,
+        PRECISION=sim.PRECISION, BACKEND="numpy-dist", RNG=sim.RNG_MODE,
+        FOF_PERIODIC=sim.FOF_PERIODIC,
+        SCIPY_OK=SCIPY_OK,
+        CODE_VERSION=code_version(),
+        CONFIG_HASH=digest(effective_config(W)),
+        timing=timing,
+        OUTDIR=OUTDIR
+    )
+    # written last and atomically: its CONFIG_HASH marks the run as finished
+    atomic_write(os.path.join(OUTDIR, "summary.json"),
+                 lambda f: f.write(json.dumps(summary, indent=2).encode()))
+    record_result(summary)
+
+    print("\n=== Done ===")
+    print("Outputs in:", OUTDIR)
+    print(" - pk.csv, kappa_ps.csv, kappa_map.npy, hmf.csv (if scipy available)")
+    print(" - timeseries.csv, summary.json, trace.npz, trace_proj.npz")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,41 +1,40 @@
 # ut26_cosmo3d_hysteresis.py
-import os, json
-import numpy as np
-import matplotlib.pyplot as plt
-
-try:
-    from scipy.ndimage import label
-    SCIPY_OK = True
-except Exception:
-    SCIPY_OK = False
-
-# -------- Defaults (same as your sim) --------
-SEED        = 123
-N           = 96
-SNAP_EVERY  = 50
-
-N_SPECTRAL_BINS = 40
-NS_INDEX    = 0.0
-K0_CUTOFF   = 0.15
-BAO_A       = 0.06
-BAO_R       = 105.0
-BAO_SIG     = 0.02
-
-BETA        = 3.0
-LAMBDA_R    = 0.20
-ETA_THRESH  = 0.55
-DRIVE_W     = 2*np.pi/30
-NOISE_STD   = 0.35
-TRACE_COST  = np.log(2.0)
-
-EPS_DRIFT   = 0.08
-A_GROW      = 0.9
-B_DAMP      = 0.6
-
-DELTA_THR   = 0.15
-MASS_MIN    = 20
-
-OUTDIR_BASE = "ut26_cosmo3d_outputs"
+"""
+UT26 hysteresis run: a two-phase Γ drive schedule on the ut26_cosmo3d engine
+
+Phase 1 drives with amplitude PHASE1_A for PHASE1_T steps, phase 2 with
+PHASE2_A for PHASE2_T steps (same DRIVE_W).  The run is ut26_cosmo3d.main()
+with that schedule (see ut26_schedule.py), so it uses the same step engines,
+checkpoints, snapshots and final observables; T = PHASE1_T + PHASE2_T.
+Besides the usual outputs the run folder gets hysteresis.csv (t, A, <s>,
+prunes, W at every snapshot) for plot_hysteresis.py, and summary.json the
+phase parameters.
+
+All other settings (BETA, LAMBDA_R, BACKEND, RNG, CHECKPOINT, ...) are read
+by ut26_cosmo3d.py from the environment as usual.
+
+Branching (--branch A2 [A2 ...]): a PHASE2_A sweep shares phase 1, so phase 1
+is simulated once into a trunk folder (..._trunk) that ends with a checkpoint
+at t = PHASE1_T (full state and RNG position).  Each branch folder gets a copy
+of that checkpoint, snapshot series and trace projections
+(ut26_checkpoint.fork_checkpoint) and resumes from it with its own phase-2
+amplitude, so its outputs are identical to a straight run with that
+PHASE2_A.  An existing trunk is reused (and completed if it was cut short).
+BRANCH_WORKERS > 1 runs the branches in that many processes.
+
+Run:
+    python ut26_cosmo3d_hysteresis.py
+    PHASE1_A=1.0 PHASE2_T=400 CHECKPOINT=1 python ut26_cosmo3d_hysteresis.py [--resume]
+    BRANCH_WORKERS=4 python ut26_cosmo3d_hysteresis.py --branch 0.1 0.2 0.3 0.4 0.5
+"""
+import os, argparse
+import multiprocessing as mp
+
+import ut26_cosmo3d as sim
+from ut26_schedule import phases
+from ut26_checkpoint import CKPT_NAME, fork_checkpoint
+from ut26_snapshots import DATA_NAME, META_NAME
+from ut26_trace import PROJ_NAME
 
 # -------- Hysteresis schedule from env --------
 # Phase 1: A1 for T1 steps; Phase 2: A2 for T2 steps
@@ -44,140 +43,90 @@ PHASE1_T = int(os.getenv("PHASE1_T",  200))
 PHASE2_A = float(os.getenv("PHASE2_A", 0.30))
 PHASE2_T = int(os.getenv("PHASE2_T",  200))
 
-# Allow env overrides for other params (optional)
-BETA        = float(os.getenv("BETA",       BETA))
-LAMBDA_R    = float(os.getenv("LAMBDA_R",   LAMBDA_R))
-ETA_THRESH  = float(os.getenv("ETA_THRESH", ETA_THRESH))
-DRIVE_W     = float(os.getenv("DRIVE_W",    DRIVE_W))
-NOISE_STD   = float(os.getenv("NOISE_STD",  NOISE_STD))
-
-RUN_TAG = os.getenv("RUN_TAG", f"hyst_A{PHASE1_A}x{PHASE1_T}_A{PHASE2_A}x{PHASE2_T}")
-RUN_TAG = RUN_TAG.strip().replace("\\","_").replace("/","_")
-OUTDIR  = os.path.join(OUTDIR_BASE, RUN_TAG)
-
-rng = np.random.default_rng(SEED)
-
-def ensure():
-    os.makedirs(OUTDIR, exist_ok=True)
-
-def kgrid(n):
-    k = np.fft.fftfreq(n)*n
-    kx, ky, kz = np.meshgrid(k, k, k, indexing='ij')
-    return np.sqrt(kx**2 + ky**2 + kz**2)
-
-def bao_like_P0(kk):
-    P_smooth = (kk + 1e-12)**NS_INDEX * np.exp(-(kk*K0_CUTOFF)**2)
-    wiggle   = 1.0 + BAO_A * np.sin(kk * (BAO_R/800.0)) * np.exp(-(kk*BAO_SIG*10.0)**2)
-    return P_smooth * wiggle
-
-def gaussian_field_from_P0(n):
-    kk  = kgrid(n)
-    P0  = bao_like_P0(kk)
-    amp = np.sqrt(np.maximum(P0, 0.0)) / np.sqrt(2.0)
-    pr  = rng.normal(size=(n,n,n))
-    pi  = rng.normal(size=(n,n,n))
-    F   = amp * (pr + 1j*pi)
-    F[0,0,0] = 0.0
-    field = np.fft.ifftn(F).real
-    field -= field.mean()
-    field /= (field.std() + 1e-12)
-    return field
-
-def neighbor_mean_3d(arr):
-    up    = np.roll(arr, -1, axis=0)
-    down  = np.roll(arr,  1, axis=0)
-    left  = np.roll(arr, -1, axis=1)
-    right = np.roll(arr,  1, axis=1)
-    front = np.roll(arr, -1, axis=2)
-    back  = np.roll(arr,  1, axis=2)
-    return (up + down + left + right + front + back) / 6.0
-
-def spatial_entropy(s, bins=32):
-    hist,_ = np.histogram(s.ravel(), bins=bins, range=(0.0,1.0))
-    p = hist.astype(float) / (hist.sum() + 1e-12)
-    p = p[p>0]
-    return float(-(p*np.log2(p)).sum() / np.log2(bins))
-
-def main():
-    ensure()
-    T = PHASE1_T + PHASE2_T
-    # amplitude schedule A(t)
-    A_sched = np.concatenate([np.full(PHASE1_T, PHASE1_A), np.full(PHASE2_T, PHASE2_A)])
+BRANCH_WORKERS = int(os.getenv("BRANCH_WORKERS", 1))
 
+RUN_TAG_ENV = os.getenv("RUN_TAG", "").strip().replace("\\","_").replace("/","_")
+
+def run_tag(phase2_a=PHASE2_A):
+    if RUN_TAG_ENV:
+        return RUN_TAG_ENV if phase2_a == PHASE2_A else f"{RUN_TAG_ENV}_A{phase2_a}"
+    return f"hyst_A{PHASE1_A}x{PHASE1_T}_A{phase2_a}x{PHASE2_T}"
+
+RUN_TAG = run_tag()
+TRUNK_TAG = (RUN_TAG_ENV or f"hyst_A{PHASE1_A}x{PHASE1_T}") + "_trunk"
+
+# the run is a ut26_cosmo3d run with this length, folder and schedule
+sim.T         = PHASE1_T + PHASE2_T
+sim.RUN_TAG   = RUN_TAG
+sim.OUTDIR    = os.path.join(sim.OUTDIR_BASE, RUN_TAG)
+sim.DRIVE_CSV = "hysteresis.csv"
+
+
+def schedule(phase2_a=PHASE2_A):
+    return phases([(PHASE1_A, PHASE1_T), (phase2_a, PHASE2_T)], sim.DRIVE_W)
+
+
+def phase_fields(phase2_a=PHASE2_A):
+    return dict(PHASE1_A=PHASE1_A, PHASE1_T=PHASE1_T, PHASE2_A=phase2_a, PHASE2_T=PHASE2_T)
+
+
+def main(resume=False):
     print("UT26 Hysteresis run")
-    print(f"T={T} = {PHASE1_T}(A={PHASE1_A}) + {PHASE2_T}(A={PHASE2_A}), W={DRIVE_W}")
-    print("OUTDIR:", OUTDIR)
-
-    # Seed bias field b(x)
-    raw = gaussian_field_from_P0(N)
-    b   = raw / (np.max(np.abs(raw)) + 1e-12)
-
-    # Initial coherence
-    s = 0.5 + 0.1*raw
-    s = np.clip(s, 0.0, 1.0)
-
-    R_total = 0.0
-    prune_count = 0
-
-    # Logs
-    times, A_log, mean_s, H_log, prunes_log = [], [], [], [], []
-
-    for t in range(T):
-        A = A_sched[t]
-        drive_t = A * np.sin(DRIVE_W * t)
-        noise   = rng.normal(0.0, NOISE_STD, size=(N,N,N))
-
-        trig = (np.abs(drive_t) + np.abs(noise)) > ETA_THRESH
-
-        if np.any(trig):
-            p1 = 1.0 / (1.0 + np.exp(-BETA * b))
-            outcome = (rng.random(size=(N,N,N)) < p1).astype(float)
-            pruned_local = ((p1 > 0.5) & (outcome < 0.5)) | ((p1 < 0.5) & (outcome > 0.5))
-            prune_count += int(pruned_local[trig].sum())
-            s[trig]  = outcome[trig]
-            R_total += TRACE_COST * float(trig.sum())
-
-        notrig = ~trig
-        if np.any(notrig):
-            s_nb = neighbor_mean_3d(s)
-            s[notrig] = np.clip(s[notrig] + LAMBDA_R*(s_nb[notrig] - s[notrig]), 0.0, 1.0)
-
-        delta_I = s - s.mean()
-        dR_dt   = TRACE_COST * trig.astype(float)
-        s += EPS_DRIFT * (A_GROW*delta_I - B_DAMP*dR_dt)
-        s = np.clip(s, 0.0, 1.0)
-
-        if (t % SNAP_EVERY == 0) or (t == T-1):
-            H = spatial_entropy(s, bins=32)
-            times.append(t); A_log.append(A); mean_s.append(float(s.mean())); H_log.append(H); prunes_log.append(prune_count)
-            print(f"[{t:4d}] A={A:.2f}  <s>={s.mean():.4f}  prunes={prune_count}")
-
-    # Save time series
-    import csv
-    with open(os.path.join(OUTDIR, "hysteresis.csv"), "w", newline="") as f:
-        w = csv.writer(f)
-        w.writerow(["t","A","mean_s","prunes"])
-        for t, a, ms, pr in zip(times, A_log, mean_s, prunes_log):
-            w.writerow([t, a, ms, pr])
-
-    # Summary JSON
-    summary = dict(
-        N=N, T=T,
-        PHASE1_A=PHASE1_A, PHASE1_T=PHASE1_T,
-        PHASE2_A=PHASE2_A, PHASE2_T=PHASE2_T,
-        BETA=BETA, LAMBDA_R=LAMBDA_R, ETA_THRESH=ETA_THRESH,
-        DRIVE_W=DRIVE_W, NOISE_STD=NOISE_STD,
-        final_mean_s=float(mean_s[-1]),
-        total_prunes=int(prunes_log[-1]),
-        OUTDIR=OUTDIR
-    )
-    with open(os.path.join(OUTDIR,"summary.json"), "w") as f:
-        json.dump(summary, f, indent=2)
-
-    print("Wrote:", os.path.join(OUTDIR,"hysteresis.csv"))
-    print("Wrote:", os.path.join(OUTDIR,"summary.json"))
-    print("Done.")
+    print(f"T={sim.T} = {PHASE1_T}(A={PHASE1_A}) + {PHASE2_T}(A={PHASE2_A}), W={sim.DRIVE_W}")
+    sim.main(resume=resume, schedule=schedule(), extra=phase_fields())
+
+
+# ----- warm-started branches -----
+def run_trunk():
+    """Simulate phase 1 once into the trunk folder; returns that folder."""
+    sim.OUTDIR = os.path.join(sim.OUTDIR_BASE, TRUNK_TAG)
+    resume = os.path.exists(os.path.join(sim.OUTDIR, CKPT_NAME))
+    print(f">> Phase 1 trunk ({'reusing' if resume else 'new'}): {sim.OUTDIR}")
+    sim.main(resume=resume, schedule=phases([(PHASE1_A, PHASE1_T)], sim.DRIVE_W),
+             until=PHASE1_T)
+    return sim.OUTDIR
+
+
+def run_branch(trunk, phase2_a):
+    """Continue the trunk with phase-2 amplitude `phase2_a` in its own folder."""
+    sched = schedule(phase2_a)
+    sim.RUN_TAG = run_tag(phase2_a)
+    sim.OUTDIR = os.path.join(sim.OUTDIR_BASE, sim.RUN_TAG)
+    fork_checkpoint(trunk, sim.OUTDIR, sim.run_config(sched),
+                    files=(DATA_NAME, META_NAME, PROJ_NAME))
+    print(f">> Branch PHASE2_A={phase2_a}: {sim.OUTDIR}")
+    sim.main(resume=True, schedule=sched, extra=phase_fields(phase2_a))
+    return sim.OUTDIR
+
+
+def _branch_job(job):
+    return run_branch(*job)
+
+
+def main_branches(phase2_values):
+    print("UT26 Hysteresis branches")
+    print(f"T={sim.T} = {PHASE1_T}(A={PHASE1_A}) + {PHASE2_T}(A in {phase2_values}), "
+          f"W={sim.DRIVE_W}")
+    trunk = run_trunk()
+    jobs = [(trunk, a) for a in phase2_values]
+    if BRANCH_WORKERS > 1 and len(jobs) > 1:
+        with mp.get_context("fork").Pool(min(BRANCH_WORKERS, len(jobs))) as pool:
+            return pool.map(_branch_job, jobs, chunksize=1)
+    return [run_branch(*job) for job in jobs]
 
 if __name__ == "__main__":
-    os.makedirs(OUTDIR_BASE, exist_ok=True)
-    main()
\ No newline at end of file
+    ap = argparse.ArgumentParser(description="UT26 hysteresis run")
+    ap.add_argument("--resume", action="store_true",
+                    help="continue from the checkpoint in OUTDIR (implies CHECKPOINT=1)")
+    ap.add_argument("--branch", type=float, nargs="+", metavar="A2",
+                    help="PHASE2_A values to run as branches of one shared phase-1 trunk")
+    ap.add_argument("--profile", action="store_true",
+                    help="run under cProfile; profile.pstats/profile.txt go to OUTDIR")
+    args = ap.parse_args()
+    os.makedirs(sim.OUTDIR_BASE, exist_ok=True)
+    if args.branch:
+        main_branches(args.branch)
+    elif args.profile or sim.PROFILE:
+        sim.profiled(main, sim.OUTDIR, resume=args.resume)
+    else:
+        main(resume=args.resume)
\ No newline at end of file
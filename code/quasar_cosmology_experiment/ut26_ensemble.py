@@ -0,0 +1,335 @@
+"""
+UT26 Cosmology-Lite — batched ensemble simulator
+
+Advances K parameter points of ut26_cosmo3d.py together on (K, N, N, N)
+arrays with a leading batch axis.  The seed-SEED initial field (bias b and
+initial s) is built once and shared by all members; the per-member
+parameters BETA, LAMBDA_R, ETA_THRESH, DRIVE_A, DRIVE_W and NOISE_STD are
+(K,1,1,1) arrays broadcast against the batch, so every elementwise phase of
+the step runs as one ufunc call over the whole ensemble.
+
+Each member owns a copy of the step stream as it stands after the initial
+field was drawn (or the shared CounterRNG with RNG=counter), and draws into
+its own slice of the batch buffers with the same calls as StepEngine.  The
+periodic stencil and the drift mean are evaluated per member on contiguous
+slices.  Every member therefore reproduces its single ut26_cosmo3d.py run
+bit for bit, and writes the same summary.json metrics (final_mean_s,
+total_trace_R, total_prunes) into its own run folder.  Its CONFIG_HASH is
+that of the single run (ut26_runcache.py), so a sweep finds the metrics again
+without rerunning.  A folder holding another configuration's outputs is
+emptied first (clear_stale()), so the summary never sits next to spectra or
+halos it does not describe.
+
+With CONVERGE=1 every member has its own ut26_converge monitor (its own
+drive period); members that become stationary are recorded and dropped from
+the batch (keep()), so the remaining members step on smaller arrays and the
+batch ends when the last member stops.  Members stay bit-identical to single
+CONVERGE=1 runs.
+
+Supports the "dense" collapse with the "noise"/"bernoulli" trigger modes,
+both precisions and both RNG modes.  Memory is about 40 bytes per voxel per
+member in float64, so run_ensemble() processes the points in batches of
+ENSEMBLE_K members.
+
+Use:
+    from ut26_ensemble import run_ensemble
+    summaries = run_ensemble([dict(DRIVE_A=0.4, DRIVE_W=0.2, RUN_TAG="A0.4"), ...])
+"""
+
+import os, copy, json, math
+import numpy as np
+
+import ut26_cosmo3d as sim
+from ut26_step import neighbor_mean_3d
+from ut26_rng import CounterRNG, NOISE, COLLAPSE, TRIGGER
+from ut26_trace import trace_dtype
+from ut26_converge import summary_fields
+from ut26_checkpoint import atomic_write
+from ut26_runcache import code_version, clear_stale
+from ut26_results import record as record_result
+from ut26_sweep import point_key
+
+ENSEMBLE_K = int(os.getenv("ENSEMBLE_K", 8))
+
+# per-member parameters (anything else comes from ut26_cosmo3d)
+MEMBER_KEYS = ("BETA", "LAMBDA_R", "ETA_THRESH", "DRIVE_A", "DRIVE_W", "NOISE_STD")
+
+
+class EnsembleStepEngine:
+    """StepEngine over a (K, N, N, N) batch with per-member parameters."""
+
+    backend = "numpy-ensemble"
+
+    def __init__(self, s, b, params, rngs, trigger="noise"):
+        if trigger not in ("noise", "bernoulli"):
+            raise ValueError("ensemble engine supports trigger='noise' or 'bernoulli'")
+        K = s.shape[0]
+        self.s = s
+        self.dtype = s.dtype
+        self.K = K
+        self.R_count = np.zeros(s.shape, dtype=trace_dtype(sim.T))
+        self.rngs = list(rngs)
+        self.counter = isinstance(self.rngs[0], CounterRNG)
+        self.trigger_mode = trigger
+        self.t = 0
+        self.mean_s = None
+        self.prune_count = np.zeros(K, dtype=np.int64)
+        self.R_total     = np.zeros(K, dtype=np.float64)
+
+        # per-member scalars as float64 vectors, and as (K,1,1,1) arrays in the
+        # state dtype (what NumPy's weak-scalar casting does in StepEngine)
+        def col(v):
+            return np.asarray(v, dtype=np.float64).reshape(K, 1, 1, 1).astype(self.dtype)
+        self.beta       = np.asarray(params["BETA"], dtype=np.float64)
+        self.lambda_r   = np.asarray(params["LAMBDA_R"], dtype=np.float64)
+        self.eta_thresh = np.asarray(params["ETA_THRESH"], dtype=np.float64)
+        self.noise_std  = np.asarray(params["NOISE_STD"], dtype=np.float64)
+        self._lam   = col(self.lambda_r)
+        self._eta   = col(self.eta_thresh)
+        self._noise = col(self.noise_std)
+        # shared scalars stay Python floats
+        self.trace_cost = float(params["TRACE_COST"])
+        self.eps_drift  = float(params["EPS_DRIFT"])
+        self.a_grow     = float(params["A_GROW"])
+        self.b_damp     = float(params["B_DAMP"])
+
+        # β-softmax per member, built slice by slice to avoid K-sized temporaries
+        self.p1 = np.empty_like(s)
+        for k in range(K):
+            self.p1[k] = 1.0 / (1.0 + np.exp(-float(self.beta[k]) * b))
+        self.p1_hi   = self.p1 > 0.5
+        self.decided = self.p1 != 0.5
+
+        self.work    = np.empty_like(s)
+        self.nb      = np.empty_like(s)
+        self.trig    = np.empty(s.shape, dtype=bool)
+        self.notrig  = np.empty(s.shape, dtype=bool)
+        self.outcome = np.empty(s.shape, dtype=bool)
+        self.pruned  = np.empty(s.shape, dtype=bool)
+        self.n_trig  = np.zeros(K, dtype=np.int64)
+
+    # ----- per-member draws (same calls as StepEngine) -----
+    def draw_normal(self, k):
+        if self.counter:
+            return self.rngs[k].fill_normal(self.work[k], self.t, NOISE)
+        return self.rngs[k].standard_normal(dtype=self.dtype, out=self.work[k])
+
+    def draw_uniform(self, k, purpose):
+        if self.counter:
+            return self.rngs[k].fill_uniform(self.work[k], self.t, purpose)
+        return self.rngs[k].random(dtype=self.dtype, out=self.work[k])
+
+    def keep(self, members):
+        """Restrict the batch to `members` (indices into the current batch)."""
+        members = np.asarray(members, dtype=np.intp)
+        for name in ("s", "R_count", "p1", "p1_hi", "decided", "work", "nb", "trig",
+                     "notrig", "outcome", "pruned", "beta", "lambda_r", "eta_thresh",
+                     "noise_std", "_lam", "_eta", "_noise", "prune_count", "R_total",
+                     "n_trig", "mean_s"):
+            value = getattr(self, name, None)
+            if value is not None:
+                setattr(self, name, value[members])
+        self.rngs = [self.rngs[k] for k in members]
+        self.K = len(members)
+
+    def count(self, mask):
+        return np.count_nonzero(mask.reshape(self.K, -1), axis=1)
+
+    # ----- phases -----
+    def trigger_prob(self, k, drive_t):
+        margin = float(self.eta_thresh[k]) - abs(drive_t)
+        std = float(self.noise_std[k])
+        if std <= 0.0:
+            return 1.0 if margin < 0.0 else 0.0
+        if margin <= 0.0:
+            return 1.0
+        return math.erfc(margin / (std * math.sqrt(2.0)))
+
+    def trigger(self, drive):
+        if self.trigger_mode == "bernoulli":
+            for k in range(self.K):
+                p = self.trigger_prob(k, float(drive[k]))
+                if p >= 1.0:
+                    self.trig[k].fill(True)
+                elif p <= 0.0:
+                    self.trig[k].fill(False)
+                else:
+                    self.draw_uniform(k, TRIGGER)
+                    np.less(self.work[k], p, out=self.trig[k])
+        else:
+            w = self.work
+            for k in range(self.K):
+                self.draw_normal(k)
+            w *= self._noise
+            np.abs(w, out=w)
+            # drive_t is a float64 scalar in StepEngine, so add in float64
+            w += np.abs(drive).reshape(self.K, 1, 1, 1)
+            np.greater(w, self._eta, out=self.trig)
+        self.n_trig = self.count(self.trig)
+        return self.n_trig
+
+    def collapse(self):
+        if not self.n_trig.any():
+            return
+        trig, w = self.trig, self.work
+        for k in np.flatnonzero(self.n_trig):
+            self.draw_uniform(k, COLLAPSE)
+        # members without triggers hold stale draws, masked out by trig
+        np.less(w, self.p1, out=self.outcome)
+        np.not_equal(self.outcome, self.p1_hi, out=self.pruned)
+        self.pruned &= self.decided
+        self.pruned &= trig
+        self.prune_count += self.count(self.pruned)
+        np.copyto(self.s, self.outcome, where=trig)
+        self.R_count += trig
+        self.R_total += self.trace_cost * self.n_trig.astype(np.float64)
+
+    def retain(self):
+        if (self.n_trig == self.s[0].size).all():
+            return
+        s, nb = self.s, self.nb
+        np.logical_not(self.trig, out=self.notrig)
+        for k in range(self.K):
+            neighbor_mean_3d(s[k], out=nb[k])
+        nb -= s
+        nb *= self._lam
+        nb += s
+        np.clip(nb, 0.0, 1.0, out=nb)
+        np.copyto(s, nb, where=self.notrig)
+
+    def mean(self):
+        return np.array([s_k.mean(dtype=np.float64) for s_k in self.s])
+
+    def drift(self):
+        s, w = self.s, self.work
+        self.mean_s = self.mean()
+        mean = self.mean_s.reshape(self.K, 1, 1, 1).astype(self.dtype)
+        np.subtract(s, mean, out=w)
+        w *= self.a_grow
+        np.subtract(w, self.b_damp * self.trace_cost, out=w, where=self.trig)
+        w *= self.eps_drift
+        s += w
+        np.clip(s, 0.0, 1.0, out=s)
+
+    def step(self, drive):
+        """Advance all members one step; `drive` holds each member's drive_t."""
+        self.trigger(drive)
+        self.collapse()
+        self.retain()
+        self.drift()
+        self.t += 1
+        return self.n_trig
+
+
+def member_params(points):
+    """Per-member parameter columns: each point overrides the ut26_cosmo3d values."""
+    base = dict(sim.sim_params(), DRIVE_A=sim.DRIVE_A, DRIVE_W=sim.DRIVE_W)
+    params = {k: [float(p.get(k, base[k])) for p in points] for k in MEMBER_KEYS}
+    params.update({k: base[k] for k in ("TRACE_COST", "EPS_DRIFT", "A_GROW", "B_DAMP")})
+    return params
+
+
+def run_batch(points, b, s0, rng0):
+    K = len(points)
+    params = member_params(points)
+    if sim.RNG_MODE == "counter":
+        rngs = [CounterRNG(sim.SEED)] * K
+    else:
+        rngs = [copy.deepcopy(rng0) for _ in range(K)]
+    s = np.broadcast_to(s0, (K,) + s0.shape).copy()
+    eng = EnsembleStepEngine(s, b, params, rngs, trigger=sim.TRIGGER_MODE)
+    A = np.asarray(params["DRIVE_A"]); W = np.asarray(params["DRIVE_W"])
+    n_vox = s0.size
+    monitors = [sim.convergence_monitor(W[k]) for k in range(K)]
+    active = list(range(K))          # batch slot j holds member active[j]
+    final = [None] * K
+
+    def record(j, t):
+        k = active[j]
+        final[k] = dict(mean_s=float(eng.s[j].mean(dtype=np.float64)),
+                        R_total=float(eng.R_total[j]), prunes=int(eng.prune_count[j]),
+                        **summary_fields(monitors[k], t, n_vox, int(eng.prune_count[j]),
+                                         float(eng.R_total[j]), sim.TRACE_COST))
+
+    for t in range(sim.T):
+        drive = np.array([A[k] * np.sin(W[k] * t) for k in active])
+        last_prunes = eng.prune_count.copy()
+        eng.step(drive)
+        if (t % sim.SNAP_EVERY == 0) or (t == sim.T-1):
+            print(f"[{t:4d}] mean s=" + " ".join(f"{m:.3f}" for m in eng.mean()))
+        if sim.CONVERGE:
+            d_prunes = eng.prune_count - last_prunes
+            stopped = [j for j, k in enumerate(active) if monitors[k].update(
+                t, eng.mean_s[j], eng.n_trig[j] / n_vox, d_prunes[j] / n_vox)]
+            if stopped:
+                for j in stopped:
+                    record(j, t)
+                    print(f"       {points[active[j]]['RUN_TAG']} converged at t={t}")
+                kept = [j for j in range(len(active)) if j not in stopped]
+                if not kept:
+                    break
+                eng.keep(kept)
+                active = [active[j] for j in kept]
+    else:
+        for j in range(len(active)):
+            record(j, sim.T - 1)
+
+    summaries = []
+    for k, p in enumerate(points):
+        tag = str(p["RUN_TAG"]).strip().replace("\\", "_").replace("/", "_")
+        outdir = os.path.join(sim.OUTDIR_BASE, tag)
+        key = point_key(p)
+        # a summary alone: drop another configuration's outputs from the folder
+        if clear_stale(outdir, key):
+            print(f"       {tag}: removed stale outputs of another configuration")
+        os.makedirs(outdir, exist_ok=True)
+        summary = dict(
+            N=sim.N, T=sim.T, seed=sim.SEED,
+            **{key: params[key][k] for key in
+               ("BETA", "LAMBDA_R", "ETA_THRESH", "DRIVE_A", "DRIVE_W", "NOISE_STD")},
+            final_mean_s=final[k]["mean_s"],
+            total_trace_R=final[k]["R_total"],
+            total_prunes=final[k]["prunes"],
+            **{key: final[k][key] for key in final[k]
+               if key not in ("mean_s", "R_total", "prunes")},
+            CONVERGE=sim.CONVERGE, **sim.converge_config(),
+            COLLAPSE_MODE="dense",
+            TRIGGER_MODE=sim.TRIGGER_MODE,
+            PRECISION=sim.PRECISION,
+            BACKEND=eng.backend,
+            RNG=sim.RNG_MODE,
+            ENSEMBLE_K=K,
+            CODE_VERSION=code_version(),
+            CONFIG_HASH=key,
+            OUTDIR=outdir
+        )
+        atomic_write(os.path.join(outdir, "summary.json"),
+                     lambda f: f.write(json.dumps(summary, indent=2).encode()))
+        record_result(summary)
+        summaries.append(summary)
+    return summaries
+
+
+def run_ensemble(points, batch=None):
+    """Run every point (a dict of MEMBER_KEYS overrides plus RUN_TAG) and
+    return their summary dicts, in order."""
+    if sim.COLLAPSE_MODE != "dense" or sim.TRIGGER_MODE not in ("noise", "bernoulli"):
+        raise ValueError("ensemble runs support COLLAPSE_MODE=dense with "
+                         "TRIGGER_MODE=noise or bernoulli (use ENSEMBLE=0)")
+    if not sim.drive_schedule().constant:
+        raise ValueError("ensemble runs use constant DRIVE_A/DRIVE_W drives; "
+                         "unset DRIVE_SCHEDULE (or use ENSEMBLE=0)")
+    batch = batch or ENSEMBLE_K
+    raw = sim.gaussian_field_from_P0(sim.N)
+    b   = raw / (np.max(np.abs(raw)) + 1e-12)
+    s0  = np.clip(0.5 + 0.1*raw, 0.0, 1.0).astype(sim.DTYPE, copy=False)
+    del raw
+    rng0 = copy.deepcopy(sim.rng)       # step stream state right after the IC draw
+
+    summaries = []
+    for i in range(0, len(points), batch):
+        chunk = points[i:i + batch]
+        print(f">> Ensemble batch {i // batch + 1}: "
+              + ", ".join(str(p["RUN_TAG"]) for p in chunk))
+        summaries += run_batch(chunk, b, s0, rng0)
+    return summaries
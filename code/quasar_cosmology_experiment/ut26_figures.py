@@ -0,0 +1,164 @@
+"""
+UT26 per-run figures, rendered from the files a run leaves in its OUTDIR
+
+    kappa_map.png   from kappa_map.npy
+    kappa_ps.png    from kappa_ps.csv
+    hmf.png         from hmf.csv
+    summary.png     from timeseries.csv (<s>, H, C, cumulative prunes)
+
+ut26_cosmo3d.py writes those raw files in every run.  With FIGURES=0 it
+skips the rendering (and never imports matplotlib), so sweep points only pay
+for the physics; figures are made later, for the runs worth looking at:
+
+    python ut26_figures.py                       # every run under ut26_cosmo3d_outputs
+    python ut26_figures.py RUN_DIR [RUN_DIR ...] -j 8
+    python ut26_figures.py --force               # re-render up-to-date figures too
+
+Runs are rendered in parallel worker processes with the Agg backend.  A run
+is skipped when its summary.png is newer than its timeseries.csv.  Missing
+inputs (no halos, a dist run without C) just leave that figure or curve out.
+"""
+
+import os, sys, glob, argparse
+import multiprocessing as mp
+import numpy as np
+
+OUTDIR_BASE = "ut26_cosmo3d_outputs"
+KAPPA_NAME  = "kappa_map.npy"
+SERIES_NAME = "timeseries.csv"
+
+
+def _pyplot():
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    return plt
+
+
+def write_series(outdir, times, mean_s, H, C, prunes):
+    np.savetxt(os.path.join(outdir, SERIES_NAME), np.c_[times, mean_s, H, C, prunes],
+               delimiter=",", header="t,mean_s,H,C,prunes", comments="")
+
+
+def render_kappa_map(outdir, plt):
+    path = os.path.join(outdir, KAPPA_NAME)
+    if not os.path.exists(path):
+        return False
+    kappa = np.load(path)
+    plt.figure(figsize=(5,4))
+    plt.imshow(kappa.T, origin="lower", cmap="viridis")
+    plt.colorbar(label="kappa (proj. delta)")
+    plt.title("Weak-lensing-like κ (projection)")
+    plt.tight_layout()
+    plt.savefig(os.path.join(outdir,"kappa_map.png"), dpi=140)
+    plt.close()
+    return True
+
+
+def render_kappa_ps(outdir, plt):
+    path = os.path.join(outdir, "kappa_ps.csv")
+    if not os.path.exists(path):
+        return False
+    km2, P2 = np.loadtxt(path, delimiter=",", skiprows=1, ndmin=2).T
+    plt.figure(figsize=(5,4))
+    plt.plot(km2, P2, lw=1.7)
+    plt.xlabel("k (2D)"); plt.ylabel("P_kappa")
+    plt.title("κ power spectrum (toy)")
+    plt.grid(alpha=0.3)
+    plt.tight_layout()
+    plt.savefig(os.path.join(outdir,"kappa_ps.png"), dpi=140)
+    plt.close()
+    return True
+
+
+def render_hmf(outdir, plt):
+    path = os.path.join(outdir, "hmf.csv")
+    if not os.path.exists(path):
+        return False
+    centers, hist = np.loadtxt(path, delimiter=",", skiprows=1, ndmin=2).T
+    plt.figure(figsize=(5,4))
+    plt.loglog(centers, np.maximum(hist,1e-6), marker='o')
+    plt.xlabel("halo cell count (proxy mass)")
+    plt.ylabel("counts"); plt.title("Toy HMF (connected components)")
+    plt.grid(alpha=0.3, which="both")
+    plt.tight_layout()
+    plt.savefig(os.path.join(outdir,"hmf.png"), dpi=140)
+    plt.close()
+    return True
+
+
+def render_summary(outdir, plt):
+    path = os.path.join(outdir, SERIES_NAME)
+    if not os.path.exists(path):
+        return False
+    d = np.genfromtxt(path, delimiter=",", names=True, ndmin=1)
+    times = d["t"]
+    plt.figure(figsize=(12,4))
+    plt.subplot(1,3,1)
+    plt.plot(times, d["mean_s"], lw=1.7); plt.grid(alpha=0.3)
+    plt.xlabel("time"); plt.ylabel("<s>"); plt.title("Mean coherence (saturation)")
+
+    plt.subplot(1,3,2)
+    plt.plot(times, d["H"], label="H")
+    if "C" in d.dtype.names:
+        plt.plot(times, d["C"], label="C")
+    plt.grid(alpha=0.3)
+    plt.xlabel("time"); plt.title("H, C over time"); plt.legend()
+
+    plt.subplot(1,3,3)
+    plt.plot(times, d["prunes"], lw=1.7); plt.grid(alpha=0.3)
+    plt.xlabel("time"); plt.ylabel("cumulative prunes"); plt.title("Lawful pruning")
+
+    plt.tight_layout()
+    plt.savefig(os.path.join(outdir,"summary.png"), dpi=150)
+    plt.close()
+    return True
+
+
+def render_run(outdir):
+    """Render every figure whose inputs exist in `outdir`; returns their names."""
+    plt = _pyplot()
+    done = []
+    for name, render in (("kappa_map.png", render_kappa_map), ("kappa_ps.png", render_kappa_ps),
+                         ("hmf.png", render_hmf), ("summary.png", render_summary)):
+        if render(outdir, plt):
+            done.append(name)
+    return done
+
+
+def up_to_date(outdir):
+    png, src = os.path.join(outdir, "summary.png"), os.path.join(outdir, SERIES_NAME)
+    return os.path.exists(png) and os.path.getmtime(png) >= os.path.getmtime(src)
+
+
+def _render_job(outdir):
+    return outdir, render_run(outdir)
+
+
+def find_runs(base=OUTDIR_BASE):
+    return sorted(os.path.dirname(p) for p in glob.glob(os.path.join(base, "*", SERIES_NAME)))
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Render UT26 run figures (Agg, parallel)")
+    ap.add_argument("runs", nargs="*", help=f"run folders (default: all under {OUTDIR_BASE})")
+    ap.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1,
+                    help="worker processes")
+    ap.add_argument("--force", action="store_true", help="re-render up-to-date runs")
+    args = ap.parse_args(argv)
+
+    runs = args.runs or find_runs()
+    runs = [r for r in runs if os.path.exists(os.path.join(r, SERIES_NAME))]
+    todo = runs if args.force else [r for r in runs if not up_to_date(r)]
+    print(f"{len(runs)} runs, {len(todo)} to render, {min(args.jobs, max(len(todo), 1))} workers")
+    if args.jobs > 1 and len(todo) > 1:
+        with mp.Pool(min(args.jobs, len(todo))) as pool:
+            results = pool.map(_render_job, todo, chunksize=1)
+    else:
+        results = [_render_job(r) for r in todo]
+    for outdir, names in results:
+        print(f"{outdir}: {', '.join(names) or 'nothing to render'}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
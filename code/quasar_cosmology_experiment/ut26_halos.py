@@ -0,0 +1,147 @@
+"""
+UT26 toy halo finder: periodic friends-of-friends and a halo catalogue
+
+FoF groups are the 6-connected components of the thresholded field
+delta_I > DELTA_THR on the periodic lattice:
+
+    lab, nlab = label_periodic(mask)            # scipy.ndimage.label, then
+                                                # union-find across the faces
+    cat = halo_catalogue(lab, nlab, delta)      # one column per quantity
+    write_catalogue(path, cat)                  # halos.npz
+
+label_periodic pairs the labels on opposite faces of every periodic axis and
+merges them with an array union-find (hook the larger root onto the smaller
+one, then pointer-jump until every label points at its root), so components
+crossing a face are one halo.  Labels are renumbered 1..nlab in order of
+their first voxel; with no periodic axes they equal scipy's labels.
+
+The catalogue is computed in one pass over the labelled voxels with
+bincount / reduceat, never one full-grid mask per label:
+
+    id, size                 label and voxel count (proxy mass)
+    com_x, com_y, com_z      centre of mass in grid units, wrapped into [0, N)
+    peak_delta               maximum delta_I in the halo
+    bbox_lo_x/y/z            lower corner of the bounding box (wrapped)
+    bbox_size_x/y/z          bounding box extent in voxels
+
+Positions are unwrapped about the halo's first voxel, so centre and box are
+exact for halos smaller than half the box along each axis.
+"""
+
+import numpy as np
+
+try:
+    from scipy.ndimage import label
+    SCIPY_OK = True
+except Exception:
+    SCIPY_OK = False
+
+CATALOGUE_NAME = "halos.npz"
+AXES = "xyz"
+
+STRUCTURE6 = np.zeros((3,3,3), dtype=int)
+STRUCTURE6[1,1,0] = STRUCTURE6[1,1,2] = 1
+STRUCTURE6[1,0,1] = STRUCTURE6[1,2,1] = 1
+STRUCTURE6[0,1,1] = STRUCTURE6[2,1,1] = 1
+
+
+def compress(parent):
+    """Pointer-jump until every entry holds its root."""
+    while True:
+        up = parent[parent]
+        if np.array_equal(up, parent):
+            return parent
+        parent = up
+
+
+def union_pairs(parent, a, b):
+    """Union-find over label pairs (a[i], b[i]); returns the compressed parent
+    array, in which every label points at the smallest label of its set."""
+    parent = compress(parent)
+    while len(a):
+        ra, rb = parent[a], parent[b]
+        diff = ra != rb
+        if not diff.any():
+            break
+        a, b = a[diff], b[diff]
+        np.minimum.at(parent, np.maximum(ra[diff], rb[diff]), np.minimum(ra[diff], rb[diff]))
+        parent = compress(parent)
+    return parent
+
+
+def relabel(lab, parent):
+    """Map labels to their roots, renumbered 1..n in root order; returns (lab, n)."""
+    is_root = parent == np.arange(parent.size)
+    new = (np.cumsum(is_root) - 1)[parent].astype(lab.dtype)
+    return new[lab], int(is_root.sum()) - 1
+
+
+def face_pairs(lab, axes):
+    """Label pairs touching across the periodic faces of `axes`."""
+    pa, pb = [], []
+    for ax in axes:
+        a = np.take(lab, 0, axis=ax).ravel()
+        b = np.take(lab, -1, axis=ax).ravel()
+        both = (a > 0) & (b > 0)
+        pa.append(a[both]); pb.append(b[both])
+    if not pa:
+        return np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.intp)
+    return np.concatenate(pa).astype(np.intp), np.concatenate(pb).astype(np.intp)
+
+
+def label_periodic(mask, axes=(0, 1, 2)):
+    """6-connected components of `mask`, periodic along `axes`."""
+    if not SCIPY_OK:
+        raise ImportError("scipy is required for the halo finder")
+    lab, nlab = label(mask, STRUCTURE6)
+    if nlab == 0 or not axes:
+        return lab, nlab
+    a, b = face_pairs(lab, axes)
+    parent = union_pairs(np.arange(nlab + 1), a, b)
+    return relabel(lab, parent)
+
+
+def halo_catalogue(lab, nlab, delta):
+    """Columnar catalogue (dict of 1D arrays, one row per label 1..nlab)."""
+    shape = lab.shape
+    idx = np.flatnonzero(lab)
+    l = lab.ravel()[idx]
+    order = np.argsort(l, kind="stable")
+    ls = l[order]
+    starts = np.flatnonzero(np.r_[True, ls[1:] != ls[:-1]]) if ls.size else np.zeros(0, np.intp)
+    size = np.bincount(l, minlength=nlab + 1)[1:]
+
+    com, bbox_lo, bbox_size = {}, {}, {}
+    coords = np.unravel_index(idx, shape)
+    first = idx[order[starts]]                    # first voxel of each label
+    ref_all = np.unravel_index(first, shape)
+    for ax, name in enumerate(AXES):
+        n = shape[ax]
+        ref = ref_all[ax]
+        d = (coords[ax] - ref[l - 1] + n//2) % n - n//2
+        mean_d = np.bincount(l, weights=d, minlength=nlab + 1)[1:] / np.maximum(size, 1)
+        com[f"com_{name}"] = (ref + mean_d) % n
+        ds = d[order]
+        lo = np.minimum.reduceat(ds, starts) if ds.size else np.zeros(0, np.int64)
+        hi = np.maximum.reduceat(ds, starts) if ds.size else np.zeros(0, np.int64)
+        bbox_lo[f"bbox_lo_{name}"]     = ((ref + lo) % n).astype(np.int32)
+        bbox_size[f"bbox_size_{name}"] = (hi - lo + 1).astype(np.int32)
+    pd = np.asarray(delta).ravel()[idx][order]
+    peak = np.maximum.reduceat(pd, starts) if pd.size else np.zeros(0)
+    return dict(id=np.arange(1, nlab + 1, dtype=np.int32), size=size.astype(np.int64),
+                **com, peak_delta=peak, **bbox_lo, **bbox_size)
+
+
+def find_halos(delta, thr, periodic=True):
+    """Catalogue of the FoF groups of delta > thr."""
+    lab, nlab = label_periodic(delta > thr, axes=(0, 1, 2) if periodic else ())
+    return halo_catalogue(lab, nlab, delta)
+
+
+def write_catalogue(path, cat):
+    np.savez(path, **cat)
+
+
+def read_catalogue(path):
+    with np.load(path) as z:
+        return {k: z[k] for k in z.files}
@@ -0,0 +1,116 @@
+"""
+UT26 initial conditions: Gaussian random field with a BAO-like P0(k)
+
+Two generators of the unit-variance, zero-mean field behind b(x) and s(x,0):
+
+    "reference" : the original construction, F = amp*(pr + i*pi) on the full
+                  N³ grid, field = Re(ifftn(F)).  Default; reproduces the
+                  original field and leaves the Generator where it did.
+    "rfft"      : Hermitian noise drawn on the N×N×(N/2+1) half grid and
+                  transformed with irfftn, so half the draws, memory and FFT
+                  work.  Re(ifftn(F)) is the Hermitian field (F(k)+F*(-k))/2,
+                  so interior kz planes are weighted by 1/√2 against the
+                  self-conjugate kz=0 / Nyquist planes; the result has the
+                  same covariance as "reference" but is a different
+                  realisation for the same seed.
+
+k-grids are built by broadcasting 1D frequency vectors instead of
+materialising meshgrids (identical values).
+
+Cache: initial_field(..., cache_dir=...) stores the normalised field as
+ic_<key>.npy plus ic_<key>.json holding the Generator state after the draw,
+keyed by method, N, the spectrum parameters (NS_INDEX, K0_CUTOFF, BAO_*) and
+the Generator state before the draw (for a fresh default_rng(SEED) that is
+the seed).  A hit memory-maps the field read-only and moves the Generator on
+to the stored state, so the step stream continues exactly as after a fresh
+draw.  Files are written atomically, so concurrent runs may share a cache.
+"""
+
+import os, json, hashlib
+import numpy as np
+
+from ut26_checkpoint import atomic_write
+
+IC_METHODS = ("reference", "rfft")
+SPECTRUM_KEYS = ("NS_INDEX", "K0_CUTOFF", "BAO_A", "BAO_R", "BAO_SIG")
+
+
+def kgrid(n, half=False):
+    """|k| on the FFT grid (on the rfft half grid if `half`), by broadcasting."""
+    k = np.fft.fftfreq(n)*n
+    kz = np.fft.rfftfreq(n)*n if half else k
+    return np.sqrt(k[:, None, None]**2 + k[None, :, None]**2 + kz[None, None, :]**2)
+
+
+def bao_like_P0(kk, spec):
+    P_smooth = (kk + 1e-12)**spec["NS_INDEX"] * np.exp(-(kk*spec["K0_CUTOFF"])**2)
+    wiggle   = 1.0 + spec["BAO_A"] * np.sin(kk * (spec["BAO_R"]/800.0)) \
+                   * np.exp(-(kk*spec["BAO_SIG"]*10.0)**2)
+    return P_smooth * wiggle
+
+
+def normalise(field):
+    field -= field.mean()
+    field /= (field.std() + 1e-12)
+    return field
+
+
+def field_reference(n, rng, spec):
+    kk  = kgrid(n)
+    P0  = bao_like_P0(kk, spec)
+    amp = np.sqrt(np.maximum(P0, 0.0)) / np.sqrt(2.0)
+    pr  = rng.normal(size=(n,n,n))
+    pi  = rng.normal(size=(n,n,n))
+    F   = amp * (pr + 1j*pi)
+    F[0,0,0] = 0.0
+    return normalise(np.fft.ifftn(F).real)
+
+
+def field_rfft(n, rng, spec):
+    h = n//2 + 1
+    amp = bao_like_P0(kgrid(n, half=True), spec)
+    np.maximum(amp, 0.0, out=amp)
+    np.sqrt(amp, out=amp)
+    amp /= np.sqrt(2.0)
+    # interior kz modes stand for a ±k pair; kz=0 and Nyquist are their own partner
+    amp[:, :, 1:(n+1)//2] *= np.sqrt(0.5)
+    F = np.empty((n, n, h), dtype=np.complex128)
+    F.real = rng.standard_normal((n, n, h))
+    F.imag = rng.standard_normal((n, n, h))
+    F *= amp
+    del amp
+    F[0,0,0] = 0.0
+    return normalise(np.fft.irfftn(F, s=(n, n, n)))
+
+
+def cache_key(n, rng, spec, method):
+    key = dict(method=method, N=int(n), rng_state=rng.bit_generator.state,
+               **{k: float(spec[k]) for k in SPECTRUM_KEYS})
+    return hashlib.sha1(json.dumps(key, sort_keys=True).encode()).hexdigest()[:16], key
+
+
+def initial_field(n, rng, spec, method="reference", cache_dir=None):
+    """Normalised N³ Gaussian field for P0(k); memory-mapped from `cache_dir`
+    when an identical field was generated before."""
+    if method not in IC_METHODS:
+        raise ValueError(f"unknown IC method: {method!r}")
+    make = field_rfft if method == "rfft" else field_reference
+    if cache_dir is None:
+        return make(n, rng, spec)
+
+    digest, key = cache_key(n, rng, spec, method)
+    npy  = os.path.join(cache_dir, f"ic_{digest}.npy")
+    meta = os.path.join(cache_dir, f"ic_{digest}.json")
+    if os.path.exists(npy) and os.path.exists(meta):
+        with open(meta) as f:
+            stored = json.load(f)
+        if stored["key"] == json.loads(json.dumps(key)):
+            rng.bit_generator.state = stored["rng_after"]
+            return np.load(npy, mmap_mode="r")
+
+    field = make(n, rng, spec)
+    os.makedirs(cache_dir, exist_ok=True)
+    atomic_write(npy, lambda f: np.save(f, field))
+    atomic_write(meta, lambda f: f.write(json.dumps(
+        dict(key=key, rng_after=rng.bit_generator.state)).encode()))
+    return field
@@ -0,0 +1,159 @@
+"""
+UT26 adaptive regime-boundary refinement over a 2-D parameter plane
+
+A Refiner samples a rectangle [x0, x1] x [y0, y1] on a lattice of
+(coarse-1) * 2**levels + 1 points per axis, where coarse is one count for
+both axes or a (cx, cy) pair.  It starts from the coarse grid, with cells of
+2**levels lattice steps.  It then splits every
+cell whose perimeter is mixed, i.e. whose labelled points (its corners and
+any points already labelled on its edges by smaller neighbours) carry more
+than one label.  A split cell has its edge midpoints and centre labelled
+and becomes four half-size cells.  Rounds repeat until no mixed cell larger
+than one lattice step is left, or until the next round would exceed
+`budget` labelled points.  With budget, the largest mixed cells are split
+first.
+
+Homogeneous regions stay at the coarse spacing, while cells along a regime
+boundary end at the finest spacing.  The boundary is therefore resolved like
+a full fine grid at a fraction of the evaluations: levels=4 on a 5 x 5 coarse
+grid is a 65 x 65 lattice.
+
+boundary(label) traces the edge of the region carrying `label` by marching
+squares over the leaf cells.  Each leaf is walked around its perimeter,
+hanging points included.  The perimeter segments whose ends differ in
+membership are crossed at their midpoints, so neighbouring leaves share
+their crossings.  These crossings are chained into polylines, which are open
+where they meet the edge of the plane.
+
+    ref = Refiner((0.40, 0.70), (0.10, 0.30), coarse=5, levels=4, budget=400)
+    ref.run(evaluate)          # evaluate([(x, y), ...]) -> [label, ...]
+    ref.write_boundary("boundary.csv", "eta", "lambdaR")
+"""
+
+import io
+
+from ut26_checkpoint import atomic_write
+
+
+class Refiner:
+    """Quadtree refinement of a labelled 2-D parameter plane."""
+
+    def __init__(self, x_range, y_range, coarse=5, levels=4, budget=None):
+        cx, cy = (coarse, coarse) if isinstance(coarse, int) else coarse
+        if min(cx, cy) < 2 or levels < 0:
+            raise ValueError("refinement needs coarse >= 2 and levels >= 0")
+        self.x_range, self.y_range = x_range, y_range
+        self.step = 2**levels
+        self.nx = (cx - 1) * self.step             # lattice index of x1
+        self.ny = (cy - 1) * self.step             # lattice index of y1
+        self.budget = budget
+        self.labels = {}                           # (i, j) -> label
+        self.round = {}                            # (i, j) -> refinement round
+        self.leaves = {(i, j, self.step) for i in range(0, self.nx, self.step)
+                       for j in range(0, self.ny, self.step)}
+
+    def x(self, i):
+        x0, x1 = self.x_range
+        return round(x0 + (x1 - x0) * i / self.nx, 10)
+
+    def y(self, j):
+        y0, y1 = self.y_range
+        return round(y0 + (y1 - y0) * j / self.ny, 10)
+
+    def point(self, p):
+        return self.x(p[0]), self.y(p[1])
+
+    def perimeter(self, cell):
+        """Labelled lattice points around `cell`, counter-clockwise."""
+        i, j, s = cell
+        ring = ([(i + k, j) for k in range(s)] + [(i + s, j + k) for k in range(s)]
+                + [(i + s - k, j + s) for k in range(s)] + [(i, j + s - k) for k in range(s)])
+        return [p for p in ring if p in self.labels]
+
+    def mixed(self, cell):
+        return len({self.labels[p] for p in self.perimeter(cell)}) > 1
+
+    def _evaluate(self, evaluate, points, rnd):
+        points = sorted(points)
+        for p, label in zip(points, evaluate([self.point(p) for p in points])):
+            self.labels[p] = label
+            self.round[p] = rnd
+
+    def run(self, evaluate):
+        """Label the coarse grid, then refine mixed cells round by round;
+        evaluate(list of (x, y)) returns their labels in order."""
+        coarse = {(i, j) for i in range(0, self.nx + 1, self.step)
+                  for j in range(0, self.ny + 1, self.step)}
+        self._evaluate(evaluate, coarse, 0)
+        rnd = 0
+        while True:
+            mixed = sorted((c for c in self.leaves if c[2] > 1 and self.mixed(c)),
+                           key=lambda c: (-c[2], c))
+            split, new = [], set()
+            for i, j, s in mixed:
+                h = s // 2
+                mids = {(i + h, j), (i + s, j + h), (i + h, j + s), (i, j + h), (i + h, j + h)}
+                mids -= self.labels.keys()
+                if self.budget is not None and len(self.labels) + len(new | mids) > self.budget:
+                    break
+                split.append((i, j, s))
+                new |= mids
+            if not split:
+                break
+            rnd += 1
+            self._evaluate(evaluate, new, rnd)
+            for i, j, s in split:
+                h = s // 2
+                self.leaves.remove((i, j, s))
+                self.leaves |= {(i, j, h), (i + h, j, h), (i, j + h, h), (i + h, j + h, h)}
+            print(f">> Refinement round {rnd}: {len(new)} points, {len(self.labels)} total")
+        return self
+
+    # ----- boundary -----
+    def boundary(self, label):
+        """Polylines [(x, y), ...] along the edge of the `label` region."""
+        adj = {}
+        for cell in sorted(self.leaves):
+            ring = self.perimeter(cell)
+            inside = [self.labels[p] == label for p in ring]
+            # crossing points in doubled lattice coordinates (exact midpoints)
+            cross = [(ring[k][0] + ring[k - 1][0], ring[k][1] + ring[k - 1][1])
+                     for k in range(len(ring)) if inside[k] != inside[k - 1]]
+            for a, b in zip(cross[0::2], cross[1::2]):
+                adj.setdefault(a, []).append(b)
+                adj.setdefault(b, []).append(a)
+        lines, seen = [], set()
+        # open chains start at an end (degree 1); what is left are closed loops
+        starts = [q for q in adj if len(adj[q]) == 1] + sorted(adj)
+        for start in starts:
+            if start in seen:
+                continue
+            line, q = [start], start
+            seen.add(start)
+            while True:
+                nxt = [r for r in adj[q] if r not in seen]
+                if not nxt:
+                    break
+                q = nxt[0]
+                line.append(q)
+                seen.add(q)
+            if len(adj[start]) == 2 and start in adj[q] and len(line) > 2:
+                line.append(start)              # close the loop
+            lines.append([(self.x(a / 2), self.y(b / 2)) for a, b in line])
+        return lines
+
+    def write_boundary(self, path, x_name="x", y_name="y", labels=None):
+        """csv of the boundary polylines of every label (or `labels`):
+        label, path (polyline number), x, y in polyline order."""
+        labels = sorted(set(self.labels.values())) if labels is None else labels
+        buf = io.StringIO()
+        buf.write(f"label,path,{x_name},{y_name}\n")
+        n = 0
+        for label in labels:
+            for line in self.boundary(label):
+                for x, y in line:
+                    buf.write(f"{label},{n},{x!r},{y!r}\n")
+                n += 1
+        atomic_write(path, lambda f: f.write(buf.getvalue().encode()))
+        print("Wrote:", path)
+        return n
@@ -0,0 +1,127 @@
+"""
+UT26 seed replicates: every sweep point run with M seeds (common random numbers)
+
+REPLICATES=M runs each parameter point of a sweep with the seeds SEED,
+SEED+1, ..., SEED+M-1 (SEED from ut26_cosmo3d).  Replicate k uses the same
+seed at every point, i.e. the same initial field and the same step stream
+(common random numbers).  Differences between points are then not blurred
+by seed noise, and a regime label changes between replicates only where the
+realisation decides it.
+
+A replicate is an ordinary sweep point with a SEED key and RUN_TAG
+<tag>_s<seed>.  All M x points runs therefore go through iter_sweep() in
+SWEEP_WORKERS processes, or iter_ensemble() with one set of batches per
+seed sharing that seed's initial field.  The run cache and the results store
+treat them like any other run.
+
+replicate_sweep() streams the replicate rows to <name>_replicates.csv (the
+sweep's row plus point index and seed) and writes <name>.csv with one row per
+point:
+
+    the sweep's columns     value columns hold the mean over the replicates,
+                            the label column the most frequent label
+    <value>_ci              half-width of the 95% Student-t interval of the mean
+    p_<label>               share of the replicates with that label
+    confidence              share of the most frequent label
+    replicates              M
+
+The leading columns are those of the single-seed table, so the plotting
+scripts read either and shade by confidence when the column is there.
+
+    from ut26_replicates import replicate_sweep
+    rows = replicate_sweep(points, row, run, "threshold_map.csv", HEADER,
+                           values=("final_mean_s", "total_prunes"),
+                           label="regime", labels=(0, 1, 2))
+"""
+
+import os, math
+import numpy as np
+
+import ut26_cosmo3d as sim
+from ut26_sweep import SweepTable
+
+REPLICATES = int(os.getenv("REPLICATES", 1))
+
+# two-sided 95% Student-t quantiles for 1..30 degrees of freedom
+T95 = (12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+       2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086,
+       2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042)
+
+
+def seeds(m=None, base=None):
+    m = REPLICATES if m is None else m
+    base = sim.SEED if base is None else base
+    return [base + k for k in range(m)]
+
+
+def expand(points, m=None):
+    """[(point index, seed, replicate point)], point by point."""
+    return [(i, seed, dict(p, SEED=seed, RUN_TAG=f"{p['RUN_TAG']}_s{seed}"))
+            for i, p in enumerate(points) for seed in seeds(m)]
+
+
+def mean_ci(values):
+    """Mean and half-width of its 95% t interval (nan for one value)."""
+    v = np.asarray(values, dtype=np.float64)
+    if len(v) < 2:
+        return float(v.mean()), math.nan
+    t = T95[len(v) - 2] if len(v) - 1 <= len(T95) else 1.960
+    return float(v.mean()), float(t * v.std(ddof=1) / math.sqrt(len(v)))
+
+
+def aggregate(rows, header, values, label=None, labels=()):
+    """One point's replicate rows -> its row in the replicate table."""
+    cols = header.split(",")
+    data = np.asarray(rows, dtype=np.float64)
+    out = list(data[0])
+    cis = []
+    for c in values:
+        j = cols.index(c)
+        out[j], ci = mean_ci(data[:, j])
+        cis.append(ci)
+    probs = []
+    if label is not None:
+        j = cols.index(label)
+        probs = [float(np.mean(data[:, j] == l)) for l in labels]
+        out[j] = labels[int(np.argmax(probs))]
+    return out + cis + probs + ([max(probs)] if probs else []) + [len(rows)]
+
+
+def aggregate_header(header, values, label=None, labels=()):
+    extra = [f"{c}_ci" for c in values] + [f"p_{l}" for l in labels]
+    if label is not None:
+        extra.append("confidence")
+    return ",".join([header] + extra + ["replicates"])
+
+
+def replicate_rows(points, row, run, m=None, table=None):
+    """Run every point with m (REPLICATES) seeds through run() (iter_sweep or
+    iter_ensemble); returns, per point, row(point, summary) of its replicates
+    in seed order.  Each row also goes to `table` (a SweepTable with point and
+    seed columns) as it finishes."""
+    jobs = expand(points, m)
+    m = len(jobs) // max(len(points), 1)
+    print(f">> Replicates: {len(points)} points x {m} seeds "
+          f"{seeds(m)[0]}..{seeds(m)[-1]} (common random numbers)")
+    per_point = [{} for _ in points]
+    for j, s in run([p for _, _, p in jobs]):
+        i, seed, _ = jobs[j]
+        per_point[i][seed] = r = row(points[i], s)
+        if table is not None:
+            table.add(j, r + [i, seed], s["OUTDIR"])
+    return [[done[k] for k in sorted(done)] for done in per_point]
+
+
+def replicate_sweep(points, row, run, path, header, values, label=None, labels=(), m=None):
+    """replicate_rows() streamed to <name>_replicates.csv, then the per-point
+    table written to `path`; returns its rows in point order."""
+    base, ext = os.path.splitext(path)
+    reps = SweepTable(f"{base}_replicates{ext}", header + ",point,seed")
+    per_point = replicate_rows(points, row, run, m, reps)
+    reps.close()
+    table = SweepTable(path, aggregate_header(header, values, label, labels))
+    rows = [aggregate(r, header, values, label, labels) for r in per_point]
+    for i, r in enumerate(rows):
+        table.add(i, r)
+    table.close()
+    return rows
@@ -0,0 +1,235 @@
+"""
+UT26 results store: one SQLite database for every run and sweep table
+
+OUTDIR_BASE/results.sqlite holds
+
+    runs     one row per run folder (outdir is the key; a rerun replaces its
+             row): kind (run / ensemble / dist), RUN_TAG, CONFIG_HASH,
+             CODE_VERSION, a column for each PARAM_COLUMNS parameter and
+             METRIC_COLUMNS metric, the whole summary.json as JSON text
+             (for json_extract on anything else) and the time it was recorded
+    sweeps   the rows of the sweep tables (gamma_sweep, threshold_map, ...)
+             as SweepTable streams them: sweep name, point index, outdir and
+             the row as a JSON object keyed by the csv header
+
+The parameter columns are indexed, so range queries over many runs are
+index scans:
+
+    from ut26_results import select
+    rows = select(ETA_THRESH=(0.5, 0.6), N=96)       # list of dicts
+    rows = query("ETA_THRESH > ? AND kind = 'run'", (0.5,), summary=True)
+    python ut26_results.py --where "ETA_THRESH BETWEEN 0.5 AND 0.6" --csv out.csv
+
+ut26_cosmo3d.py, ut26_ensemble.py and ut26_cosmo3d_dist.py record every
+finished run (RESULTS_DB=0 turns that off).  Each record is one short
+transaction on its own connection in WAL mode with a busy timeout, so sweep
+workers in several processes append concurrently.  `python ut26_results.py
+--rebuild` re-indexes every summary.json under OUTDIR_BASE, e.g. for
+folders written before the store existed.  The store is a cache of the run
+folders, which stay the primary record.  Deleting the database loses
+nothing that --rebuild cannot restore, except the sweep tables.
+"""
+
+import os, sys, json, glob, time, sqlite3, argparse, contextlib
+import numpy as np
+
+OUTDIR_BASE = "ut26_cosmo3d_outputs"
+DB_NAME     = "results.sqlite"
+RESULTS_DB  = os.getenv("RESULTS_DB", "1") == "1"
+
+# summary.json key -> column type (summary key "seed" is stored as SEED)
+PARAM_COLUMNS = dict(
+    N="INTEGER", T="INTEGER", SEED="INTEGER",
+    BETA="REAL", LAMBDA_R="REAL", ETA_THRESH="REAL",
+    DRIVE_A="REAL", DRIVE_W="REAL", NOISE_STD="REAL", DRIVE_SCHEDULE="TEXT",
+    COLLAPSE_MODE="TEXT", TRIGGER_MODE="TEXT", PRECISION="TEXT", BACKEND="TEXT",
+    RNG="TEXT", CONVERGE="INTEGER",
+)
+METRIC_COLUMNS = dict(
+    final_mean_s="REAL", total_trace_R="REAL", total_prunes="INTEGER",
+    projected_total_prunes="INTEGER", projected_total_trace_R="REAL",
+    STOP_STEP="INTEGER", STOP_REASON="TEXT",
+)
+INDEXED = ("N", "T", "SEED", "BETA", "LAMBDA_R", "ETA_THRESH", "DRIVE_A", "DRIVE_W",
+           "NOISE_STD")
+
+RUN_COLUMNS = (("outdir", "TEXT PRIMARY KEY"), ("kind", "TEXT"), ("RUN_TAG", "TEXT"),
+               ("CONFIG_HASH", "TEXT"), ("CODE_VERSION", "TEXT"),
+               *PARAM_COLUMNS.items(), *METRIC_COLUMNS.items(),
+               ("summary", "TEXT"), ("recorded", "REAL"))
+_quoted = ", ".join(f'"{c}"' for c, _ in RUN_COLUMNS)
+INSERT_RUN = (f"INSERT OR REPLACE INTO runs ({_quoted}) "
+              f"VALUES ({', '.join('?' * len(RUN_COLUMNS))})")
+
+
+def db_path(base=OUTDIR_BASE):
+    return os.path.join(base, DB_NAME)
+
+
+def connect(base=OUTDIR_BASE):
+    """Connection to the store under `base`, creating it if needed."""
+    os.makedirs(base, exist_ok=True)
+    con = sqlite3.connect(db_path(base), timeout=60)
+    con.execute("PRAGMA journal_mode=WAL")
+    with con:
+        con.execute("CREATE TABLE IF NOT EXISTS runs ("
+                    + ", ".join(f'"{c}" {t}' for c, t in RUN_COLUMNS) + ")")
+        for c in INDEXED + ("CONFIG_HASH",):
+            con.execute(f'CREATE INDEX IF NOT EXISTS runs_{c} ON runs ("{c}")')
+        con.execute("CREATE TABLE IF NOT EXISTS sweeps (sweep TEXT, idx INTEGER, "
+                    "outdir TEXT, row TEXT, PRIMARY KEY (sweep, idx))")
+    return con
+
+
+@contextlib.contextmanager
+def opened(base=OUTDIR_BASE):
+    con = connect(base)
+    try:
+        yield con
+    finally:
+        con.close()
+
+
+def _plain(v):
+    return v.item() if isinstance(v, np.generic) else str(v)
+
+
+def run_kind(summary):
+    if "ENSEMBLE_K" in summary:
+        return "ensemble"
+    if "DIST_WORKERS" in summary:
+        return "dist"
+    return "run"
+
+
+def run_row(summary):
+    s = dict(summary, SEED=summary.get("SEED", summary.get("seed")))
+    outdir = os.path.normpath(s["OUTDIR"])
+    row = dict(outdir=outdir, kind=run_kind(s), RUN_TAG=os.path.basename(outdir),
+               CONFIG_HASH=s.get("CONFIG_HASH"), CODE_VERSION=s.get("CODE_VERSION"))
+    for c in (*PARAM_COLUMNS, *METRIC_COLUMNS):
+        v = s.get(c)
+        row[c] = v.item() if isinstance(v, np.generic) else int(v) if isinstance(v, bool) else v
+    row.update(summary=json.dumps(summary, default=_plain), recorded=time.time())
+    return row
+
+
+def _insert(con, rows):
+    con.executemany(INSERT_RUN, [[r[c] for c, _ in RUN_COLUMNS] for r in rows])
+
+
+def record(summary, base=None):
+    """Add (or replace) the run of `summary` (a summary.json dict)."""
+    if not RESULTS_DB:
+        return
+    base = base or os.path.dirname(os.path.normpath(summary["OUTDIR"]))
+    with opened(base) as con, con:
+        _insert(con, [run_row(summary)])
+
+
+def rebuild(base=OUTDIR_BASE):
+    """Re-index `runs` from the run folders under `base` (rows of deleted
+    folders go); returns the number of runs."""
+    rows = []
+    for path in sorted(glob.glob(os.path.join(base, "*", "summary.json"))):
+        with open(path) as f:
+            s = json.load(f)
+        s["OUTDIR"] = os.path.dirname(path)       # where it is now
+        rows.append(run_row(s))
+    with opened(base) as con, con:
+        con.execute("DELETE FROM runs")
+        _insert(con, rows)
+    return len(rows)
+
+
+def query(where="", args=(), base=OUTDIR_BASE, order="outdir", summary=False):
+    """Rows of `runs` matching an SQL condition, as dicts; summary=True adds
+    the parsed summary.json (several times slower on large result sets)."""
+    cols = "*" if summary else _quoted.replace(', "summary"', "")
+    sql = f"SELECT {cols} FROM runs" + (f" WHERE {where}" if where else "") + f" ORDER BY {order}"
+    with opened(base) as con:
+        cur = con.execute(sql, args)
+        names = [d[0] for d in cur.description]
+        rows = [dict(zip(names, r)) for r in cur]
+    if summary:
+        for r in rows:
+            r["summary"] = json.loads(r["summary"])
+    return rows
+
+
+def select(base=OUTDIR_BASE, summary=False, **conds):
+    """query() by column: a (lo, hi) pair is an inclusive range, anything
+    else an exact value.  select(ETA_THRESH=(0.5, 0.6), N=96)"""
+    where, args = [], []
+    for c, v in conds.items():
+        if c not in dict(RUN_COLUMNS):
+            raise KeyError(f"unknown results column: {c!r}")
+        if isinstance(v, (tuple, list)):
+            where.append(f'"{c}" BETWEEN ? AND ?')
+            args += list(v)
+        else:
+            where.append(f'"{c}" = ?')
+            args.append(v)
+    return query(" AND ".join(where), args, base=base, summary=summary)
+
+
+# ----- sweep tables -----
+def clear_sweep(sweep, base=OUTDIR_BASE):
+    with opened(base) as con, con:
+        con.execute("DELETE FROM sweeps WHERE sweep = ?", (sweep,))
+
+
+def record_sweep_row(sweep, i, outdir, row, base=OUTDIR_BASE):
+    with opened(base) as con, con:
+        con.execute("INSERT OR REPLACE INTO sweeps VALUES (?, ?, ?, ?)",
+                    (sweep, int(i), outdir and os.path.normpath(outdir),
+                     json.dumps(row, default=_plain)))
+
+
+def sweep_table(sweep, base=OUTDIR_BASE):
+    """A sweep's rows in point order as a structured float array (the same
+    names and values as np.genfromtxt(..., names=True) on its csv), or None."""
+    if not os.path.exists(db_path(base)):
+        return None
+    with opened(base) as con:
+        rows = [json.loads(r[0]) for r in con.execute(
+            "SELECT row FROM sweeps WHERE sweep = ? ORDER BY idx", (sweep,))]
+    if not rows:
+        return None
+    names = list(rows[0])
+    return np.array([tuple(float(r[k]) for k in names) for r in rows],
+                    dtype=[(k, np.float64) for k in names])
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Query the UT26 results store")
+    ap.add_argument("--base", default=OUTDIR_BASE)
+    ap.add_argument("--rebuild", action="store_true",
+                    help="(re)index every summary.json under --base first")
+    ap.add_argument("--where", default="", help='SQL condition, e.g. "ETA_THRESH > 0.5"')
+    ap.add_argument("--csv", help="write the matching rows (without summary) to this csv")
+    args = ap.parse_args(argv)
+    if args.rebuild:
+        print(f"Indexed {rebuild(args.base)} runs into {db_path(args.base)}")
+    t0 = time.perf_counter()
+    rows = query(args.where, base=args.base)
+    print(f"{len(rows)} runs ({1e3*(time.perf_counter() - t0):.1f} ms)")
+    cols = [c for c, _ in RUN_COLUMNS if c != "summary"]
+    if args.csv:
+        import csv
+        with open(args.csv, "w", newline="") as f:
+            w = csv.writer(f)
+            w.writerow(cols)
+            w.writerows([r[c] for c in cols] for r in rows)
+        print("Wrote:", args.csv)
+    else:
+        for r in rows[:20]:
+            print(f"  {r['RUN_TAG']}: BETA={r['BETA']} LAMBDA_R={r['LAMBDA_R']} "
+                  f"ETA_THRESH={r['ETA_THRESH']} DRIVE_A={r['DRIVE_A']} "
+                  f"final_mean_s={r['final_mean_s']} total_prunes={r['total_prunes']}")
+        if len(rows) > 20:
+            print(f"  ... {len(rows) - 20} more (--csv to export)")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+"""
+UT26 counter-based random streams
+
+Philox4x32-10 (Salmon et al. 2011, as in Random123) evaluated as a pure
+function of
+
+    key     = seed (64 bit)
+    counter = (voxel index lo32, voxel index hi32, step, purpose)
+
+so every voxel's noise and collapse outcome at a given step is fixed by
+(seed, step, voxel, purpose) alone, independently of slab decomposition,
+thread count, or whether the dense or the trigger-sparse path asks for it.
+
+Purposes:
+    NOISE    = 0   Gaussian trigger noise (Box-Muller on the 4 output words)
+    COLLAPSE = 1   collapse outcome uniform
+    TRIGGER  = 2   trigger uniform for TRIGGER_MODE=bernoulli
+
+Uniforms: float64 uses 53 bits from two words ((w0>>5)*2^26 + (w1>>6)) / 2^53,
+float32 uses 24 bits (w0>>8) / 2^24.  Normals are computed in float64
+(z = sqrt(-2 ln(1-u1)) cos(2π u2)) and cast to the state dtype.
+
+The same arithmetic is available as scalar numba code in ut26_step_numba.py.
+"""
+
+import numpy as np
+
+NOISE, COLLAPSE, TRIGGER = 0, 1, 2
+
+PHILOX_M0 = 0xD2511F53
+PHILOX_M1 = 0xCD9E8D57
+PHILOX_W0 = 0x9E3779B9
+PHILOX_W1 = 0xBB67AE85
+MASK32    = 0xFFFFFFFF
+
+CHUNK = 1 << 18        # voxels per vectorised block (bounds temporaries)
+
+
+def philox4x32(c0, c1, c2, c3, k0, k1, rounds=10):
+    """Vectorised Philox4x32 on uint64 arrays holding 32-bit words.
+
+    Counter words may be arrays or scalars (broadcast to the shape of c0);
+    the rounds run in place on four word buffers and two product buffers.
+    """
+    shape = np.shape(c0)
+    c0, c1, c2, c3 = (np.array(np.broadcast_to(np.asarray(c, dtype=np.uint64), shape))
+                      for c in (c0, c1, c2, c3))
+    p0 = np.empty(shape, dtype=np.uint64)
+    p1 = np.empty(shape, dtype=np.uint64)
+    m0, m1, mask = np.uint64(PHILOX_M0), np.uint64(PHILOX_M1), np.uint64(MASK32)
+    sh = np.uint64(32)
+    k0, k1 = int(k0) & MASK32, int(k1) & MASK32
+    for r in range(rounds):
+        if r:
+            k0 = (k0 + PHILOX_W0) & MASK32
+            k1 = (k1 + PHILOX_W1) & MASK32
+        np.multiply(c0, m0, out=p0)
+        np.multiply(c2, m1, out=p1)
+        # (c0, c1, c2, c3) <- (hi(p1)^c1^k0, lo(p1), hi(p0)^c3^k1, lo(p0))
+        np.right_shift(p1, sh, out=c0); c0 ^= c1; c0 ^= np.uint64(k0)
+        np.bitwise_and(p1, mask, out=c1)
+        np.right_shift(p0, sh, out=c2); c2 ^= c3; c2 ^= np.uint64(k1)
+        np.bitwise_and(p0, mask, out=c3)
+    return c0, c1, c2, c3
+
+
+def words_to_uniform(w0, w1, dtype):
+    if np.dtype(dtype) == np.float32:
+        return ((w0 >> np.uint64(8)).astype(np.float32) * np.float32(2.0**-24))
+    a = (w0 >> np.uint64(5)).astype(np.float64)
+    b = (w1 >> np.uint64(6)).astype(np.float64)
+    return (a * 67108864.0 + b) * (1.0 / 9007199254740992.0)
+
+
+def words_to_normal(w0, w1, w2, w3):
+    u1 = 1.0 - words_to_uniform(w0, w1, np.float64)       # (0, 1]
+    u2 = words_to_uniform(w2, w3, np.float64)
+    return np.sqrt(-2.0 * np.log(u1)) * np.cos(2.0 * np.pi * u2)
+
+
+class CounterRNG:
+    """Keyed Philox streams addressed by (step, voxel, purpose).
+
+    `offset` is the global flat index of the first voxel of the array being
+    filled, so a slab of a larger lattice draws the same values as the
+    corresponding part of the full grid.
+    """
+
+    def __init__(self, seed):
+        self.seed = int(seed)
+        self.k0 = self.seed & MASK32
+        self.k1 = (self.seed >> 32) & MASK32
+
+    def words(self, idx, step, purpose):
+        idx = np.asarray(idx, dtype=np.uint64)
+        return philox4x32(idx & np.uint64(MASK32), idx >> np.uint64(32),
+                          step, purpose, self.k0, self.k1)
+
+    def uniform_at(self, idx, step, purpose, dtype=np.float64):
+        w0, w1, _, _ = self.words(idx, step, purpose)
+        return words_to_uniform(w0, w1, dtype)
+
+    def normal_at(self, idx, step, purpose=NOISE):
+        return words_to_normal(*self.words(idx, step, purpose))
+
+    def fill_uniform(self, out, step, purpose, offset=0):
+        flat = out.reshape(-1)
+        for a in range(0, flat.size, CHUNK):
+            idx = np.arange(offset + a, offset + min(a + CHUNK, flat.size), dtype=np.uint64)
+            flat[a:a + idx.size] = self.uniform_at(idx, step, purpose, out.dtype)
+        return out
+
+    def fill_normal(self, out, step, purpose=NOISE, offset=0):
+        flat = out.reshape(-1)
+        for a in range(0, flat.size, CHUNK):
+            idx = np.arange(offset + a, offset + min(a + CHUNK, flat.size), dtype=np.uint64)
+            flat[a:a + idx.size] = self.normal_at(idx, step, purpose)
+        return out
@@ -0,0 +1,110 @@
+"""
+UT26 run cache: finished runs addressed by a hash of their configuration
+
+ut26_cosmo3d.effective_config() lists everything that shapes a run's outputs:
+run_config() (the trajectory: N, T, SEED, operators, drive, modes), the
+initial spectrum, the observable and halo constants, SNAPSHOTS, BACKEND, a
+digest of a non-constant drive schedule, and the code version.  The code
+version is a hash of the simulator sources in CODE_FILES, so editing any of
+them invalidates every cached run.  config_hash() is the first 16 hex digits
+of the SHA-1 of that config as sorted JSON.  Every summary.json records it
+as CONFIG_HASH, next to CODE_VERSION.
+
+A run folder is a cache hit for a configuration when its summary.json
+carries that CONFIG_HASH.  A folder with any other hash (a different N,
+SEED, parameter or code version behind the same RUN_TAG) is stale.  It is
+recomputed, never reused.  ut26_cosmo3d.main() removes a folder's old
+summary.json when it starts a fresh run, so an interrupted rerun cannot
+leave a summary from another configuration behind.  An ensemble run writes
+only summary.json, so clear_stale() first empties a folder that holds
+another configuration's outputs (or an unfinished run's) rather than pair
+the new summary with old spectra, halos and figures.
+
+scan() indexes every summary under OUTDIR_BASE by hash, so a point is found
+even under another RUN_TAG.  Ensemble summaries (ut26_ensemble.py, metrics
+only) satisfy only lookups with full=False.  ut26_sweep.py skips cached points
+unless RUN_CACHE=0.
+"""
+
+import os, json, glob, shutil, hashlib
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# modules whose code determines a run's outputs
+CODE_FILES = ("ut26_cosmo3d.py", "ut26_step.py", "ut26_step_numba.py", "ut26_rng.py",
+              "ut26_ic.py", "ut26_spectra.py", "ut26_lz.py", "ut26_halos.py",
+              "ut26_trace.py", "ut26_converge.py", "ut26_schedule.py", "ut26_snapshots.py")
+
+_code_versions = {}
+
+
+def code_version(files=CODE_FILES):
+    """Hash of the `files` sources (line endings normalised)."""
+    if files not in _code_versions:
+        h = hashlib.sha1()
+        for name in files:
+            with open(os.path.join(HERE, name), "rb") as f:
+                h.update(name.encode() + b"\0" + f.read().replace(b"\r\n", b"\n"))
+        _code_versions[files] = h.hexdigest()[:12]
+    return _code_versions[files]
+
+
+def digest(config):
+    text = json.dumps(config, sort_keys=True, default=float)
+    return hashlib.sha1(text.encode()).hexdigest()[:16]
+
+
+def array_digest(a):
+    return hashlib.sha1(a.tobytes()).hexdigest()[:16]
+
+
+def load_summary(outdir):
+    path = os.path.join(outdir, "summary.json")
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):       # half-written or unreadable
+        return None
+
+
+def clear_stale(outdir, key):
+    """Remove everything in `outdir` unless its summary.json has config hash
+    `key`; returns whether anything was removed."""
+    s = load_summary(outdir)
+    if not os.path.isdir(outdir) or (s is not None and s.get("CONFIG_HASH") == key):
+        return False
+    entries = os.listdir(outdir)
+    for name in entries:
+        path = os.path.join(outdir, name)
+        if os.path.isdir(path) and not os.path.islink(path):
+            shutil.rmtree(path)
+        else:
+            os.remove(path)
+    return bool(entries)
+
+
+def is_full(summary):
+    return "ENSEMBLE_K" not in summary
+
+
+def lookup(outdir, key, full=True):
+    """The summary in `outdir` if it is a finished run of config hash `key`."""
+    s = load_summary(outdir)
+    if s is None or s.get("CONFIG_HASH") != key or (full and not is_full(s)):
+        return None
+    return s
+
+
+def scan(base, full=True):
+    """{config hash: summary} over every run folder under `base`."""
+    index = {}
+    for path in sorted(glob.glob(os.path.join(base, "*", "summary.json"))):
+        s = load_summary(os.path.dirname(path))
+        if s is None or "CONFIG_HASH" not in s or (full and not is_full(s)):
+            continue
+        # prefer full runs over ensemble summaries of the same config
+        if s["CONFIG_HASH"] not in index or is_full(s):
+            index[s["CONFIG_HASH"]] = s
+    return index
@@ -0,0 +1,152 @@
+"""
+UT26 Γ drive schedules
+
+The drive at step t is
+
+    drive_t = A(t) * sin(W(t) * t)
+
+DriveSchedule holds A and W, each either a number, an array indexed by step
+(the last entry holds beyond its end) or a callable t -> value:
+
+    constant(A, W)                        the ut26_cosmo3d.py default
+    phases([(0.9, 200), (0.3, 200)], W)   piecewise phases; (A0, A1, n) is a
+                                          linear ramp from A0 to A1 over n steps
+    from_arrays(A, W)                     A (and optionally W) per step
+    DriveSchedule(fA, fW, length=T)       any callables A(t), W(t)
+
+`length` is the number of steps the schedule defines (None for constant or
+callable schedules); ut26_cosmo3d.py takes T from it.  parse_schedule() reads
+the DRIVE_SCHEDULE environment string:
+
+    "0.9x200,0.3x200"      two phases          "0.3:0.9x100,0.9x50"  ramp, then hold
+    "amps.npy" / "amps.csv"  A per step (csv: one column A, or two columns A,W)
+
+A csv may start with a header row; it then names the columns (A, and
+optionally W; others such as t are ignored).
+
+A constant schedule reproduces `DRIVE_A * np.sin(DRIVE_W * t)` bit for bit.
+"""
+
+import os
+import numpy as np
+
+
+class DriveSchedule:
+    """Γ amplitude A(t) and frequency W(t)."""
+
+    def __init__(self, amplitude, frequency, length=None, spec=None):
+        self.amplitude = amplitude
+        self.frequency = frequency
+        self.length = None if length is None else int(length)
+        self.spec = spec
+
+    @staticmethod
+    def _value(v, t):
+        if callable(v):
+            return float(v(t))
+        if isinstance(v, np.ndarray):
+            return float(v[min(t, v.size - 1)])
+        return v
+
+    def A(self, t):
+        return self._value(self.amplitude, t)
+
+    def W(self, t):
+        return self._value(self.frequency, t)
+
+    def drive(self, t):
+        return self.A(t) * np.sin(self.W(t) * t)
+
+    @property
+    def constant(self):
+        return not any(callable(v) or isinstance(v, np.ndarray)
+                       for v in (self.amplitude, self.frequency))
+
+    def steady_from(self, T):
+        """First step from which A and W stay constant up to T-1."""
+        if self.constant:
+            return 0
+        A = np.array([self.A(t) for t in range(T)])
+        W = np.array([self.W(t) for t in range(T)])
+        change = np.flatnonzero((A[1:] != A[:-1]) | (W[1:] != W[:-1]))
+        return int(change[-1]) + 1 if change.size else 0
+
+    def describe(self):
+        """Short text for summary.json and the checkpoint config."""
+        if self.spec is not None:
+            return self.spec
+        if self.constant:
+            return f"A={self.amplitude:g},W={self.frequency:g}"
+        return f"custom(length={self.length})"
+
+
+def constant(A, W):
+    return DriveSchedule(A, W)
+
+
+def from_arrays(A, W, spec=None):
+    A = np.asarray(A, dtype=np.float64).ravel()
+    if not np.isscalar(W):
+        W = np.asarray(W, dtype=np.float64).ravel()
+        if W.size != A.size:
+            raise ValueError(f"A and W schedules differ in length ({A.size} vs {W.size})")
+    return DriveSchedule(A, W, length=A.size, spec=spec)
+
+
+def phases(segments, W, spec=None):
+    """Piecewise schedule from (A, n) holds and (A0, A1, n) linear ramps."""
+    parts = []
+    for seg in segments:
+        if len(seg) == 2:
+            a, n = seg
+            parts.append(np.full(int(n), float(a)))
+        elif len(seg) == 3:
+            a0, a1, n = seg
+            parts.append(np.linspace(float(a0), float(a1), int(n)))
+        else:
+            raise ValueError(f"schedule segment must be (A, n) or (A0, A1, n), got {seg!r}")
+    if spec is None:
+        spec = ",".join(f"{s[0]:g}x{s[1]}" if len(s) == 2 else f"{s[0]:g}:{s[1]:g}x{s[2]}"
+                        for s in segments)
+    return from_arrays(np.concatenate(parts) if parts else np.zeros(0), W, spec=spec)
+
+
+def read_csv(path):
+    """(A, W or None) per step from a schedule csv, with or without a header."""
+    with open(path) as f:
+        first = f.readline().lstrip("#")
+    fields = [x.strip() for x in first.split(",")]
+    try:
+        [float(x) for x in fields]
+        names = None
+    except ValueError:
+        names = [x.upper() for x in fields]
+    data = np.loadtxt(path, delimiter=",", ndmin=2, skiprows=0 if names is None else 1)
+    if names is None:
+        return data[:, 0], (data[:, 1] if data.shape[1] >= 2 else None)
+    if "A" not in names:
+        raise ValueError(f"schedule csv {path!r}: header {first.strip()!r} has no A column")
+    return data[:, names.index("A")], (data[:, names.index("W")] if "W" in names else None)
+
+
+def parse_schedule(text, A, W):
+    """Schedule from a DRIVE_SCHEDULE string; empty means constant(A, W)."""
+    text = (text or "").strip()
+    if not text:
+        return constant(A, W)
+    if text.endswith(".npy"):
+        return from_arrays(np.load(text), W, spec=os.path.basename(text))
+    if text.endswith(".csv"):
+        amps, freqs = read_csv(text)
+        return from_arrays(amps, W if freqs is None else freqs, spec=os.path.basename(text))
+    segments = []
+    for part in text.split(","):
+        amp, sep, n = part.strip().partition("x")
+        if not sep:
+            raise ValueError(f"DRIVE_SCHEDULE segment {part!r} is not A x steps or A0:A1 x steps")
+        if ":" in amp:
+            a0, a1 = amp.split(":")
+            segments.append((float(a0), float(a1), int(n)))
+        else:
+            segments.append((float(amp), int(n)))
+    return phases(segments, W, spec=text)
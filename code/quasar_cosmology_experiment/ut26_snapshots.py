@@ -0,0 +1,71 @@
+"""
+UT26 time-resolved snapshot series: P(k,t), P_κ(k,t), <s>(t), H(t)
+
+One record per snapshot step is appended to <OUTDIR>/snapshots.f32, a flat
+float32 file laid out as
+
+    [t, mean_s, H, P(k_0) ... P(k_{nk-1}), P_κ(k_0) ... P_κ(k_{n2-1})]
+
+and <OUTDIR>/snapshots.json records the layout and the k-bin centres.
+Records have a fixed size, so the file is appendable (a run killed mid-write
+leaves at most one partial record, dropped on read / resume) and readable as
+a (time × column) array with np.fromfile or a memory map.
+
+Read with
+    snap = read_snapshots(outdir)
+    snap["t"], snap["mean_s"], snap["H"], snap["k"], snap["Pk"], snap["k2"], snap["Pkappa"]
+"""
+
+import os, json
+import numpy as np
+
+DATA_NAME = "snapshots.f32"
+META_NAME = "snapshots.json"
+HEAD = ("t", "mean_s", "H")
+
+
+class SnapshotSeries:
+    """Appender for one run's snapshot file."""
+
+    def __init__(self, outdir, k, k2, resume_t=None):
+        self.path = os.path.join(outdir, DATA_NAME)
+        self.nk, self.n2 = len(k), len(k2)
+        self.width = len(HEAD) + self.nk + self.n2
+        meta = dict(columns=list(HEAD) + [f"Pk_{i}" for i in range(self.nk)]
+                    + [f"Pkappa_{i}" for i in range(self.n2)],
+                    dtype="float32", k=[float(x) for x in k], k2=[float(x) for x in k2])
+        with open(os.path.join(outdir, META_NAME), "w") as f:
+            json.dump(meta, f, indent=1)
+        if resume_t is None or not os.path.exists(self.path):
+            open(self.path, "wb").close()
+        else:
+            # keep whole records from before the resume step only
+            rec = _records(self.path, self.width)
+            keep = int(np.count_nonzero(rec[:, 0] < resume_t)) if len(rec) else 0
+            with open(self.path, "r+b") as f:
+                f.truncate(keep * self.width * 4)
+
+    def append(self, t, mean_s, H, Pk, Pkappa):
+        row = np.empty(self.width, dtype=np.float32)
+        row[:3] = (t, mean_s, H)
+        row[3:3 + self.nk] = Pk
+        row[3 + self.nk:] = Pkappa
+        with open(self.path, "ab") as f:
+            f.write(row.tobytes())
+
+
+def _records(path, width):
+    data = np.fromfile(path, dtype=np.float32)
+    n = data.size // width
+    return data[:n * width].reshape(n, width)
+
+
+def read_snapshots(outdir):
+    """The snapshot series of a run folder as a dict of arrays."""
+    with open(os.path.join(outdir, META_NAME)) as f:
+        meta = json.load(f)
+    nk, n2 = len(meta["k"]), len(meta["k2"])
+    rec = _records(os.path.join(outdir, DATA_NAME), len(HEAD) + nk + n2)
+    return dict(t=rec[:, 0].astype(int), mean_s=rec[:, 1], H=rec[:, 2],
+                k=np.array(meta["k"]), Pk=rec[:, 3:3 + nk],
+                k2=np.array(meta["k2"]), Pkappa=rec[:, 3 + nk:])
@@ -0,0 +1,337 @@
+"""
+UT26 Cosmology-Lite step engine
+
+One simulator step (collapse -> return -> drift) written against a fixed set
+of preallocated N³ work buffers, so the time loop does not allocate any
+full-grid temporaries.  For a given Generator the trajectory is bit-identical
+to the original array-expression loop in ut26_cosmo3d.py:
+
+    noise   = rng.normal(0, NOISE_STD, (N,N,N))
+    trig    = |drive_t| + |noise| > ETA_THRESH
+    collapse: s[trig] = (rng.random((N,N,N)) < p1)[trig],  R[trig] += TRACE_COST
+    return  : s[~trig] = clip(s + LAMBDA_R*(<s>_nb - s))[~trig]
+    drift   : s = clip(s + EPS_DRIFT*(A_GROW*(s - <s>) - B_DAMP*TRACE_COST*trig))
+
+Parameters are passed as a dict keyed by the simulator constant names
+(BETA, LAMBDA_R, ETA_THRESH, NOISE_STD, TRACE_COST, EPS_DRIFT, A_GROW, B_DAMP).
+
+Collapse modes:
+    "dense"  : draw one uniform per voxel (N³) and keep the triggered ones.
+               Reproduces the original loop exactly; this is the default.
+    "sparse" : gather the flat indices of triggered voxels and draw outcomes
+               for those only, so collapse cost scales with the trigger count.
+               Statistically identical, but consumes the RNG stream
+               differently, so trajectories differ from "dense" draw by draw.
+
+Trigger modes:
+    "noise"     : draw the Gaussian noise cube and threshold |drive|+|noise|
+                  (exact reference behaviour; default).
+    "bernoulli" : the noise only enters through the trigger, so each voxel
+                  fires independently with the scalar probability
+                  p = P(|Z| > (ETA_THRESH - |drive_t|)/NOISE_STD)
+                    = erfc(x/sqrt(2)); one uniform per voxel vs p.
+    "binomial"  : draw the trigger count k ~ Binomial(N³, p) and pick k
+                  distinct voxels; pairs with the sparse collapse path.
+Both fast modes skip the N³ normal draw.  They are statistically equivalent
+to "noise" (see check_trigger_modes.py) but not draw-for-draw identical.
+
+Substrate trace: R only ever grows by TRACE_COST per collapse, so the engine
+keeps the per-voxel collapse count `R_count` (an unsigned integer array,
+uint32 unless the caller passes a smaller one, see ut26_trace.trace_dtype)
+and `trace()` applies TRACE_COST on read.  R_total is accumulated in float64
+exactly as before.
+
+Precision: the state dtype follows `s`.  With a float32 field all buffers,
+p1 and the RNG draws (standard_normal/random with dtype=float32) are float32;
+the mean used by the drift term and the R_total / prune counters are always
+accumulated in float64.  float64 state reproduces the reference exactly.
+
+Random streams: `rng` is either a numpy Generator (sequential stream, the
+reference behaviour) or a ut26_rng.CounterRNG.  With a CounterRNG every draw
+is a pure function of (seed, step, global voxel index, purpose), where the
+step is the engine counter `t` and `offset` is the global flat index of
+s[0,0,0] (non-zero for a slab of a larger lattice).  Dense and sparse
+collapse then give the same outcome per voxel, and slab decompositions /
+thread counts do not change the trajectory.  The binomial trigger draws a
+global count and has no per-voxel form, so it needs a Generator.
+
+Instrumentation: with `engine.timer` set to a ut26_timing.PhaseTimer, the
+phases call timer.lap() at their boundaries (noise, trigger, collapse,
+return, drift); with timer None, lap() is a no-op.
+"""
+
+import math
+import numpy as np
+
+from ut26_rng import CounterRNG, NOISE, COLLAPSE, TRIGGER
+
+
+def neighbor_mean_3d(arr, out=None, lo=None, hi=None):
+    """Periodic 6-neighbour mean of a 3D array, written into `out`.
+
+    Summation order matches (up + down + left + right + front + back) / 6
+    built from np.roll, so results are bit-identical to the roll version.
+    For a slab of a larger lattice, `lo` / `hi` are the ghost planes below
+    row 0 and above the last row along axis 0 (default: periodic in `arr`).
+    """
+    if out is None:
+        out = np.empty_like(arr)
+    # up / down (axis 0)
+    out[:-1] = arr[1:];           out[-1] = arr[0] if hi is None else hi
+    out[1:] += arr[:-1];          out[0] += arr[-1] if lo is None else lo
+    # left / right (axis 1)
+    out[:, :-1] += arr[:, 1:];    out[:, -1] += arr[:, 0]
+    out[:, 1:] += arr[:, :-1];    out[:, 0] += arr[:, -1]
+    # front / back (axis 2)
+    out[:, :, :-1] += arr[:, :, 1:];  out[:, :, -1] += arr[:, :, 0]
+    out[:, :, 1:] += arr[:, :, :-1];  out[:, :, 0] += arr[:, :, -1]
+    out /= 6.0
+    return out
+
+
+class StepEngine:
+    """In-place collapse/return/drift updates on preallocated buffers.
+
+    The engine owns the coherence field `s` and the per-voxel collapse
+    counter `R_count` (substrate trace in units of TRACE_COST) and keeps the
+    running `prune_count` / `R_total` counters.
+    """
+
+    backend = "numpy"
+
+    COLLAPSE_MODES = ("dense", "sparse")
+    TRIGGER_MODES  = ("noise", "bernoulli", "binomial")
+
+    def __init__(self, s, b, params, rng, collapse="dense", trigger="noise", R_count=None,
+                 offset=0):
+        if collapse not in self.COLLAPSE_MODES:
+            raise ValueError(f"unknown collapse mode: {collapse!r}")
+        if trigger not in self.TRIGGER_MODES:
+            raise ValueError(f"unknown trigger mode: {trigger!r}")
+        self.counter = isinstance(rng, CounterRNG)
+        if self.counter and trigger == "binomial":
+            raise ValueError("trigger='binomial' needs a Generator, not a CounterRNG")
+        self.s   = s
+        self.dtype = s.dtype
+        self.R_count = np.zeros(s.shape, dtype=np.uint32) if R_count is None else R_count
+        self.rng = rng
+        self.t      = 0         # step counter (counter-based streams)
+        self.offset = int(offset)
+        self.prune_count = 0
+        self.R_total     = 0.0
+        self.mean_s      = None     # <s> used by the last drift (float64)
+        self.timer       = None     # optional ut26_timing.PhaseTimer
+
+        # plain Python floats, so float32 state stays float32 in every ufunc
+        self.beta       = float(params["BETA"])
+        self.lambda_r   = float(params["LAMBDA_R"])
+        self.eta_thresh = float(params["ETA_THRESH"])
+        self.noise_std  = float(params["NOISE_STD"])
+        self.trace_cost = float(params["TRACE_COST"])
+        self.eps_drift  = float(params["EPS_DRIFT"])
+        self.a_grow     = float(params["A_GROW"])
+        self.b_damp     = float(params["B_DAMP"])
+
+        # β-softmax is static: b and BETA never change during a run
+        p1 = (1.0 / (1.0 + np.exp(-self.beta * b))).astype(self.dtype, copy=False)
+        self.p1      = p1
+        self.p1_hi   = p1 > 0.5
+        self.decided = p1 != 0.5        # p1 == 0.5 never counts as a prune
+        self.collapse_mode = collapse
+        self.trigger_mode  = trigger
+
+        # work buffers
+        self.work    = np.empty_like(s)
+        self.nb      = np.empty_like(s)
+        self.trig    = np.empty(s.shape, dtype=bool)
+        self.notrig  = np.empty(s.shape, dtype=bool)
+        self.outcome = np.empty(s.shape, dtype=bool)
+        self.pruned  = np.empty(s.shape, dtype=bool)
+
+        # flat views for the trigger-sparse path
+        self.s_flat       = s.reshape(-1)
+        self.R_flat       = self.R_count.reshape(-1)
+        self.p1_flat      = p1.reshape(-1)
+        self.p1_hi_flat   = self.p1_hi.reshape(-1)
+        self.decided_flat = self.decided.reshape(-1)
+        self.trig_flat    = self.trig.reshape(-1)
+
+        self.n_trig   = 0
+        self.trig_idx = None    # flat trigger indices, when a mode provides them
+
+    # ----- random draws -----
+    def draw_normal(self, out):
+        if self.counter:
+            return self.rng.fill_normal(out, self.t, NOISE, self.offset)
+        return self.rng.standard_normal(dtype=self.dtype, out=out)
+
+    def draw_uniform(self, out, purpose):
+        if self.counter:
+            return self.rng.fill_uniform(out, self.t, purpose, self.offset)
+        return self.rng.random(dtype=self.dtype, out=out)
+
+    def draw_uniform_at(self, idx, purpose):
+        # uniforms for the flat voxel indices `idx` only
+        if self.counter:
+            return self.rng.uniform_at(idx + self.offset, self.t, purpose, self.dtype)
+        return self.rng.random(idx.size, dtype=self.dtype)
+
+    def lap(self, phase):
+        if self.timer is not None:
+            self.timer.lap(phase)
+
+    # ----- phases -----
+    def trigger_prob(self, drive_t):
+        """Per-voxel probability that |drive_t| + |noise| > ETA_THRESH."""
+        margin = self.eta_thresh - abs(drive_t)
+        if self.noise_std <= 0.0:
+            return 1.0 if margin < 0.0 else 0.0
+        if margin <= 0.0:
+            return 1.0
+        return math.erfc(margin / (self.noise_std * math.sqrt(2.0)))
+
+    def trigger(self, drive_t):
+        self.trig_idx = None
+        if self.trigger_mode == "bernoulli":
+            return self.trigger_bernoulli(drive_t)
+        if self.trigger_mode == "binomial":
+            return self.trigger_binomial(drive_t)
+        w = self.work
+        self.draw_normal(w)
+        self.lap("noise")
+        w *= self.noise_std
+        np.abs(w, out=w)
+        w += abs(drive_t)
+        np.greater(w, self.eta_thresh, out=self.trig)
+        self.n_trig = int(np.count_nonzero(self.trig))
+        self.lap("trigger")
+        return self.n_trig
+
+    def trigger_bernoulli(self, drive_t):
+        p = self.trigger_prob(drive_t)
+        if p >= 1.0:
+            self.trig.fill(True)
+        elif p <= 0.0:
+            self.trig.fill(False)
+        else:
+            self.draw_uniform(self.work, TRIGGER)
+            self.lap("noise")
+            np.less(self.work, p, out=self.trig)
+        self.n_trig = int(np.count_nonzero(self.trig))
+        self.lap("trigger")
+        return self.n_trig
+
+    def trigger_binomial(self, drive_t):
+        n = self.s.size
+        k = int(self.rng.binomial(n, self.trigger_prob(drive_t)))
+        if k > n // 2:
+            # pick the (smaller) set of quiet voxels instead
+            quiet = self.rng.choice(n, n - k, replace=False)
+            self.lap("noise")
+            self.trig.fill(True)
+            self.trig_flat[quiet] = False
+        else:
+            self.trig_idx = self.rng.choice(n, k, replace=False)
+            self.lap("noise")
+            self.trig.fill(False)
+            self.trig_flat[self.trig_idx] = True
+        self.n_trig = k
+        self.lap("trigger")
+        return self.n_trig
+
+    def collapse(self):
+        if self.n_trig == 0:
+            return
+        if self.collapse_mode == "sparse":
+            self.collapse_sparse()
+            return
+        trig, w = self.trig, self.work
+        self.draw_uniform(w, COLLAPSE)
+        np.less(w, self.p1, out=self.outcome)
+
+        # pruned = outcome disagrees with the preferred branch of p1
+        np.not_equal(self.outcome, self.p1_hi, out=self.pruned)
+        self.pruned &= self.decided
+        self.pruned &= trig
+        self.prune_count += int(np.count_nonzero(self.pruned))
+
+        np.copyto(self.s, self.outcome, where=trig)
+        self.R_count += trig
+        self.R_total += self.trace_cost * float(self.n_trig)
+
+    def collapse_sparse(self):
+        # O(n_trig) apart from the index scan of the trigger mask
+        idx = self.trig_idx if self.trig_idx is not None else np.flatnonzero(self.trig)
+        outcome = self.draw_uniform_at(idx, COLLAPSE) < self.p1_flat[idx]
+
+        pruned = outcome != self.p1_hi_flat[idx]
+        pruned &= self.decided_flat[idx]
+        self.prune_count += int(np.count_nonzero(pruned))
+
+        self.s_flat[idx] = outcome
+        self.R_flat[idx] += 1
+        self.R_total += self.trace_cost * float(self.n_trig)
+
+    def trace(self):
+        """Substrate trace R = TRACE_COST * collapse count (float64)."""
+        return self.R_count * self.trace_cost
+
+    def retain(self):
+        if self.n_trig == self.s.size:
+            return
+        s, nb = self.s, self.nb
+        np.logical_not(self.trig, out=self.notrig)
+        self.neighbor_mean(s, nb)
+        nb -= s
+        nb *= self.lambda_r
+        nb += s
+        np.clip(nb, 0.0, 1.0, out=nb)
+        np.copyto(s, nb, where=self.notrig)
+
+    def neighbor_mean(self, s, out):
+        return neighbor_mean_3d(s, out=out)
+
+    def drift(self, mean=None):
+        # `mean` lets a decomposed run pass in the globally reduced <s>
+        s, w = self.s, self.work
+        if mean is None:
+            mean = float(s.mean(dtype=np.float64))
+        self.mean_s = mean
+        np.subtract(s, mean, out=w)
+        w *= self.a_grow
+        np.subtract(w, self.b_damp * self.trace_cost, out=w, where=self.trig)
+        w *= self.eps_drift
+        s += w
+        np.clip(s, 0.0, 1.0, out=s)
+
+    def step(self, drive_t):
+        self.trigger(drive_t)
+        self.collapse()
+        self.lap("collapse")
+        self.retain()
+        self.lap("return")
+        self.drift()
+        self.lap("drift")
+        self.t += 1
+        return self.n_trig
+
+
+BACKENDS = ("numpy", "numba")
+
+
+def make_engine(s, b, params, rng, backend="numpy", collapse="dense", trigger="noise",
+                R_count=None):
+    """Build a step engine for `backend`, falling back to NumPy when the
+    numba JIT is not installed or does not support the requested modes."""
+    if backend not in BACKENDS:
+        raise ValueError(f"unknown backend: {backend!r}")
+    if backend == "numba":
+        try:
+            from ut26_step_numba import NumbaStepEngine
+            return NumbaStepEngine(s, b, params, rng, collapse=collapse, trigger=trigger,
+                                   R_count=R_count)
+        except ImportError:
+            print("numba not available -> using NumPy backend")
+        except ValueError as e:
+            print(f"{e} -> using NumPy backend")
+    return StepEngine(s, b, params, rng, collapse=collapse, trigger=trigger, R_count=R_count)
@@ -0,0 +1,244 @@
+"""
+UT26 Cosmology-Lite step engine — Numba backend
+
+Multi-core version of ut26_step.StepEngine.  The per-voxel update is fused
+into parallel loops over axis-0 slabs with periodic neighbour wraparound:
+
+    pass 1  trigger      : |drive| + |noise| > ETA_THRESH   (or u < p)
+    pass 2  collapse+return: each voxel's post-collapse value is a pure
+            function of (s, trig, u, p1), so the λR stencil recomputes its
+            neighbours' collapse outcomes instead of waiting for a separate
+            collapse sweep; results go to the `nb` buffer with per-slab
+            float64 sums for <s>
+    pass 3  drift        : needs the global <s>, hence the one barrier
+
+With a Generator, random numbers are still drawn by the host with exactly
+the same calls as the NumPy engine, so both backends consume identical
+streams.  With a ut26_rng.CounterRNG the Philox words are generated inside a
+parallel fill kernel (same counters and bit-to-float conversion as
+ut26_rng), so the draws do not depend on the thread count.  All
+per-voxel arithmetic follows the NumPy operation order in the state dtype;
+only the <s> reduction is summed per slab instead of pairwise, so
+trajectories match the NumPy backend to rounding in the mean, not bit for
+bit.  Supports the "noise"/"bernoulli" trigger modes with dense collapse.
+
+Threads follow numba's NUMBA_NUM_THREADS / numba.set_num_threads().
+"""
+
+import numpy as np
+from numba import njit, prange
+
+from ut26_step import StepEngine
+from ut26_rng import (NOISE, COLLAPSE, TRIGGER, PHILOX_M0, PHILOX_M1, PHILOX_W0, PHILOX_W1, MASK32)
+
+_M0, _M1 = np.uint64(PHILOX_M0), np.uint64(PHILOX_M1)
+_W0, _W1 = np.uint64(PHILOX_W0), np.uint64(PHILOX_W1)
+_MASK, _S32 = np.uint64(MASK32), np.uint64(32)
+_S5, _S6, _S8 = np.uint64(5), np.uint64(6), np.uint64(8)
+
+
+@njit(inline="always")
+def _philox(c0, c1, c2, c3, k0, k1):
+    for r in range(10):
+        if r:
+            k0 = (k0 + _W0) & _MASK
+            k1 = (k1 + _W1) & _MASK
+        p0 = c0 * _M0
+        p1 = c2 * _M1
+        c0, c1, c2, c3 = ((p1 >> _S32) ^ c1 ^ k0, p1 & _MASK,
+                          (p0 >> _S32) ^ c3 ^ k1, p0 & _MASK)
+    return c0, c1, c2, c3
+
+
+@njit(inline="always")
+def _u53(w0, w1):
+    return ((w0 >> _S5) * 67108864.0 + (w1 >> _S6)) * (1.0 / 9007199254740992.0)
+
+
+@njit(parallel=True, cache=True)
+def _counter_fill_kernel(out, k0, k1, step, purpose, offset, normal, single):
+    n0, n1, n2 = out.shape
+    for i in prange(n0):
+        for j in range(n1):
+            base = offset + (i * n1 + j) * n2
+            for k in range(n2):
+                idx = np.uint64(base + k)
+                w0, w1, w2, w3 = _philox(idx & _MASK, idx >> _S32, step, purpose, k0, k1)
+                if normal:
+                    u1 = 1.0 - _u53(w0, w1)
+                    u2 = _u53(w2, w3)
+                    out[i, j, k] = np.sqrt(-2.0 * np.log(u1)) * np.cos(2.0 * np.pi * u2)
+                elif single:
+                    out[i, j, k] = (w0 >> _S8) * (2.0**-24)
+                else:
+                    out[i, j, k] = _u53(w0, w1)
+
+
+@njit(parallel=True, cache=True)
+def _trigger_kernel(work, trig, use_noise, noise_std, drive_abs, eta, p, counts):
+    n0, n1, n2 = work.shape
+    for i in prange(n0):
+        c = 0
+        for j in range(n1):
+            for k in range(n2):
+                if use_noise:
+                    x = abs(work[i, j, k] * noise_std) + drive_abs
+                    f = x > eta
+                else:
+                    f = work[i, j, k] < p
+                trig[i, j, k] = f
+                c += f
+        counts[i] = c
+
+
+@njit(inline="always")
+def _post(s, trig, u, p1, one, zero, i, j, k):
+    # coherence after the collapse phase (outcome for triggered voxels)
+    if trig[i, j, k]:
+        return one if u[i, j, k] < p1[i, j, k] else zero
+    return s[i, j, k]
+
+
+@njit(parallel=True, cache=True)
+def _collapse_return_kernel(s, out, R_count, trig, u, p1, p1_hi, decided,
+                            one, zero, lam, six, prunes, sums):
+    n0, n1, n2 = s.shape
+    for i in prange(n0):
+        ip = i + 1 if i + 1 < n0 else 0
+        im = i - 1 if i > 0 else n0 - 1
+        c = 0
+        acc = 0.0
+        for j in range(n1):
+            jp = j + 1 if j + 1 < n1 else 0
+            jm = j - 1 if j > 0 else n1 - 1
+            for k in range(n2):
+                kp = k + 1 if k + 1 < n2 else 0
+                km = k - 1 if k > 0 else n2 - 1
+                v = _post(s, trig, u, p1, one, zero, i, j, k)
+                if trig[i, j, k]:
+                    R_count[i, j, k] += 1
+                    if decided[i, j, k] and ((v > 0.5) != p1_hi[i, j, k]):
+                        c += 1
+                    x = v
+                else:
+                    nb = (_post(s, trig, u, p1, one, zero, ip, j, k)
+                          + _post(s, trig, u, p1, one, zero, im, j, k))
+                    nb = nb + _post(s, trig, u, p1, one, zero, i, jp, k)
+                    nb = nb + _post(s, trig, u, p1, one, zero, i, jm, k)
+                    nb = nb + _post(s, trig, u, p1, one, zero, i, j, kp)
+                    nb = nb + _post(s, trig, u, p1, one, zero, i, j, km)
+                    nb = nb / six
+                    x = (nb - v) * lam + v
+                    if x < zero:
+                        x = zero
+                    elif x > one:
+                        x = one
+                out[i, j, k] = x
+                acc += x
+        prunes[i] = c
+        sums[i] = acc
+
+
+@njit(parallel=True, cache=True)
+def _drift_kernel(src, s, trig, mean, a_grow, damp, eps, one, zero):
+    n0, n1, n2 = s.shape
+    for i in prange(n0):
+        for j in range(n1):
+            for k in range(n2):
+                w = (src[i, j, k] - mean) * a_grow
+                if trig[i, j, k]:
+                    w = w - damp
+                x = src[i, j, k] + w * eps
+                if x < zero:
+                    x = zero
+                elif x > one:
+                    x = one
+                s[i, j, k] = x
+
+
+class NumbaStepEngine(StepEngine):
+    """Fused, slab-parallel StepEngine (dense collapse only)."""
+
+    backend = "numba"
+
+    def __init__(self, s, b, params, rng, collapse="dense", trigger="noise", R_count=None,
+                 offset=0):
+        if collapse != "dense" or trigger not in ("noise", "bernoulli"):
+            raise ValueError("numba backend supports collapse='dense' with "
+                             "trigger='noise' or 'bernoulli'")
+        super().__init__(s, b, params, rng, collapse=collapse, trigger=trigger,
+                         R_count=R_count, offset=offset)
+        f = self.dtype.type
+        # scalars in the state dtype, as NumPy's weak-scalar casting does
+        self._noise_std = f(self.noise_std)
+        self._eta       = f(self.eta_thresh)
+        self._lam       = f(self.lambda_r)
+        self._six       = f(6.0)
+        self._one       = f(1.0)
+        self._zero      = f(0.0)
+        self._a_grow    = f(self.a_grow)
+        self._damp      = f(self.b_damp * self.trace_cost)
+        self._eps       = f(self.eps_drift)
+        n0 = s.shape[0]
+        self._counts = np.zeros(n0, dtype=np.int64)
+        self._prunes = np.zeros(n0, dtype=np.int64)
+        self._sums   = np.zeros(n0, dtype=np.float64)
+
+    def _counter_fill(self, out, purpose, normal):
+        u = np.uint64
+        _counter_fill_kernel(out, u(self.rng.k0), u(self.rng.k1), u(self.t), u(purpose),
+                             self.offset, normal, self.dtype == np.float32)
+        return out
+
+    def draw_normal(self, out):
+        if self.counter:
+            return self._counter_fill(out, NOISE, True)
+        return super().draw_normal(out)
+
+    def draw_uniform(self, out, purpose):
+        if self.counter:
+            return self._counter_fill(out, purpose, False)
+        return super().draw_uniform(out, purpose)
+
+    def trigger(self, drive_t):
+        self.trig_idx = None
+        f = self.dtype.type
+        if self.trigger_mode == "bernoulli":
+            p = self.trigger_prob(drive_t)
+            if p >= 1.0 or p <= 0.0:
+                self.trig.fill(p >= 1.0)
+                self.n_trig = self.s.size if p >= 1.0 else 0
+                self.lap("trigger")
+                return self.n_trig
+            self.draw_uniform(self.work, TRIGGER)
+            self.lap("noise")
+            _trigger_kernel(self.work, self.trig, False, self._noise_std,
+                            f(0.0), self._eta, f(p), self._counts)
+        else:
+            self.draw_normal(self.work)
+            self.lap("noise")
+            _trigger_kernel(self.work, self.trig, True, self._noise_std,
+                            f(abs(drive_t)), self._eta, f(0.0), self._counts)
+        self.n_trig = int(self._counts.sum())
+        self.lap("trigger")
+        return self.n_trig
+
+    def step(self, drive_t):
+        self.trigger(drive_t)
+        if self.n_trig:
+            self.draw_uniform(self.work, COLLAPSE)
+        self.lap("collapse")
+        _collapse_return_kernel(self.s, self.nb, self.R_count, self.trig, self.work,
+                                self.p1, self.p1_hi, self.decided,
+                                self._one, self._zero, self._lam, self._six,
+                                self._prunes, self._sums)
+        self.prune_count += int(self._prunes.sum())
+        self.R_total += self.trace_cost * float(self.n_trig)
+        self.lap("return")
+        self.mean_s = float(self._sums.sum() / self.s.size)
+        mean = self.dtype.type(self.mean_s)
+        _drift_kernel(self.nb, self.s, self.trig, mean, self._a_grow, self._damp,
+                      self._eps, self._one, self._zero)
+        self.lap("drift")
+        self.t += 1
+        return self.n_trig
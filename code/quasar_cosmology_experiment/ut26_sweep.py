@@ -0,0 +1,220 @@
+"""
+UT26 parallel sweep runner: ut26_cosmo3d.main() over a list of parameter points
+
+Each point is a dict of POINT_KEYS overrides plus RUN_TAG, and optionally
+its own SEED (seed replicates, ut26_replicates.py); other keys, such as a
+period P kept for the output table, are ignored.  Points run in a pool
+of SWEEP_WORKERS forked processes.  The workers inherit the imported
+simulator, so nothing is imported or compiled per point.  Each point calls
+main() as a function after run_point() has set its parameters, RUN_TAG,
+OUTDIR and a fresh seed-SEED generator on the ut26_cosmo3d module.  A point
+therefore writes exactly what `ut26_cosmo3d.py` writes when run with those
+environment variables.  Parameters a point does not set keep the values the
+parent read from the environment (BACKEND, RNG, CONVERGE, N, T, ...).
+
+iter_sweep() yields (index, summary) as points finish, and each point's
+main() console output goes to OUTDIR/run.log.  SweepTable appends each row
+to the output csv (and the ut26_results.py store) as it arrives and
+rewrites the csv in point order at the end.  With IC_CACHE=1 (the default)
+the initial field of each seed is generated once, before the pool starts,
+and every point loads it from the cache.
+
+Points are addressed by the hash of their full configuration
+(ut26_runcache.py).  A point whose configuration already has a finished
+run, in its own folder or under another RUN_TAG, is served from that
+summary without running.  A folder from another configuration (other N,
+SEED, code version, ...) is recomputed.  A sweep that is stopped and
+restarted therefore only runs the missing points.  With CHECKPOINT=1, a point
+that was cut short resumes from its checkpoint.  iter_ensemble() applies
+the same skipping to ut26_ensemble.py runs, one set of batches per seed.
+RUN_CACHE=0 runs every point.
+
+Use:
+    from ut26_sweep import iter_sweep, SweepTable
+    table = SweepTable("out.csv", "A,final_mean_s")
+    for i, s in iter_sweep(points):
+        table.add(i, [points[i]["DRIVE_A"], s["final_mean_s"]], s["OUTDIR"])
+    table.close()
+"""
+
+import os, io, contextlib
+import multiprocessing as mp
+import numpy as np
+
+import ut26_cosmo3d as sim
+from ut26_checkpoint import CKPT_NAME, atomic_write, read_checkpoint
+from ut26_runcache import scan, lookup
+from ut26_results import RESULTS_DB, clear_sweep, record_sweep_row
+
+SWEEP_WORKERS = int(os.getenv("SWEEP_WORKERS", os.cpu_count() or 1))
+# RUN_CACHE=1: points with a finished run of the same configuration on disk
+# are not run again (ut26_runcache.py)
+RUN_CACHE = os.getenv("RUN_CACHE", "1") == "1"
+
+# per-point parameters (anything else comes from ut26_cosmo3d)
+POINT_KEYS = ("BETA", "LAMBDA_R", "ETA_THRESH", "DRIVE_A", "DRIVE_W", "NOISE_STD")
+DEFAULTS = {k: getattr(sim, k) for k in POINT_KEYS}
+DEFAULT_SEED = sim.SEED
+
+
+def configure(point):
+    """Set ut26_cosmo3d's parameters, RUN_TAG and OUTDIR for one point."""
+    for k in POINT_KEYS:
+        setattr(sim, k, float(point.get(k, DEFAULTS[k])))
+    sim.SEED = int(point.get("SEED", DEFAULT_SEED))
+    tag = point.get("RUN_TAG") or (f"beta{sim.BETA}_lr{sim.LAMBDA_R}_eta{sim.ETA_THRESH}"
+                                   f"_A{sim.DRIVE_A}_W{sim.DRIVE_W}")
+    sim.RUN_TAG = str(tag).strip().replace("\\", "_").replace("/", "_")
+    sim.OUTDIR = os.path.join(sim.OUTDIR_BASE, sim.RUN_TAG)
+
+
+@contextlib.contextmanager
+def configured(point):
+    """configure(point) for the duration of a with block."""
+    saved = {k: getattr(sim, k) for k in POINT_KEYS + ("SEED", "RUN_TAG", "OUTDIR")}
+    configure(point)
+    try:
+        yield
+    finally:
+        for k, v in saved.items():
+            setattr(sim, k, v)
+
+
+def point_key(point):
+    """Config hash of the run `point` stands for (ut26_runcache.py)."""
+    with configured(point):
+        return sim.config_hash()
+
+
+def cached_points(points, full=True):
+    """{index: summary} of the points that have a finished run on disk."""
+    if not RUN_CACHE:
+        return {}
+    index = scan(sim.OUTDIR_BASE, full=full)
+    hits = {}
+    for i, p in enumerate(points):
+        with configured(p):
+            key = sim.config_hash()
+            s = lookup(sim.OUTDIR, key, full=full) or index.get(key)
+        if s is not None:
+            hits[i] = s
+    return hits
+
+
+def run_point(point):
+    """Run one point in this process; returns its summary dict.  A compatible
+    checkpoint in its folder (CHECKPOINT=1) is resumed."""
+    configure(point)
+    sim.rng = np.random.default_rng(sim.SEED)   # as in a fresh process
+    sim.ensure()
+    resume = False
+    if sim.CHECKPOINT and os.path.exists(os.path.join(sim.OUTDIR, CKPT_NAME)):
+        try:
+            resume = read_checkpoint(sim.OUTDIR, sim.run_config()) is not None
+        except ValueError:              # another configuration's checkpoint
+            resume = False
+    with open(os.path.join(sim.OUTDIR, "run.log"), "a" if resume else "w") as log, \
+            contextlib.redirect_stdout(log):
+        return sim.main(resume=resume)
+
+
+def point_seeds(points):
+    return sorted({int(p.get("SEED", DEFAULT_SEED)) for p in points})
+
+
+@contextlib.contextmanager
+def seeded(seed):
+    """SEED and a fresh seed-SEED generator on ut26_cosmo3d for a with block."""
+    saved = sim.SEED
+    sim.SEED = seed
+    sim.rng = np.random.default_rng(seed)
+    try:
+        yield
+    finally:
+        sim.SEED = saved
+
+
+def _point_job(job):
+    i, point = job
+    return i, run_point(point)
+
+
+def iter_sweep(points, workers=None):
+    """Yield (index, summary) for every point: cached ones first, then the
+    others in completion order."""
+    hits = cached_points(points)
+    for i in sorted(hits):
+        yield i, hits[i]
+    jobs = [(i, p) for i, p in enumerate(points) if i not in hits]
+    workers = min(workers or SWEEP_WORKERS, len(jobs))
+    print(f">> Sweep: {len(points)} points, {len(hits)} cached, {len(jobs)} to run"
+          + (f" on {workers} workers" if jobs else ""))
+    if not jobs:
+        return
+    if sim.IC_CACHE:
+        # build each seed's initial field once; every point then loads it
+        for seed in point_seeds([p for _, p in jobs]):
+            with seeded(seed):
+                sim.gaussian_field_from_P0(sim.N)
+    if workers > 1:
+        with mp.get_context("fork").Pool(workers) as pool:
+            for done, (i, summary) in enumerate(pool.imap_unordered(_point_job, jobs), 1):
+                print(f">> [{done}/{len(jobs)}] {summary['OUTDIR']}")
+                yield i, summary
+    else:
+        for done, job in enumerate(jobs, 1):
+            i, summary = _point_job(job)
+            print(f">> [{done}/{len(jobs)}] {summary['OUTDIR']}")
+            yield i, summary
+
+
+def iter_ensemble(points):
+    """iter_sweep() through ut26_ensemble.run_ensemble() for the uncached points
+    (any finished run, full or ensemble, is a hit).  Points of one seed share
+    its initial field; every seed starts from a fresh generator."""
+    from ut26_ensemble import run_ensemble
+    hits = cached_points(points, full=False)
+    for i in sorted(hits):
+        yield i, hits[i]
+    todo = [i for i in range(len(points)) if i not in hits]
+    print(f">> Ensemble: {len(points)} points, {len(hits)} cached, {len(todo)} to run")
+    for seed in point_seeds([points[i] for i in todo]):
+        group = [i for i in todo if int(points[i].get("SEED", DEFAULT_SEED)) == seed]
+        with seeded(seed):
+            yield from zip(group, run_ensemble([points[i] for i in group]))
+
+
+class SweepTable:
+    """Output csv that grows a row per finished point; close() sorts it.
+    The rows also go to the results store as sweep `name` (default: the csv
+    file name), for sweep_table()."""
+
+    def __init__(self, path, header, name=None):
+        self.path = path
+        self.header = header
+        self.name = name or os.path.splitext(os.path.basename(path))[0]
+        self.rows = {}
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        if RESULTS_DB:
+            clear_sweep(self.name, sim.OUTDIR_BASE)
+        self.f = open(path, "w")
+        self.f.write(header + "\n")
+        self.f.flush()
+
+    def add(self, i, row, outdir=None):
+        self.rows[i] = row
+        np.savetxt(self.f, np.array([row], dtype=float), delimiter=",")
+        self.f.flush()
+        if RESULTS_DB:
+            record_sweep_row(self.name, i, outdir, dict(zip(self.header.split(","), row)),
+                             sim.OUTDIR_BASE)
+
+    def close(self):
+        self.f.close()
+        data = np.array([self.rows[i] for i in sorted(self.rows)], dtype=float)
+        def write(f):
+            buf = io.StringIO()
+            np.savetxt(buf, data, delimiter=",", header=self.header, comments="")
+            f.write(buf.getvalue().encode())
+        atomic_write(self.path, write)
+        print("Wrote:", self.path)
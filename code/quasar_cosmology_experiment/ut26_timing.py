@@ -0,0 +1,129 @@
+"""
+UT26 run instrumentation: wall time per phase, peak RSS, steps/sec
+
+A PhaseTimer is a lap clock: mark() starts a lap, lap(phase) adds the time
+since the last mark/lap to `phase` and starts the next one, so each phase
+boundary costs one perf_counter() call.  The step engines call lap() at
+their phase boundaries when they carry a timer (engine.timer):
+
+    noise        random draws feeding the trigger (normal cube or uniforms)
+    trigger      thresholding into the trigger mask
+    collapse     collapse outcomes (with their uniform draws), R_count, prunes
+    return       λR neighbour stencil (numba: the fused collapse+return kernel)
+    drift        <s> reduction and effective drift
+
+and ut26_cosmo3d.py adds
+
+    observables  snapshot H, LZ, spectra and the final P(k), κ, halos
+    io           snapshot series, trace, checkpoint and csv writes
+    figures      PNG rendering (ut26_figures.py)
+
+report() gives the totals, the step count, steps/sec over the step phases,
+the wall time since the timer was created and the peak RSS; it goes into
+summary.json as "timing".  With a trace file (open_trace; TIMING_TRACE=1)
+every step appends one JSON line with its phase times and trigger count to
+OUTDIR/timing.jsonl; on --resume the lines from the checkpoint on are
+dropped first.  The totals cover the steps run by this process.
+
+profiled(fn, outdir) runs fn under cProfile and writes profile.pstats
+(load with pstats.Stats) and profile.txt (top functions by cumulative time)
+next to the outputs.
+"""
+
+import os, sys, json, time
+
+try:
+    import resource
+except ImportError:         # not available on Windows
+    resource = None
+
+STEP_PHASES = ("noise", "trigger", "collapse", "return", "drift")
+PHASES      = STEP_PHASES + ("observables", "io", "figures")
+TRACE_NAME  = "timing.jsonl"
+PSTATS_NAME = "profile.pstats"
+
+
+def peak_rss_mb(children=False):
+    """Peak resident set size of this process (children=True: of its largest
+    finished child process) in MiB (None if unknown)."""
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_CHILDREN if children
+                             else resource.RUSAGE_SELF).ru_maxrss
+    return rss / 2**20 if sys.platform == "darwin" else rss / 1024.0
+
+
+class PhaseTimer:
+    """Cumulative wall time per phase, measured as laps."""
+
+    def __init__(self):
+        self.total = dict.fromkeys(PHASES, 0.0)
+        self.steps = 0
+        self.t_start = self.last = time.perf_counter()
+        self.trace = None
+        self._step = None
+
+    def open_trace(self, path, resume_t=None):
+        """Write per-step lines to `path`, keeping those before resume_t."""
+        keep = []
+        if resume_t is not None and os.path.exists(path):
+            with open(path) as f:
+                keep = [line for line in f if json.loads(line)["t"] < resume_t]
+        self.trace = open(path, "w")
+        self.trace.writelines(keep)
+
+    def mark(self):
+        self.last = time.perf_counter()
+
+    def lap(self, phase):
+        now = time.perf_counter()
+        dt = now - self.last
+        self.total[phase] += dt
+        self.last = now
+        if self._step is not None:
+            self._step[phase] = self._step.get(phase, 0.0) + dt
+
+    def begin_step(self):
+        self.mark()
+        if self.trace is not None:
+            self._step = {}
+
+    def end_step(self, t, n_trig):
+        self.steps += 1
+        if self._step is not None:
+            self._step.update(t=int(t), n_trig=int(n_trig))
+            self.trace.write(json.dumps(self._step) + "\n")
+            self._step = None
+
+    def close(self):
+        if self.trace is not None:
+            self.trace.close()
+            self.trace = None
+
+    def report(self):
+        wall = time.perf_counter() - self.t_start
+        step_s = sum(self.total[p] for p in STEP_PHASES)
+        return dict(
+            phases_s={p: round(v, 6) for p, v in self.total.items()},
+            wall_s=round(wall, 6),
+            steps=self.steps,
+            step_s=round(step_s, 6),
+            steps_per_sec=round(self.steps / step_s, 3) if step_s > 0 else None,
+            peak_rss_mb=None if peak_rss_mb() is None else round(peak_rss_mb(), 1),
+        )
+
+
+def profiled(fn, outdir, *args, **kwargs):
+    """Run fn(*args, **kwargs) under cProfile; stats go to `outdir`."""
+    import cProfile, pstats, io
+    prof = cProfile.Profile()
+    try:
+        return prof.runcall(fn, *args, **kwargs)
+    finally:
+        os.makedirs(outdir, exist_ok=True)
+        prof.dump_stats(os.path.join(outdir, PSTATS_NAME))
+        buf = io.StringIO()
+        pstats.Stats(prof, stream=buf).sort_stats("cumulative").print_stats(40)
+        with open(os.path.join(outdir, "profile.txt"), "w") as f:
+            f.write(buf.getvalue())
+        print("Wrote:", os.path.join(outdir, PSTATS_NAME), "+ profile.txt")
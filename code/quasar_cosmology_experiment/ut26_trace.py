@@ -0,0 +1,83 @@
+"""
+UT26 substrate trace R: compact collapse counter and its outputs
+
+R(x,t) only accumulates TRACE_COST per collapse, so the step engines keep
+R_count, the per-voxel number of collapses, in the smallest unsigned
+integer type that cannot overflow in the run (a voxel collapses at most once
+per step):
+
+    trace_dtype(steps)  uint16 up to 65535 steps, else uint32
+                        (2 / 4 bytes per voxel instead of 8 for float64 R)
+
+R = TRACE_COST * R_count is applied on read.  Two compressed files go into
+the run's OUTDIR:
+
+    trace.npz        the final counter: count (N³), trace_cost, t
+    trace_proj.npz   projections along axis 2 (the κ axis) at every
+                     snapshot: t (S,), count (S, N, N) uint32, trace_cost
+
+trace_proj.npz is rewritten atomically at each snapshot (it is N² per
+snapshot, small next to one step); on --resume it is cut back to the
+snapshots before the checkpoint.
+
+Read with
+    R, t       = read_trace(outdir)           # float64 N³ trace at step t
+    t, R_proj  = read_trace_proj(outdir)      # float64 (S, N, N)
+"""
+
+import os
+import numpy as np
+
+from ut26_checkpoint import atomic_write
+
+TRACE_NAME = "trace.npz"
+PROJ_NAME  = "trace_proj.npz"
+
+
+def trace_dtype(steps):
+    """Smallest unsigned dtype holding a count of up to `steps` collapses."""
+    return np.dtype(np.uint16) if steps <= np.iinfo(np.uint16).max else np.dtype(np.uint32)
+
+
+def project(count, axis=2):
+    return count.sum(axis=axis, dtype=np.uint32)
+
+
+def write_trace(outdir, count, trace_cost, t):
+    atomic_write(os.path.join(outdir, TRACE_NAME), lambda f: np.savez_compressed(
+        f, count=count, trace_cost=np.float64(trace_cost), t=np.int64(t)))
+
+
+def read_trace(outdir):
+    with np.load(os.path.join(outdir, TRACE_NAME)) as z:
+        return z["count"] * float(z["trace_cost"]), int(z["t"])
+
+
+class TraceProjections:
+    """Per-snapshot projections of the collapse counter, kept in memory and
+    rewritten to trace_proj.npz after every append."""
+
+    def __init__(self, outdir, trace_cost, resume_t=None):
+        self.path = os.path.join(outdir, PROJ_NAME)
+        self.trace_cost = float(trace_cost)
+        self.t, self.count = [], []
+        if resume_t is not None and os.path.exists(self.path):
+            with np.load(self.path) as z:
+                keep = z["t"] < resume_t
+                self.t = z["t"][keep].tolist()
+                self.count = list(z["count"][keep])
+
+    def append(self, t, count):
+        self.append_projection(t, project(count))
+
+    def append_projection(self, t, proj):
+        self.t.append(int(t))
+        self.count.append(np.array(proj, dtype=np.uint32))
+        t_arr, c_arr = np.array(self.t, dtype=np.int64), np.stack(self.count)
+        atomic_write(self.path, lambda f: np.savez_compressed(
+            f, t=t_arr, count=c_arr, trace_cost=np.float64(self.trace_cost)))
+
+
+def read_trace_proj(outdir):
+    with np.load(os.path.join(outdir, PROJ_NAME)) as z:
+        return z["t"], z["count"] * float(z["trace_cost"])